@@ -45,19 +45,25 @@ class UArmReader(LineReader):
 
     def connection_lost(self, exc):
         # print(exc)
-        connect_ports.remove(self.transport.serial.port)
+        if self.transport.serial.port in connect_ports:
+            connect_ports.remove(self.transport.serial.port)
         self.rx_que.queue.clear()
         logger.info('connection is lost')
 
 
 class Serial(object):
-    def __init__(self, port=None, baudrate=115200, timeout=None, filters=None, rx_que=None, tx_que=None, rx_con_c=None):
+    def __init__(self, port=None, baudrate=115200, timeout=None, filters=None, rx_que=None, tx_que=None, rx_con_c=None,
+                 com=None):
+        """
+        :param com: an opened serial port like object, e.g. comm.loopback.LoopbackSerial(), default is None (open the port)
+        """
         super(Serial, self).__init__()
         self._port = port
         self._baudrate = baudrate
         self._timeout = timeout
         self._filters = filters
-        self.com = None
+        self.com = com
+        self._own_port = com is None
         self.rx_que = rx_que
         self._tx_que = tx_que
         self._read_thread = None
@@ -69,7 +75,7 @@ class Serial(object):
 
     @property
     def connected(self):
-        return self.com and self.com.isOpen()
+        return self.com and self.com.is_open
 
     @property
     def port(self):
@@ -80,24 +86,33 @@ class Serial(object):
         return self._baudrate
 
     def connect(self, port=None, baudrate=None, timeout=None):
-        if self.connected:
+        if self.connected and self._read_thread is not None and self._read_thread.alive:
             logger.warn('serial is open, no need reconnect')
             return self
         self._port = port if port is not None else self._port
         self._baudrate = baudrate if baudrate is not None else self._baudrate
         self._timeout = timeout if timeout is not None else self._timeout
 
-        if self._port is None:
-            self._port = select_port(self._filters, connect_ports)
+        if self._own_port:
             if self._port is None:
-                raise Exception('can not found port, please connect the port via usb')
-        self.com = serial.Serial(port=self._port, baudrate=self._baudrate, timeout=self._timeout)
-        if not self.com.isOpen():
-            raise Exception('serial open failed')
-        connect_ports.append(self._port)
+                self._port = select_port(self._filters, connect_ports)
+                if self._port is None:
+                    raise Exception('can not found port, please connect the port via usb')
+            self.com = serial.Serial(port=self._port, baudrate=self._baudrate, timeout=self._timeout)
+            if not self.com.isOpen():
+                raise Exception('serial open failed')
+            connect_ports.append(self._port)
+        else:
+            if not self.com.is_open:
+                self.com.open()
+            self._port = getattr(self.com, 'port', self._port)
         logger.info('connect {} success'.format(self._port))
         if self.rx_que is None:
             self.rx_que = Queue()
+        # drop the lines and wake up markers of the last connection
+        self.rx_que.queue.clear()
+        if self._tx_que is not None:
+            self._tx_que.queue.clear()
         self._read_thread = ReaderThread(self, UArmReader)
         self._read_thread.start()
         self.transport, self.protocol = self._read_thread.connect()
@@ -115,19 +130,24 @@ class Serial(object):
             self._tx_con_c.notifyAll()
 
     def notify_all(self):
-        self.rx_notify()
+        # the reader threads block on the queues, None wakes them up to check the connection
+        self.rx_que.put(None)
+        if self._tx_que is not None:
+            self._tx_que.put(None)
+        if self.rx_con_c is not None:
+            self.rx_notify()
         self.tx_notify()
 
     def disconnect(self):
         if self._read_thread:
             self._read_thread.close()
             self._read_thread.join(2)
+        self.notify_all()
         if self._write_thread:
             try:
                 self._write_thread.join(1)
             except:
                 pass
-        self.notify_all()
 
         if self._tx_que is not None:
             self._tx_que.queue.clear()
@@ -135,21 +155,30 @@ class Serial(object):
     def write(self, data):
         if self._tx_que is not None:
             self._tx_que.put(data)
-            with self._tx_con_c:
-                self._tx_con_c.notifyAll()
         else:
             if isinstance(data, dict):
                 cmd = data.get('cmd')
                 msg = data.get('msg')
-                cmd.start()
+                cmd.sent()
             else:
                 msg = data
             self.protocol.write_line(msg)
 
+    def write_now(self, data):
+        # bypass the tx queue, used for the emergency stop
+        if self.protocol:
+            self.protocol.write_line(data)
+
+    def clear_tx(self):
+        if self._tx_que is not None:
+            self._tx_que.queue.clear()
+
     def read(self):
         if not self.rx_que.empty():
             try:
-                return self.rx_que.get_nowait()
+                line = self.rx_que.get_nowait()
+                if line is not None:
+                    return line
             except:
                 pass
 
@@ -157,18 +186,17 @@ class Serial(object):
         logger.debug('serial write thread start ...')
         while self.connected and self.protocol:
             try:
-                with self._tx_con_c:
-                    if self._tx_que.empty():
-                        self._tx_con_c.wait(0.01)
-                    else:
-                        data = self._tx_que.get_nowait()
-                        if isinstance(data, dict):
-                            cmd = data.get('cmd')
-                            msg = data.get('msg')
-                            cmd.start()
-                        else:
-                            msg = data
-                        self.protocol.write_line(msg)
+                # blocks until data is written, None is put by notify_all when the connection is closed
+                data = self._tx_que.get()
+                if data is None:
+                    continue
+                if isinstance(data, dict):
+                    cmd = data.get('cmd')
+                    msg = data.get('msg')
+                    cmd.sent()
+                else:
+                    msg = data
+                self.protocol.write_line(msg)
             except:
                 pass
         logger.debug('serial write thread exit ...')
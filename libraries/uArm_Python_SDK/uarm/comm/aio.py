@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+# Software License Agreement (BSD License)
+#
+# Copyright (c) 2018, UFACTORY, Inc.
+# All rights reserved.
+#
+# Author: Vinman <vinman.wen@ufactory.cc> <vinman.cub@gmail.com>
+
+import asyncio
+import threading
+import serial
+from ..tools.list_ports import select_port
+from ..utils.log import logger
+from . import connect_ports
+
+
+class AsyncSerial(object):
+    """
+    Line based serial port driven by an asyncio event loop.
+    The port is read when the loop reports it readable, so no reader thread is needed. Event loops
+    without add_reader support (e.g. the proactor loop on Windows) fall back to one reader thread.
+    """
+    TERMINATOR = b'\n'
+
+    def __init__(self, port=None, baudrate=115200, filters=None, line_callback=None, com=None):
+        """
+        :param port: default is to select the first port
+        :param baudrate: default is 115200
+        :param filters: like {'hwid': 'USB VID:PID=2341:0042'}
+        :param line_callback: called in the event loop with every received line
+        :param com: an opened serial port like object, e.g. serial.serial_for_url(...), default is None
+        """
+        self._port = port
+        self._baudrate = baudrate
+        self._filters = filters
+        self._line_callback = line_callback
+        self.com = com
+        self._own_port = com is None
+        self._loop = None
+        self._buffer = bytearray()
+        self._read_thread = None
+        self.closed = None
+
+    @property
+    def connected(self):
+        return self.com is not None and self.com.is_open
+
+    @property
+    def port(self):
+        return self._port
+
+    @property
+    def baudrate(self):
+        return self._baudrate
+
+    async def connect(self, port=None, baudrate=None):
+        if self.connected and self._loop is not None:
+            logger.warn('serial is open, no need reconnect')
+            return self
+        self._loop = asyncio.get_running_loop()
+        self.closed = self._loop.create_future()
+        self._buffer.clear()
+        if self._own_port:
+            self._port = port if port is not None else self._port
+            self._baudrate = baudrate if baudrate is not None else self._baudrate
+            if self._port is None:
+                self._port = select_port(self._filters, connect_ports)
+                if self._port is None:
+                    raise Exception('can not found port, please connect the port via usb')
+            self.com = serial.Serial(port=self._port, baudrate=self._baudrate, timeout=0)
+            if not self.com.is_open:
+                raise Exception('serial open failed')
+            connect_ports.append(self._port)
+        logger.info('connect {} success'.format(self._port))
+        try:
+            self._loop.add_reader(self.com.fileno(), self._on_readable)
+        except (NotImplementedError, AttributeError, ValueError):
+            self._read_thread = threading.Thread(target=self._loop_read, daemon=True)
+            self._read_thread.start()
+        return self
+
+    def _on_readable(self):
+        try:
+            data = self.com.read(self.com.in_waiting or 1)
+        except serial.SerialException as e:
+            self._connection_lost(e)
+            return
+        self._data_received(data)
+
+    def _loop_read(self):
+        logger.debug('serial read thread start ...')
+        self.com.timeout = 1
+        error = None
+        while self.connected:
+            try:
+                data = self.com.read(self.com.in_waiting or 1)
+            except Exception as e:
+                error = e
+                break
+            if data:
+                self._loop.call_soon_threadsafe(self._data_received, data)
+        self._loop.call_soon_threadsafe(self._connection_lost, error)
+        logger.debug('serial read thread exit ...')
+
+    def _data_received(self, data):
+        self._buffer.extend(data)
+        while self.TERMINATOR in self._buffer:
+            packet, self._buffer = self._buffer.split(self.TERMINATOR, 1)
+            line = ''.join(map(chr, packet)).strip()
+            logger.verbose('recv: {}'.format(line))
+            if line and callable(self._line_callback):
+                self._line_callback(line)
+
+    def _connection_lost(self, error):
+        if self.closed is None or self.closed.done():
+            return
+        self._remove_reader()
+        try:
+            self.com.close()
+        except:
+            pass
+        if self._own_port and self._port in connect_ports:
+            connect_ports.remove(self._port)
+        logger.info('connection is lost')
+        self.closed.set_result(error)
+
+    def _remove_reader(self):
+        if self._read_thread is None and self._loop is not None and self.com is not None:
+            try:
+                self._loop.remove_reader(self.com.fileno())
+            except:
+                pass
+
+    def write(self, msg):
+        logger.verbose('send: {}, {}'.format(self._port, msg))
+        try:
+            self.com.write(msg.encode('utf-8') + self.TERMINATOR)
+        except serial.SerialException as e:
+            self._connection_lost(e)
+
+    def disconnect(self):
+        self._connection_lost(None)
+        if self._read_thread is not None:
+            self._read_thread.join(2)
+            self._read_thread = None
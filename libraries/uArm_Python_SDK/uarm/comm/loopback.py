@@ -0,0 +1,414 @@
+#!/usr/bin/env python3
+# Software License Agreement (BSD License)
+#
+# Copyright (c) 2018, UFACTORY, Inc.
+# All rights reserved.
+#
+# Author: Vinman <vinman.wen@ufactory.cc> <vinman.cub@gmail.com>
+
+"""
+In-process transports for running the SDK without a uArm, e.g. to benchmark the command throughput:
+    swift = SwiftAPI(com=LoopbackSerial(FakeFirmware(latency=0.002)))
+    swift = SwiftAPI(com=LoopbackSerial(ReplayFirmware('session.jsonl')))
+    swift = SwiftAPI(com=RecordingSerial(serial.Serial('/dev/ttyACM0', 115200), 'session.jsonl'))
+"""
+
+import math
+import time
+import json
+import heapq
+import itertools
+import threading
+from collections import deque
+from ..swift import protocol
+
+
+class FakeFirmware(object):
+    """
+    Model of the uArm firmware for the '#cnt cmd' / '$cnt OK' protocol.
+    Every reply is delayed by the latency and the transfer time of the line, the moves are buffered like in the
+    firmware: they are replied as soon as they are queued and M2200 reports V1 until the last move is done.
+    """
+    def __init__(self, latency=0.002, baudrate=115200, time_factor=1.0, buffer_size=4,
+                 device_info=('SwiftPro', '3.3', '4.0.0', '4.0.0', 'LOOPBACK')):
+        """
+        :param latency: (s) processing time of one command
+        :param baudrate: transfer time of the lines, 0 disables it
+        :param time_factor: scales the move durations, 0 finishes all moves immediately
+        :param buffer_size: moves the firmware buffers, a move is replied when a place is free
+        :param device_info: replies of P2201 ... P2205
+        """
+        self.latency = latency
+        self.baudrate = baudrate
+        self.time_factor = time_factor
+        self.buffer_size = buffer_size
+        self.device_info = device_info
+        self.position = [200.0, 0.0, 150.0]
+        self.speed = 1000.0
+        self.servo_angles = [90.0, 90.0, 90.0, 90.0]
+        self.pump = 0
+        self.gripper = 0
+        self.mode = 0
+        self._move_ends = deque()
+        self._lock = threading.Lock()
+
+    def connection_made(self, now):
+        """
+        Lines sent by the firmware after the port is opened
+        :return: list of (time, line)
+        """
+        return [(now, '@5 V1')]
+
+    def transfer_time(self, line):
+        if not self.baudrate:
+            return 0.0
+        # 10 bits per byte with start and stop bit
+        return (len(line) + 1) * 10.0 / self.baudrate
+
+    def is_moving(self, now):
+        return bool(self._move_ends) and self._move_ends[-1] > now
+
+    def receive(self, line, now):
+        """
+        Handle one line sent to the firmware
+        :param line: line without terminator, e.g. '#12 G0 X200 Y0 Z150 F1000'
+        :param now: time.monotonic() when the line was sent
+        :return: list of (time, line) replies
+        """
+        with self._lock:
+            now += self.transfer_time(line)
+            if not line.startswith('#'):
+                if line.strip() == protocol.QUICK_STOP:
+                    self._move_ends.clear()
+                return []
+            cnt, _, cmd = line[1:].partition(' ')
+            done, values = self._execute(cmd.split(), now + self.latency)
+            reply = '${} {}'.format(cnt, ' '.join([protocol.OK] + values))
+            return [(done + self.transfer_time(reply), reply)]
+
+    def _execute(self, args, now):
+        while self._move_ends and self._move_ends[0] <= now:
+            self._move_ends.popleft()
+        name = args[0].upper() if args else ''
+        params = {}
+        for arg in args[1:]:
+            try:
+                params[arg[0].upper()] = float(arg[1:])
+            except ValueError:
+                pass
+        if name in ('G0', 'G1', 'G2204', 'G2201', 'G2205'):
+            return self._move(name, params, now), []
+        elif name == 'G2202':
+            servo_id = int(params.get('N', 0))
+            angle = params.get('V', 90.0)
+            speed = params.get('F', self.speed)
+            duration = abs(angle - self.servo_angles[servo_id]) / max(speed / 60.0, 1e-6)
+            self.servo_angles[servo_id] = angle
+            return self._queue_move(duration, now), []
+        elif name == 'M2231':
+            self.pump = int(params.get('V', 0))
+        elif name == 'M2232':
+            self.gripper = int(params.get('V', 0))
+        elif name == 'M2400':
+            self.mode = int(params.get('S', 0))
+        elif name == 'M2200':
+            return now, ['V{}'.format(int(self.is_moving(now)))]
+        elif name == 'P2220':
+            return now, ['X{:.2f}'.format(self.position[0]), 'Y{:.2f}'.format(self.position[1]),
+                         'Z{:.2f}'.format(self.position[2])]
+        elif name == 'P2221':
+            stretch, rotation = self._to_polar(self.position)
+            return now, ['S{:.2f}'.format(stretch), 'R{:.2f}'.format(rotation), 'H{:.2f}'.format(self.position[2])]
+        elif name == 'P2200':
+            return now, ['B{:.2f}'.format(self.servo_angles[0]), 'L{:.2f}'.format(self.servo_angles[1]),
+                         'R{:.2f}'.format(self.servo_angles[2])]
+        elif name == 'P2231':
+            return now, ['V{}'.format(self.pump)]
+        elif name == 'P2232':
+            return now, ['V{}'.format(self.gripper)]
+        elif name == 'P2234':
+            return now, ['V1']
+        elif name == 'P2400':
+            return now, ['V{}'.format(self.mode)]
+        elif name in ('P2201', 'P2202', 'P2203', 'P2204', 'P2205'):
+            return now, ['V{}'.format(self.device_info[int(name[-1]) - 1])]
+        return now, []
+
+    def _move(self, name, params, now):
+        x, y, z = self.position
+        if name in ('G2201', 'G2205'):
+            stretch, rotation = self._to_polar(self.position)
+            if name == 'G2205':
+                params = {'S': stretch + params.get('S', 0), 'R': rotation + params.get('R', 0),
+                          'H': z + params.get('H', 0), 'F': params.get('F', self.speed)}
+            stretch, rotation = params.get('S', stretch), params.get('R', rotation)
+            target = [stretch * math.sin(math.radians(rotation)), -stretch * math.cos(math.radians(rotation)),
+                      params.get('H', z)]
+        elif name == 'G2204':
+            target = [x + params.get('X', 0), y + params.get('Y', 0), z + params.get('Z', 0)]
+        else:
+            target = [params.get('X', x), params.get('Y', y), params.get('Z', z)]
+        self.speed = params.get('F', self.speed)
+        distance = math.sqrt(sum((a - b) ** 2 for a, b in zip(target, self.position)))
+        self.position = target
+        return self._queue_move(distance / max(self.speed / 60.0, 1e-6), now)
+
+    def _queue_move(self, duration, now):
+        # the reply waits for a free place in the move buffer
+        done = now
+        if self.buffer_size and len(self._move_ends) >= self.buffer_size:
+            done = max(now, self._move_ends[-self.buffer_size])
+        start = max(done, self._move_ends[-1] if self._move_ends else done)
+        self._move_ends.append(start + duration * self.time_factor)
+        return done
+
+    @staticmethod
+    def _to_polar(position):
+        stretch = math.hypot(position[0], position[1])
+        rotation = math.degrees(math.atan2(position[0], -position[1]))
+        return stretch, rotation
+
+
+class ReplayFirmware(FakeFirmware):
+    """
+    Answers with the replies of a session recorded by RecordingSerial, with the recorded delays.
+    The sent commands are matched in order without their counter, commands which are not in the
+    recording are answered by the FakeFirmware model. In strict mode the commands must be sent in the
+    recorded order, the first other command is not answered and check() fails.
+    """
+    def __init__(self, path, time_factor=1.0, strict=False, **kwargs):
+        """
+        :param path: JSON lines file written by RecordingSerial
+        :param time_factor: scales the recorded delays
+        :param strict: fail on commands which are not the next recorded command
+        """
+        super(ReplayFirmware, self).__init__(time_factor=time_factor, **kwargs)
+        self.strict = strict
+        # first (expected, sent) command which did not match the recording in strict mode
+        self.divergence = None
+        self._greeting = []
+        self._replies = {}
+        self._sequence = deque()
+        with open(path) as f:
+            records = [json.loads(line) for line in f if line.strip()]
+        # a reply belongs to the command with its counter, the other lines to the last command
+        sent = None
+        pending = {}
+        for record in records:
+            line = record['line']
+            if record['dir'] == 'tx':
+                sent = [record['t'], []]
+                self._replies.setdefault(self._strip_cnt(line), deque()).append(sent)
+                self._sequence.append(self._strip_cnt(line))
+                if line.startswith('#'):
+                    pending[line[1:].partition(' ')[0]] = sent
+            elif line.startswith('$') and line[1:].partition(' ')[0] in pending:
+                cmd = pending.pop(line[1:].partition(' ')[0])
+                cmd[1].append((record['t'] - cmd[0], line))
+            elif sent is None:
+                self._greeting.append(line)
+            else:
+                sent[1].append((record['t'] - sent[0], line))
+
+    @staticmethod
+    def _strip_cnt(line):
+        if line.startswith('#'):
+            return line.partition(' ')[2]
+        return line
+
+    def connection_made(self, now):
+        if self._greeting:
+            return [(now, line) for line in self._greeting]
+        return super(ReplayFirmware, self).connection_made(now)
+
+    def check(self):
+        """
+        Raise RuntimeError if a command did not match the recording in strict mode
+        """
+        if self.divergence is not None:
+            expected, sent = self.divergence
+            raise RuntimeError('replay diverged: expected "{}", sent "{}"'.format(expected, sent))
+
+    def receive(self, line, now):
+        if self.strict:
+            with self._lock:
+                expected = self._sequence.popleft() if self._sequence else None
+                if self.divergence is None and expected != self._strip_cnt(line):
+                    self.divergence = (expected, line)
+                if self.divergence is not None:
+                    return []
+        recorded = self._replies.get(self._strip_cnt(line))
+        if not recorded:
+            return super(ReplayFirmware, self).receive(line, now)
+        _, replies = recorded.popleft()
+        cnt = line[1:].partition(' ')[0] if line.startswith('#') else None
+        result = []
+        for delay, reply in replies:
+            if cnt is not None and reply.startswith('$'):
+                reply = '${} {}'.format(cnt, reply.partition(' ')[2])
+            result.append((now + delay * self.time_factor, reply))
+        return result
+
+
+class LoopbackSerial(object):
+    """
+    Serial port like object connected to a firmware model in the same process, pass it as com to Swift/SwiftAPI
+    or AsyncSwiftAPI. The replies are released by readline() when they are due, no extra thread is needed.
+    """
+    TERMINATOR = b'\n'
+
+    def __init__(self, firmware=None, port='loopback', timeout=None):
+        self.firmware = firmware if firmware is not None else FakeFirmware()
+        self.port = port
+        self.timeout = timeout
+        self.baudrate = 115200
+        self.is_open = False
+        self._heap = []
+        self._seq = itertools.count()
+        self._buffer = bytearray()
+        self._cond = threading.Condition()
+        self._cancelled = False
+        self.open()
+
+    def open(self):
+        with self._cond:
+            self.is_open = True
+            self._heap = []
+            self._buffer.clear()
+            self._push(self.firmware.connection_made(time.monotonic()))
+
+    def isOpen(self):
+        return self.is_open
+
+    def close(self):
+        with self._cond:
+            self.is_open = False
+            self._cond.notify_all()
+
+    def _push(self, replies):
+        for due, line in replies:
+            heapq.heappush(self._heap, (due, next(self._seq), line.encode('utf-8') + self.TERMINATOR))
+        self._cond.notify_all()
+
+    def write(self, data):
+        if not self.is_open:
+            raise IOError('loopback port is closed')
+        now = time.monotonic()
+        lines = bytes(data).split(self.TERMINATOR)
+        with self._cond:
+            for line in lines:
+                line = line.decode('utf-8').strip()
+                if line:
+                    self._push(self.firmware.receive(line, now))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def cancel_read(self):
+        with self._cond:
+            self._cancelled = True
+            self._cond.notify_all()
+
+    def _move_due(self):
+        now = time.monotonic()
+        while self._heap and self._heap[0][0] <= now:
+            self._buffer.extend(heapq.heappop(self._heap)[2])
+
+    @property
+    def in_waiting(self):
+        with self._cond:
+            self._move_due()
+            return len(self._buffer)
+
+    def _wait(self, ready):
+        # wait until ready() or the timeout, the next due reply wakes up the wait
+        deadline = None if self.timeout is None else time.monotonic() + self.timeout
+        with self._cond:
+            while True:
+                self._move_due()
+                if ready() or not self.is_open or self._cancelled:
+                    self._cancelled = False
+                    return
+                now = time.monotonic()
+                wait = None if deadline is None else deadline - now
+                if self._heap:
+                    due = self._heap[0][0] - now
+                    wait = due if wait is None else min(wait, due)
+                if wait is not None and wait <= 0:
+                    return
+                self._cond.wait(wait)
+
+    def readline(self):
+        self._wait(lambda: self.TERMINATOR in self._buffer)
+        with self._cond:
+            if self.TERMINATOR in self._buffer:
+                line, _, rest = bytes(self._buffer).partition(self.TERMINATOR)
+                self._buffer[:] = rest
+                return line + self.TERMINATOR
+            return b''
+
+    def read(self, size=1):
+        self._wait(lambda: len(self._buffer) > 0)
+        with self._cond:
+            data = bytes(self._buffer[:size])
+            del self._buffer[:size]
+            return data
+
+
+class RecordingSerial(object):
+    """
+    Wraps a serial port like object and writes all lines with their time as JSON lines, the file can be replayed
+    with ReplayFirmware:
+        {"t": 0.0123, "dir": "tx", "line": "#1 P2234"}
+    """
+    TERMINATOR = b'\n'
+
+    def __init__(self, com, path):
+        self.com = com
+        self._file = open(path, 'w')
+        self._start = time.monotonic()
+        self._lock = threading.Lock()
+        self._rx = bytearray()
+        self._tx = bytearray()
+
+    def __getattr__(self, item):
+        return getattr(self.com, item)
+
+    @property
+    def timeout(self):
+        return self.com.timeout
+
+    @timeout.setter
+    def timeout(self, value):
+        self.com.timeout = value
+
+    def _record(self, buffer, data, direction):
+        buffer.extend(data)
+        with self._lock:
+            while self.TERMINATOR in buffer:
+                line, _, rest = bytes(buffer).partition(self.TERMINATOR)
+                buffer[:] = rest
+                line = line.decode('utf-8', 'replace').strip()
+                if line and not self._file.closed:
+                    self._file.write(json.dumps({'t': round(time.monotonic() - self._start, 6),
+                                                 'dir': direction, 'line': line}) + '\n')
+
+    def write(self, data):
+        self._record(self._tx, data, 'tx')
+        return self.com.write(data)
+
+    def readline(self):
+        data = self.com.readline()
+        self._record(self._rx, data, 'rx')
+        return data
+
+    def read(self, size=1):
+        data = self.com.read(size)
+        self._record(self._rx, data, 'rx')
+        return data
+
+    def close(self):
+        self.com.close()
+        with self._lock:
+            self._file.close()
@@ -88,11 +88,12 @@ class ReaderThread(threading.Thread):
         self.alive = False
         self.protocol.connection_lost(error)
         self.protocol = None
-        self.stream.notify_all()
         try:
             self.close()
         except:
             pass
+        # wake up the threads waiting for data, the port is closed now
+        self.stream.notify_all()
         logger.debug('serial read thread exit ...')
 
     def write(self, data):
@@ -19,6 +19,7 @@ try:
 except:
     asyncio = None
 from queue import Queue
+from concurrent.futures import Future
 from . import protocol
 from ..comm import Serial
 from .keys import Keys
@@ -27,6 +28,8 @@ from .gripper import Gripper
 from .grove import Grove
 from .utils import *
 from ..tools.threads import ThreadManage
+from ..tools.scheduler import get_scheduler
+from ..tools.stats import CommandStats
 
 
 class HandleQueue(Queue):
@@ -35,7 +38,9 @@ class HandleQueue(Queue):
         self.handle = handle
 
     def put(self, item, block=True, timeout=None):
-        self.handle(item)
+        # None only wakes up a waiting reader, there is none for this queue
+        if item is not None:
+            self.handle(item)
 
     def get(self, block=True, timeout=None):
         return None
@@ -50,6 +55,8 @@ class Swift(Pump, Keys, Gripper, Grove):
             self.cmd_pend_size = 2
         self.cmd_pend_c = threading.Condition()
         self.cmd_timeout = kwargs.get('cmd_timeout', 2)
+        # set by emergency_stop, no command is written until reset or waiting_ready
+        self._stopped = threading.Event()
         self._cnt_lock = threading.Lock()
         self._cnt = 1
 
@@ -110,7 +117,8 @@ class Swift(Pump, Keys, Gripper, Grove):
 
         filters = kwargs.get('filters', None)
         self.serial = Serial(port=port, baudrate=baudrate, timeout=timeout, filters=filters,
-                             rx_que=self._rx_que, tx_que=self._tx_que, rx_con_c=self._rx_con_c)
+                             rx_que=self._rx_que, tx_que=self._tx_que, rx_con_c=self._rx_con_c,
+                             com=kwargs.get('com', None))
 
         self._handle_thread = None
         self._handle_report_thread = None
@@ -123,30 +131,24 @@ class Swift(Pump, Keys, Gripper, Grove):
 
         self._thread_manage = ThreadManage()
 
+        self.cmd_stats = None
+        if kwargs.get('enable_cmd_stats', False):
+            self.enable_cmd_stats(dump_interval=kwargs.get('cmd_stats_dump_interval', None))
+
         if not kwargs.get('do_not_open', False):
             self.connect()
 
     if asyncio:
         def _run_asyncio_loop(self):
-            # async def _asyncio_loop():
-            #     logger.debug('asyncio thread start ...')
-            #     while self.connected:
-            #         await asyncio.sleep(0.01)
-            #     logger.debug('asyncio thread exit ...')
-
-            @asyncio.coroutine
-            def _asyncio_loop():
-                logger.debug('asyncio thread start ...')
-                while self.connected:
-                    yield from asyncio.sleep(0.01)
-                logger.debug('asyncio thread exit ...')
-
+            # the loop runs until the handle thread stops it when the connection is closed
+            logger.debug('asyncio thread start ...')
             try:
                 asyncio.set_event_loop(self._asyncio_loop)
                 self._asyncio_loop_alive = True
-                self._asyncio_loop.run_until_complete(_asyncio_loop())
+                self._asyncio_loop.run_forever()
             except Exception as e:
                 pass
+            logger.debug('asyncio thread exit ...')
 
             self._asyncio_loop_alive = False
 
@@ -164,31 +166,26 @@ class Swift(Pump, Keys, Gripper, Grove):
 
     if asyncio:
         @staticmethod
-        @asyncio.coroutine
-        def _async_run_callback(callback, msg):
-            yield from callback(msg)
-
-        # @staticmethod
-        # async def _async_run_callback(callback, msg):
-        #     await callback(msg)
+        async def _async_run_callback(callback, msg):
+            ret = callback(msg)
+            if asyncio.iscoroutine(ret):
+                await ret
 
     def _loop_handle(self):
         logger.debug('serial result handle thread start ...')
         while self.connected:
             try:
-                with self._rx_con_c:
-                    if self._rx_que.empty():
-                        self._rx_con_c.wait(0.01)
-                    else:
-                        line = self._rx_que.get_nowait()
-                        self._handle_line(line)
+                # blocks until a line arrives, None is put by the serial port when the connection is closed
+                line = self._rx_que.get()
+                if line is None:
+                    break
+                self._handle_line(line)
             except:
                 pass
         if self._asyncio_loop:
-            self._asyncio_loop.stop()
-        if self._report_con_c:
-            with self._report_con_c:
-                self._report_con_c.notifyAll()
+            self._asyncio_loop.call_soon_threadsafe(self._asyncio_loop.stop)
+        if self._report_que is not None:
+            self._report_que.put(None)
 
         self.power_status = False
         try:
@@ -204,21 +201,20 @@ class Swift(Pump, Keys, Gripper, Grove):
         logger.debug('serial report handle thread start ...')
         while self.connected:
             try:
-                with self._report_con_c:
-                    if self._report_que.empty():
-                        self._report_con_c.wait(0.5)
-                    else:
-                        item = self._report_que.get_nowait()
-                        if self._asyncio_loop and self._asyncio_loop_alive:
-                            try:
-                                coroutine = self._async_run_callback(self._handle_report, item)
-                                asyncio.run_coroutine_threadsafe(coroutine, self._asyncio_loop)
-                            except Exception as e:
-                                pass
-                        elif self.pool is not None:
-                            self.pool.apply_async(self._handle_report, args=(item,))
-                        else:
-                            self._handle_report(item)
+                # blocks until a report arrives, None is put by the handle thread when the connection is closed
+                item = self._report_que.get()
+                if item is None:
+                    break
+                if self._asyncio_loop and self._asyncio_loop_alive:
+                    try:
+                        coroutine = self._async_run_callback(self._handle_report, item)
+                        asyncio.run_coroutine_threadsafe(coroutine, self._asyncio_loop)
+                    except Exception as e:
+                        pass
+                elif self.pool is not None:
+                    self.pool.apply_async(self._handle_report, args=(item,))
+                else:
+                    self._handle_report(item)
 
                         # try:
                         #     if self.pool is not None:
@@ -256,8 +252,6 @@ class Swift(Pump, Keys, Gripper, Grove):
                 if self._report_que.full():
                     self._report_que.get()
                 self._report_que.put(line)
-                with self._report_con_c:
-                    self._report_con_c.notifyAll()
             else:
                 self._handle_report(line)
         else:
@@ -380,6 +374,7 @@ class Swift(Pump, Keys, Gripper, Grove):
 
     @catch_exception
     def waiting_ready(self, timeout=5):
+        self._stopped.clear()
         start_time = time.time()
         while time.time() - start_time < timeout:
             if self.power_status:
@@ -442,30 +437,56 @@ class Swift(Pump, Keys, Gripper, Grove):
             except:
                 pass
 
-    class Cmd:
-        def __init__(self, owner, cnt, msg, timeout, callback=None, debug=True, enable_callback_thread=True):
+    class Cmd(Future):
+        """
+        Pending command, the result is the reply of the uArm or protocol.TIMEOUT.
+        The timeout is expired by the shared scheduler, no thread per command.
+        """
+        def __init__(self, owner, cnt, msg, timeout, callback=None, debug=True, enable_callback_thread=True,
+                     request_time=None):
+            super(Swift.Cmd, self).__init__()
             self.owner = owner
             self.cnt = cnt
             self.msg = msg
             self.debug = debug
             self.enable_callback_thread = enable_callback_thread
-            self.ret = Queue()
             self.timeout = timeout if isinstance(timeout, (int, float)) else self.owner.cmd_timeout
             self.callback = callback
             self.timer = None
-            self.start_time = time.time()
+            # time.monotonic() of the call, the place in the cmd cache, the write and the reply
+            self.request_time = request_time if request_time is not None else time.monotonic()
+            self.start_time = time.monotonic()
+            self.sent_time = None
             self.count = 1
+            self._resolve_lock = threading.Lock()
 
         def start(self):
-            self.timer = threading.Timer(self.timeout, self.timeout_cb)
-            self.timer.start()
-            self.start_time = time.time()
+            self.timer = get_scheduler().schedule(self.timeout, self.timeout_cb)
+            self.start_time = time.monotonic()
+
+        def sent(self):
+            self.sent_time = time.monotonic()
+
+        def _stop_timer(self):
+            if self.timer is not None:
+                get_scheduler().cancel(self.timer)
+
+        def _resolve(self, msg):
+            # the reply and the timeout can race, the first one wins
+            with self._resolve_lock:
+                if self.done():
+                    return
+                self.set_result(msg)
+            stats = self.owner.cmd_stats
+            if stats is not None:
+                stats.record(self.msg.split(' ', 1)[0], self.cnt, self.msg, self.request_time, self.start_time,
+                             self.sent_time, time.monotonic(), msg == protocol.TIMEOUT)
 
         def timeout_cb(self):
             self.delete()
             # if self.debug:
             #     logger.warn('{} cmd "#{} {}" timeout'.format(self.owner.port, self.cnt, self.msg))
-            self.ret.put(protocol.TIMEOUT)
+            self._resolve(protocol.TIMEOUT)
 
         def delete(self):
             try:
@@ -475,22 +496,27 @@ class Swift(Pump, Keys, Gripper, Grove):
             with self.owner.cmd_pend_c:
                 self.owner.cmd_pend_c.notifyAll()
 
+        def abort(self):
+            self._stop_timer()
+            self.delete()
+            self._resolve(protocol.TIMEOUT)
+
         def finish(self, msg):
-            self.timer.cancel()
+            self._stop_timer()
             self.delete()
             if callable(self.callback):
                 self.owner.run_callback(self.callback, msg, enable_callback_thread=self.enable_callback_thread)
-            self.ret.put(msg)
+            self._resolve(msg)
 
-        def get_ret(self):
-            while self.ret.empty():
-                time.sleep(0.002)
-            return self.ret.get()
+        def get_ret(self, timeout=None):
+            # finish, timeout_cb or abort always set a result
+            return self.result(timeout)
 
     @catch_exception
     def send_cmd_async(self, msg=None, timeout=None, callback=None, debug=True, enable_callback_thread=True):
         if not isinstance(msg, str) or not msg:
             return
+        request_time = time.monotonic()
         if timeout is None:
             if msg.startswith('_T'):
                 tmps = msg[2:].split(' ', 1)
@@ -505,20 +531,57 @@ class Swift(Pump, Keys, Gripper, Grove):
         with self._cnt_lock:
             with self.cmd_pend_c:
                 while len(self.cmd_pend) >= self.cmd_pend_size:
-                    self.cmd_pend_c.wait(0.01)
-            cmd = self.Cmd(self, self._cnt, msg, timeout, callback, debug=debug, enable_callback_thread=enable_callback_thread)
+                    # every pending command notifies when it is finished, timed out or cancelled
+                    self.cmd_pend_c.wait()
+            cmd = self.Cmd(self, self._cnt, msg, timeout, callback, debug=debug, enable_callback_thread=enable_callback_thread,
+                           request_time=request_time)
+            if self._stopped.is_set():
+                # emergency stop while waiting for the cmd cache, the command is not sent
+                cmd._resolve(protocol.TIMEOUT)
+                return cmd
             self.cmd_pend[self._cnt] = cmd
-            # self.serial.write({
-            #     'cmd': cmd,
-            #     'msg': '#{cnt} {msg}'.format(cnt=self._cnt, msg=msg)
-            # })
             cmd.start()
-            self.serial.write('#{cnt} {msg}'.format(cnt=self._cnt, msg=msg))
+            # the serial port calls cmd.sent() when the command is written
+            self.serial.write({
+                'cmd': cmd,
+                'msg': '#{cnt} {msg}'.format(cnt=self._cnt, msg=msg)
+            })
             self._cnt += 1
             if self._cnt == 10000:
                 self._cnt = 1
         return cmd
 
+    def enable_cmd_stats(self, enable=True, dump_interval=None, dump=None):
+        if self.cmd_stats is not None:
+            self.cmd_stats.stop_dump()
+        self.cmd_stats = CommandStats(name=str(self.port or 'uArm')) if enable else None
+        if self.cmd_stats is not None and dump_interval:
+            self.cmd_stats.start_dump(dump_interval, dump)
+
+    def get_cmd_stats(self):
+        return self.cmd_stats.summary() if self.cmd_stats is not None else {}
+
+    def reset_cmd_stats(self):
+        if self.cmd_stats is not None:
+            self.cmd_stats.reset()
+
+    def export_cmd_trace(self, path):
+        if self.cmd_stats is not None:
+            self.cmd_stats.export_chrome_trace(path)
+
+    @catch_exception
+    def emergency_stop(self):
+        # drop the commands which are not sent yet, the waiting callers get TIMEOUT
+        self._stopped.set()
+        self.serial.clear_tx()
+        with self.cmd_pend_c:
+            cmds = list(self.cmd_pend.values())
+        for cmd in cmds:
+            cmd.abort()
+        # the firmware stops the current and all buffered moves
+        self.serial.write_now(protocol.QUICK_STOP)
+        self.is_moving = False
+
     @catch_exception
     def send_cmd_sync(self, msg=None, timeout=None, no_cnt=False, debug=True):
         if not isinstance(msg, str) or not msg:
@@ -594,6 +657,7 @@ class Swift(Pump, Keys, Gripper, Grove):
 
     @catch_exception
     def reset(self, speed=None, wait=True, timeout=None, x=200, y=0, z=150):
+        self._stopped.clear()
         if wait:
             self.set_servo_attach(wait=True, timeout=timeout)
             self.set_position(x=x, y=y, z=z, speed=speed, wait=True, timeout=timeout)
@@ -933,11 +997,10 @@ class Swift(Pump, Keys, Gripper, Grove):
                 else:
                     return _ret
         if wait:
-            for cmd in cmds:
-                self.send_cmd_async(cmd, timeout=timeout, callback=_handle)
-            while len(rets) < len(cmds):
-                time.sleep(0.01)
-            for ret in rets:
+            sent = [self.send_cmd_async(cmd, timeout=timeout) for cmd in cmds]
+            for cmd in sent:
+                ret = cmd.get_ret()
+                ret = ret[0] if ret != protocol.TIMEOUT else ret
                 if ret != protocol.OK:
                     return ret
             return protocol.OK
@@ -981,11 +1044,10 @@ class Swift(Pump, Keys, Gripper, Grove):
                     return _ret
 
         if wait:
-            for cmd in cmds:
-                self.send_cmd_async(cmd, timeout=timeout, callback=_handle)
-            while len(rets) < len(cmds):
-                time.sleep(0.01)
-            for ret in rets:
+            sent = [self.send_cmd_async(cmd, timeout=timeout) for cmd in cmds]
+            for cmd in sent:
+                ret = cmd.get_ret()
+                ret = ret[0] if ret != protocol.TIMEOUT else ret
                 if ret != protocol.OK:
                     return ret
             return protocol.OK
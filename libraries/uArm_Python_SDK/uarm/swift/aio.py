@@ -0,0 +1,389 @@
+#!/usr/bin/env python3
+# Software License Agreement (BSD License)
+#
+# Copyright (c) 2018, UFACTORY, Inc.
+# All rights reserved.
+#
+# Author: Vinman <vinman.wen@ufactory.cc> <vinman.cub@gmail.com>
+
+import asyncio
+import time
+from . import protocol
+from ..comm.aio import AsyncSerial
+from ..utils.log import logger
+
+
+class AsyncSwift(object):
+    """
+    Swift driven by an asyncio event loop. Every command is a coroutine, the replies resolve asyncio futures
+    and the timeouts are timers of the loop, so several uArms can be driven from one loop without threads.
+    """
+    def __init__(self, port=None, baudrate=115200, **kwargs):
+        self.cmd_pend = {}
+        self.cmd_pend_size = kwargs.get('cmd_pend_size', 2)
+        if not isinstance(self.cmd_pend_size, int) or self.cmd_pend_size < 2:
+            self.cmd_pend_size = 2
+        self.cmd_timeout = kwargs.get('cmd_timeout', 2)
+        self._cnt = 1
+        self._window = None
+
+        self.device_type = None
+        self.hardware_version = None
+        self.firmware_version = None
+        self.api_version = None
+        self.device_unique = None
+        self.mode = None
+        self.power_status = False
+        self.is_moving = False
+        self.report_position = []
+        self._error = None
+
+        self._position = [200, 0, 150, 5000]  # [x, y, z, speed]
+        self._polar = [200, 90, 150, 5000]  # [stretch, rotation, height, speed]
+        self._angle_speed = 2000
+
+        # report prefix -> queues of the running report iterators
+        self._report_queues = {}
+
+        port = kwargs.get('dev_port', None) if kwargs.get('dev_port', None) is not None else port
+        baudrate = kwargs.get('baud', None) if kwargs.get('baud', None) is not None else baudrate
+        self.serial = AsyncSerial(port=port, baudrate=baudrate, filters=kwargs.get('filters', None),
+                                  line_callback=self._handle_line, com=kwargs.get('com', None))
+
+    @property
+    def connected(self):
+        return self.serial.connected
+
+    @property
+    def port(self):
+        return self.serial.port
+
+    @property
+    def baudrate(self):
+        return self.serial.baudrate
+
+    @property
+    def error(self):
+        return self._error
+
+    async def connect(self, port=None, baudrate=None):
+        await self.serial.connect(port, baudrate)
+        self._window = asyncio.Semaphore(self.cmd_pend_size)
+        self.serial.closed.add_done_callback(lambda _: self._connection_lost())
+        return self
+
+    def disconnect(self):
+        self.serial.disconnect()
+
+    def _connection_lost(self):
+        for cnt in list(self.cmd_pend.keys()):
+            self._resolve(cnt, protocol.TIMEOUT)
+        for queues in self._report_queues.values():
+            for queue in queues:
+                self._put_report(queue, None)
+        self.power_status = False
+
+    def _resolve(self, cnt, ret):
+        future = self.cmd_pend.pop(cnt, None)
+        if future is not None and not future.done():
+            future.set_result(ret)
+
+    def _handle_line(self, line):
+        if len(line) < 2:
+            return
+        if line.startswith('$'):
+            ret = line[1:].split(' ')
+            try:
+                cnt = int(ret[0])
+                ret[1] = ret[1].upper()
+            except:
+                return
+            self._resolve(cnt, ret[1:])
+        elif line.startswith('@'):
+            self._handle_report(line.split(' '))
+        elif line.startswith('Error'):
+            self._error = line
+            logger.error(line)
+
+    def _handle_report(self, ret):
+        if ret[0] == protocol.REPORT_POWER_PREFIX:
+            self.power_status = ret[1].upper() == 'V1'
+        elif ret[0] == protocol.REPORT_STOP_MOVE_PREFIX:
+            self.is_moving = ret[1].upper() == 'V1'
+        elif ret[0] == protocol.REPORT_POSITION_PREFIX:
+            self.report_position = list(map(lambda i: float(i[1:]), ret[1:]))
+        for queue in self._report_queues.get(ret[0], ()):
+            self._put_report(queue, ret)
+
+    @staticmethod
+    def _put_report(queue, item):
+        # slow consumers only miss old reports
+        if queue.full():
+            queue.get_nowait()
+        queue.put_nowait(item)
+
+    async def reports(self, prefix=protocol.REPORT_POSITION_PREFIX, maxsize=100):
+        """
+        Async iterator over the report lines with the prefix, split by spaces.
+        It ends when the connection is closed.
+        """
+        queue = asyncio.Queue(maxsize)
+        self._report_queues.setdefault(prefix, set()).add(queue)
+        try:
+            while True:
+                item = await queue.get()
+                if item is None:
+                    return
+                yield item
+        finally:
+            self._report_queues[prefix].discard(queue)
+
+    async def positions(self, maxsize=100):
+        """
+        Async iterator over the reported positions [x, y, z, ...], see set_report_position
+        """
+        async for ret in self.reports(protocol.REPORT_POSITION_PREFIX, maxsize):
+            yield list(map(lambda i: float(i[1:]), ret[1:]))
+
+    async def send_cmd_async(self, msg=None, timeout=None):
+        """
+        Send a command, waits only for a free slot of the command window
+        :return: asyncio future, the result is the reply or 'TIMEOUT'
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        if not isinstance(msg, str) or not msg:
+            future.set_result(protocol.OK)
+            return future
+        if not self.connected:
+            future.set_result(protocol.TIMEOUT)
+            return future
+        timeout = timeout if isinstance(timeout, (int, float)) else self.cmd_timeout
+        await self._window.acquire()
+        cnt = self._cnt
+        self._cnt = self._cnt + 1 if self._cnt < 9999 else 1
+        self.cmd_pend[cnt] = future
+        timer = loop.call_later(timeout, self._resolve, cnt, protocol.TIMEOUT)
+
+        def _done(_):
+            timer.cancel()
+            self._window.release()
+        future.add_done_callback(_done)
+        self.serial.write('#{cnt} {msg}'.format(cnt=cnt, msg=msg))
+        return future
+
+    async def send_cmd_sync(self, msg=None, timeout=None):
+        future = await self.send_cmd_async(msg, timeout=timeout)
+        return await future
+
+    async def _send(self, cmd, timeout=None, wait=True):
+        """
+        Send a command whose reply is only 'OK' or an error code
+        """
+        future = await self.send_cmd_async(cmd, timeout=timeout)
+        if not wait:
+            # the future resolves to 'OK' or the error code like the waiting call
+            result = asyncio.get_running_loop().create_future()
+            future.add_done_callback(lambda f: result.set_result(self._first(f.result())))
+            return result
+        return self._first(await future)
+
+    @staticmethod
+    def _first(ret):
+        return ret[0] if ret != protocol.TIMEOUT else ret
+
+    async def _get_values(self, cmd, timeout=None):
+        """
+        Send a query whose reply is 'OK' followed by prefixed numbers like X150.0
+        """
+        ret = await self.send_cmd_sync(cmd, timeout=timeout)
+        if ret == protocol.TIMEOUT:
+            return ret
+        if ret[0] == protocol.OK:
+            return list(map(lambda i: float(i[1:]), ret[1:]))
+        return ret[0]
+
+    async def _get_flag(self, cmd, timeout=None):
+        """
+        Send a query whose reply is 'OK V<number>'
+        """
+        ret = await self.send_cmd_sync(cmd, timeout=timeout)
+        if ret != protocol.TIMEOUT and ret[0] == protocol.OK and len(ret) > 1:
+            return int(ret[1][1:])
+        return ret if ret == protocol.TIMEOUT else ret[0]
+
+    async def waiting_ready(self, timeout=5):
+        start_time = time.monotonic()
+        while time.monotonic() - start_time < timeout:
+            if await self.get_power_status(timeout=0.5):
+                break
+        return self.power_status
+
+    async def get_power_status(self, timeout=None):
+        value = await self._get_flag(protocol.GET_POWER_STATUS, timeout=timeout)
+        if isinstance(value, int):
+            self.power_status = bool(value)
+        return self.power_status
+
+    async def get_device_info(self, timeout=None):
+        if not isinstance(timeout, (int, float)) or timeout <= 0:
+            timeout = 10
+        keys = {
+            'device_type': protocol.GET_DEVICE_TYPE,
+            'hardware_version': protocol.GET_HARDWARE_VERSION,
+            'firmware_version': protocol.GET_FIRMWARE_VERSION,
+            'api_version': protocol.GET_API_VERSION,
+            'device_unique': protocol.GET_DEVICE_UNIQUE,
+        }
+        futures = {key: await self.send_cmd_async(cmd, timeout=timeout) for key, cmd in keys.items()
+                   if getattr(self, key) is None}
+        for key, future in futures.items():
+            ret = await future
+            if ret != protocol.TIMEOUT and ret[0] == protocol.OK and len(ret) > 1:
+                value = ret[1]
+                setattr(self, key, value[1:] if value.startswith(('v', 'V')) else value)
+        return {key: getattr(self, key) for key in keys}
+
+    async def reset(self, speed=None, timeout=None, x=200, y=0, z=150):
+        await self.set_servo_attach(timeout=timeout)
+        await self.set_position(x=x, y=y, z=z, speed=speed, wait=True, timeout=timeout)
+        await self.set_pump(False, timeout=timeout)
+        await self.set_gripper(False, timeout=timeout)
+        return await self.set_wrist(90, wait=True, timeout=timeout)
+
+    async def get_mode(self, timeout=None):
+        value = await self._get_flag(protocol.GET_MODE, timeout=timeout)
+        if isinstance(value, int):
+            self.mode = value
+        return self.mode
+
+    async def set_mode(self, mode=0, timeout=None):
+        if await self._send(protocol.SET_MODE.format(mode), timeout=timeout) == protocol.OK:
+            await self.get_mode(timeout=1)
+        return self.mode
+
+    async def get_position(self, timeout=None):
+        return await self._get_values(protocol.GET_POSITION, timeout=timeout)
+
+    async def set_position(self, x=None, y=None, z=None, speed=None, relative=False, wait=True, timeout=10, cmd='G0'):
+        """
+        :param wait: wait for the reply, else the future of the reply is returned after sending
+        """
+        if relative:
+            values = []
+            for value in (x, y, z):
+                try:
+                    values.append(float(value))
+                except:
+                    values.append(0)
+            try:
+                speed = float(speed)
+            except:
+                speed = self._position[3]
+            msg = protocol.SET_POSITION_RELATIVE.format(*values, speed)
+        else:
+            for i, value in enumerate((x, y, z, speed)):
+                try:
+                    self._position[i] = float(value)
+                except:
+                    pass
+            msg = protocol.SET_POSITION.format(cmd, *self._position)
+        return await self._send(msg, timeout=10 if timeout is None else timeout, wait=wait)
+
+    async def get_polar(self, timeout=None):
+        return await self._get_values(protocol.GET_POLAR, timeout=timeout)
+
+    async def set_polar(self, stretch=None, rotation=None, height=None, speed=None, relative=False, wait=True,
+                        timeout=10):
+        """
+        :param wait: wait for the reply, else the future of the reply is returned after sending
+        """
+        if relative:
+            values = []
+            for value in (stretch, rotation, height):
+                try:
+                    values.append(float(value))
+                except:
+                    values.append(0)
+            try:
+                speed = float(speed)
+            except:
+                speed = self._polar[3]
+            msg = protocol.SET_POLAR_RELATIVE.format(*values, speed)
+        else:
+            for i, value in enumerate((stretch, rotation, height, speed)):
+                try:
+                    self._polar[i] = float(value)
+                except:
+                    pass
+            msg = protocol.SET_POLAR.format(*self._polar)
+        return await self._send(msg, timeout=10 if timeout is None else timeout, wait=wait)
+
+    async def set_servo_angle(self, servo_id=0, angle=90, wait=True, timeout=10, speed=None):
+        """
+        :param wait: wait for the reply, else the future of the reply is returned after sending
+        """
+        try:
+            self._angle_speed = float(speed)
+        except:
+            pass
+        msg = protocol.SET_SERVO_ANGLE.format(servo_id, angle, self._angle_speed)
+        return await self._send(msg, timeout=timeout, wait=wait)
+
+    async def set_wrist(self, angle=90, wait=True, timeout=10, speed=None):
+        return await self.set_servo_angle(servo_id=3, angle=angle, wait=wait, timeout=timeout, speed=speed)
+
+    async def set_servo_attach(self, servo_id=None, timeout=2):
+        if servo_id is None:
+            msg = protocol.SET_ATTACH_ALL_SERVO
+        else:
+            msg = protocol.SET_ATTACH_SERVO.format(servo_id)
+        return await self._send(msg, timeout=timeout)
+
+    async def set_servo_detach(self, servo_id=None, timeout=2):
+        if servo_id is None:
+            msg = protocol.SET_DETACH_ALL_SERVO
+        else:
+            msg = protocol.SET_DETACH_SERVO.format(servo_id)
+        return await self._send(msg, timeout=timeout)
+
+    async def set_pump(self, on=False, timeout=None):
+        return await self._send(protocol.SET_PUMP.format(1 if on else 0), timeout=timeout)
+
+    async def get_pump_status(self, timeout=None):
+        return await self._get_flag(protocol.GET_PUMP, timeout=timeout)
+
+    async def set_gripper(self, catch=False, timeout=None):
+        return await self._send(protocol.SET_GRIPPER.format(1 if catch else 0), timeout=timeout)
+
+    async def get_is_moving(self, timeout=None):
+        value = await self._get_flag(protocol.GET_IS_MOVE, timeout=timeout)
+        if isinstance(value, int):
+            self.is_moving = bool(value)
+        return self.is_moving
+
+    async def set_report_position(self, interval=0, timeout=None):
+        assert isinstance(interval, (int, float)) and interval >= 0
+        return await self._send(protocol.SET_REPORT_POSITION.format(interval), timeout=timeout)
+
+    async def flush_cmd(self, timeout=None, wait_stop=False):
+        start_time = time.monotonic()
+        pending = list(self.cmd_pend.values())
+        if pending:
+            _, pending = await asyncio.wait(pending, timeout=timeout)
+            if pending:
+                return protocol.TIMEOUT
+        if wait_stop:
+            while self.connected and await self.get_is_moving(timeout=1):
+                if timeout is not None and time.monotonic() - start_time >= timeout:
+                    self.is_moving = False
+                    return protocol.TIMEOUT
+            self.is_moving = False
+        return protocol.OK
+
+    def emergency_stop(self):
+        # the pending commands return TIMEOUT, the firmware drops all buffered moves
+        for cnt in list(self.cmd_pend.keys()):
+            self._resolve(cnt, protocol.TIMEOUT)
+        self.serial.write(protocol.QUICK_STOP)
+        self.is_moving = False
@@ -6,7 +6,7 @@
 #
 # Author: Vinman <vinman.wen@ufactory.cc> <vinman.cub@gmail.com>
 
-import time
+import threading
 
 
 class MultiSwiftAPI(object):
@@ -15,16 +15,29 @@ class MultiSwiftAPI(object):
         self.multi_cmd_sync('waiting_ready')
 
     def multi_reset(self, speed=10000):
-        self.multi_cmd_sync('reset', speed=speed)
-        time.sleep(2)
+        # multi_cmd_sync waits until all arms stopped
+        return self.multi_cmd_sync('reset', speed=speed)
 
     def multi_cmd_sync(self, cmd, *args, **kwargs):
         kwargs.pop('wait', False)
         for swift in self.swifts:
             swift_cmd = getattr(swift, cmd)
             swift_cmd(*args, wait=False, **kwargs)
-        self.multi_flush_cmd(kwargs.get('timeout', None))
+        return self.multi_flush_cmd(kwargs.get('timeout', None))
 
     def multi_flush_cmd(self, timeout=None):
-        for swift in self.swifts:
-            swift.flush_cmd(timeout=timeout, wait_stop=True)
+        """
+        Wait until the commands of all arms returned and all arms stopped, the arms are waited for concurrently
+        :return: list of 'OK' or 'TIMEOUT' per arm
+        """
+        results = ['TIMEOUT'] * len(self.swifts)
+
+        def flush(index):
+            results[index] = self.swifts[index].flush_cmd(timeout=timeout, wait_stop=True)
+
+        threads = [threading.Thread(target=flush, args=(index,), daemon=True) for index in range(len(self.swifts))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
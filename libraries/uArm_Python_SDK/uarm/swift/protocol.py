@@ -43,6 +43,7 @@ CLOSE_FAN = "M107"
 SET_ACC = "M204 A{}"
 SET_DIGITAL_OUTPUT = "M2240 N{} V{}"
 SET_DIGITAL_DIRECTION = "M2241 N{} V{}"
+QUICK_STOP = "M410"  # stop all steppers immediately, sent without counter
 
 # Get Cmd
 GET_PUMP = "P2231"
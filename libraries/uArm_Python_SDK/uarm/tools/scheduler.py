@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# Software License Agreement (BSD License)
+#
+# Copyright (c) 2018, UFactory, Inc.
+# All rights reserved.
+#
+# Author: Vinman <vinman.wen@ufactory.cc> <vinman.cub@gmail.com>
+
+import time
+import heapq
+import itertools
+import threading
+from ..utils.log import logger
+
+
+class TimeoutScheduler(object):
+    """
+    Runs timeout callbacks on one thread, the deadlines are kept in a heap.
+    Cancelled entries stay in the heap and are skipped when they expire.
+    """
+
+    def __init__(self):
+        self._heap = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._thread = None
+
+    def schedule(self, timeout, callback):
+        """
+        Call callback after timeout seconds
+        :param timeout: seconds
+        :param callback: function without arguments
+        :return: entry for cancel()
+        """
+        entry = [time.monotonic() + timeout, next(self._seq), callback]
+        with self._cond:
+            heapq.heappush(self._heap, entry)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+            if self._heap[0] is entry:
+                # the earliest deadline changed
+                self._cond.notify()
+        return entry
+
+    @staticmethod
+    def cancel(entry):
+        """
+        Do not call the callback of the entry
+        :param entry: return value of schedule()
+        """
+        entry[2] = None
+
+    def __len__(self):
+        with self._cond:
+            return len(self._heap)
+
+    def _run(self):
+        logger.debug('timeout scheduler thread start ...')
+        while True:
+            with self._cond:
+                while not self._heap:
+                    self._cond.wait()
+                deadline, _, callback = self._heap[0]
+                if callback is not None:
+                    delay = deadline - time.monotonic()
+                    if delay > 0:
+                        self._cond.wait(delay)
+                        continue
+                heapq.heappop(self._heap)
+            if callback is not None:
+                try:
+                    callback()
+                except Exception as e:
+                    logger.error('timeout callback error: {}'.format(e))
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler():
+    """
+    The scheduler shared by all uArms of the process
+    :return: TimeoutScheduler
+    """
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = TimeoutScheduler()
+        return _scheduler
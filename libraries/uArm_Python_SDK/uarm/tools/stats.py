@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+# Software License Agreement (BSD License)
+#
+# Copyright (c) 2018, UFactory, Inc.
+# All rights reserved.
+#
+# Author: Vinman <vinman.wen@ufactory.cc> <vinman.cub@gmail.com>
+
+import math
+import json
+import time
+import threading
+from collections import deque
+from ..utils.log import logger
+from .scheduler import get_scheduler
+
+PHASES = ('queue', 'wire', 'response', 'total')
+
+
+class Histogram(object):
+    """
+    Histogram with logarithmic buckets: bucket i counts the values up to MIN_VALUE * 2 ** i seconds
+    """
+    MIN_VALUE = 1e-5
+    BUCKETS = 24  # up to 84s
+
+    def __init__(self):
+        self.buckets = [0] * (self.BUCKETS + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.min = None
+        self.max = None
+
+    def add(self, value):
+        value = max(value, 0.0)
+        index = 0 if value <= self.MIN_VALUE else int(math.ceil(math.log2(value / self.MIN_VALUE)))
+        self.buckets[min(index, self.BUCKETS)] += 1
+        self.count += 1
+        self.sum += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    @property
+    def mean(self):
+        return self.sum / self.count if self.count else 0.0
+
+    def percentile(self, percent):
+        """
+        Estimated percentile, the upper bound of the bucket which contains it
+        :param percent: 0 ... 100
+        """
+        if not self.count:
+            return 0.0
+        rank = percent / 100.0 * self.count
+        seen = 0
+        for index, count in enumerate(self.buckets):
+            seen += count
+            if seen >= rank and count:
+                # the last bucket has no upper bound
+                if index == self.BUCKETS:
+                    return self.max
+                return min(self.MIN_VALUE * 2 ** index, self.max)
+        return self.max
+
+    def to_dict(self):
+        return {
+            'count': self.count,
+            'mean': self.mean,
+            'min': self.min or 0.0,
+            'max': self.max or 0.0,
+            'p50': self.percentile(50),
+            'p95': self.percentile(95),
+            'p99': self.percentile(99),
+            'buckets': {'{:g}'.format(self.MIN_VALUE * 2 ** index): count
+                        for index, count in enumerate(self.buckets) if count},
+        }
+
+
+class CommandStats(object):
+    """
+    Per command latency of a uArm, split into the phases
+        queue: waiting for a free place in the cmd cache (cmd_pend_size)
+        wire: writing the command to the serial port (including the tx queue)
+        response: from the write until the '$cnt' reply of the firmware
+        total: from the call until the reply or timeout
+    The phases are kept as histograms per command name (e.g. 'G0', 'M2200') and the last commands as
+    Chrome trace spans, which can be opened in chrome://tracing or https://ui.perfetto.dev
+    """
+    def __init__(self, name='uArm', trace_size=10000):
+        """
+        :param name: process name in the trace, e.g. the port
+        :param trace_size: number of commands kept for the trace, the oldest are dropped
+        """
+        self.name = name
+        self._lock = threading.Lock()
+        self._histograms = {}
+        self._timeouts = {}
+        self._trace = deque(maxlen=trace_size)
+        self._origin = time.monotonic()
+        self._dump_entry = None
+        self._dump_interval = None
+        # a running dump finishes before stop_dump returns and is not scheduled again
+        self._dump_lock = threading.RLock()
+
+    def record(self, name, cnt, msg, request_time, start_time, sent_time, finish_time, timed_out):
+        """
+        Record a finished command, all times are time.monotonic()
+        :param sent_time: None if the command was not written
+        """
+        phases = {'queue': (request_time, start_time), 'total': (request_time, finish_time)}
+        if sent_time is not None:
+            phases['wire'] = (start_time, sent_time)
+            phases['response'] = (sent_time, finish_time)
+        with self._lock:
+            histograms = self._histograms.get(name)
+            if histograms is None:
+                histograms = self._histograms[name] = {phase: Histogram() for phase in PHASES}
+            for phase, (begin, end) in phases.items():
+                # a timeout says nothing about the response time of the firmware
+                if phase != 'response' or not timed_out:
+                    histograms[phase].add(end - begin)
+            if timed_out:
+                self._timeouts[name] = self._timeouts.get(name, 0) + 1
+            self._trace.append((name, cnt, msg, phases, timed_out))
+
+    def reset(self):
+        with self._lock:
+            self._histograms = {}
+            self._timeouts = {}
+            self._trace.clear()
+
+    def summary(self):
+        """
+        :return: {cmd name: {'timeouts': n, 'queue': histogram, 'wire': ..., 'response': ..., 'total': ...}},
+            the times are in seconds
+        """
+        with self._lock:
+            result = {}
+            for name, histograms in self._histograms.items():
+                result[name] = {phase: histogram.to_dict() for phase, histogram in histograms.items()}
+                result[name]['timeouts'] = self._timeouts.get(name, 0)
+            return result
+
+    def format_summary(self):
+        lines = ['{:<8} {:>7} {:>8} {:>10} {:>10} {:>10} {:>10}'.format(
+            'cmd', 'count', 'timeout', 'queue ms', 'wire ms', 'resp ms', 'p95 ms')]
+        for name, values in sorted(self.summary().items()):
+            lines.append('{:<8} {:>7} {:>8} {:>10.3f} {:>10.3f} {:>10.3f} {:>10.3f}'.format(
+                name, values['total']['count'], values['timeouts'], values['queue']['mean'] * 1000,
+                values['wire']['mean'] * 1000, values['response']['mean'] * 1000, values['total']['p95'] * 1000))
+        return '\n'.join(lines)
+
+    def chrome_trace(self):
+        """
+        :return: the recorded commands in the Chrome trace event format
+        """
+        events = [{'name': 'process_name', 'ph': 'M', 'pid': self.name, 'args': {'name': self.name}}]
+        with self._lock:
+            trace = list(self._trace)
+        for name, cnt, msg, phases, timed_out in trace:
+            for phase in ('queue', 'wire', 'response'):
+                if phase not in phases:
+                    continue
+                begin, end = phases[phase]
+                events.append({
+                    'name': name if not timed_out else '{} TIMEOUT'.format(name),
+                    'cat': phase,
+                    'ph': 'X',
+                    'ts': (begin - self._origin) * 1e6,
+                    'dur': (end - begin) * 1e6,
+                    'pid': self.name,
+                    'tid': phase,
+                    'args': {'cnt': cnt, 'msg': msg, 'timeout': timed_out},
+                })
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def export_chrome_trace(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.chrome_trace(), f)
+
+    def start_dump(self, interval, dump=None):
+        """
+        Dump the summary periodically on the shared scheduler thread
+        :param interval: seconds
+        :param dump: called with the formatted summary, default is logger.info
+        """
+        with self._dump_lock:
+            self.stop_dump()
+            self._dump_interval = interval
+            self._dump = dump if callable(dump) else logger.info
+            self._dump_entry = get_scheduler().schedule(interval, self._periodic_dump)
+
+    def stop_dump(self):
+        with self._dump_lock:
+            if self._dump_entry is not None:
+                get_scheduler().cancel(self._dump_entry)
+                self._dump_entry = None
+
+    def _periodic_dump(self):
+        with self._dump_lock:
+            if self._dump_entry is None:
+                return
+            self._dump_entry = get_scheduler().schedule(self._dump_interval, self._periodic_dump)
+            self._dump(self.format_summary())
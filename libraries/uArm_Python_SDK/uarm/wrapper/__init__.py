@@ -1 +1,2 @@
 from .swift_api import SwiftAPI
+from .async_swift_api import AsyncSwiftAPI
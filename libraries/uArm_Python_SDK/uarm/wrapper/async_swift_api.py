@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+# Software License Agreement (BSD License)
+#
+# Copyright (c) 2018, UFACTORY, Inc.
+# All rights reserved.
+#
+# Author: Vinman <vinman.wen@ufactory.cc> <vinman.cub@gmail.com>
+
+from ..swift.aio import AsyncSwift
+
+
+class AsyncSwiftAPI(object):
+    def __init__(self, port=None, baudrate=115200, **kwargs):
+        """
+        The asyncio API wrapper of Swift and SwiftPro, all commands are coroutines.
+        The port is opened with connect() or 'async with', several uArms can share one event loop:
+            async with AsyncSwiftAPI(port='/dev/ttyACM0') as swift:
+                await swift.set_position(x=200, y=0, z=100)
+        :param port: default is to select the first port
+        :param baudrate: default is 115200
+        :param kwargs:
+            dev_port: compatible the pyuf params, default is None
+            baud: compatible the pyuf params, default is None
+            filters: like {'hwid': 'USB VID:PID=2341:0042'}
+            cmd_pend_size: cmd cache size, default is 2
+            cmd_timeout: cmd wait response timeout, default is 2
+            com: an opened serial port like object, default is None (open the port)
+        """
+        self._arm = AsyncSwift(port=port, baudrate=baudrate, **kwargs)
+
+    async def __aenter__(self):
+        await self.connect()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        self.disconnect()
+
+    @property
+    def connected(self):
+        return self._arm.connected
+
+    @property
+    def port(self):
+        return self._arm.port
+
+    @property
+    def baudrate(self):
+        return self._arm.baudrate
+
+    @property
+    def power_status(self):
+        return self._arm.power_status
+
+    @property
+    def mode(self):
+        return self._arm.mode
+
+    @property
+    def error(self):
+        return self._arm.error
+
+    @property
+    def device_type(self):
+        return self._arm.device_type
+
+    @property
+    def hardware_version(self):
+        return self._arm.hardware_version
+
+    @property
+    def firmware_version(self):
+        return self._arm.firmware_version
+
+    async def connect(self, port=None, baudrate=None):
+        """
+        Connect
+        :param port: default is use the port in initialization
+        :param baudrate: default is use the baudrate in initialization
+        """
+        await self._arm.connect(port=port, baudrate=baudrate)
+        return self
+
+    def disconnect(self):
+        """
+        Disconnect, the pending commands return 'TIMEOUT' and the report iterators end
+        """
+        return self._arm.disconnect()
+
+    async def waiting_ready(self, timeout=5):
+        """
+        Waiting the uArm ready
+        :param timeout: waiting timeout, defualt is 5s
+        :return: power status
+        """
+        return await self._arm.waiting_ready(timeout=timeout)
+
+    async def send_cmd_sync(self, msg=None, timeout=None):
+        """
+        Send cmd and wait for the reply
+        :param msg: cmd, example: G0 X150 F1000
+        :param timeout: timeout of waiting, default is use the default cmd timeout
+        :return: result
+        """
+        return await self._arm.send_cmd_sync(msg=msg, timeout=timeout)
+
+    async def send_cmd_async(self, msg=None, timeout=None):
+        """
+        Send cmd, only waits for a free place in the cmd cache
+        :param msg: cmd
+        :param timeout: timeout, default is use the default cmd timeout
+        :return: asyncio future, the result is the reply or 'TIMEOUT'
+        """
+        return await self._arm.send_cmd_async(msg=msg, timeout=timeout)
+
+    async def get_power_status(self, timeout=None):
+        """
+        Get the power status
+        :param timeout: timeout, default is use the default cmd timeout
+        :return: power status
+        """
+        return await self._arm.get_power_status(timeout=timeout)
+
+    async def get_device_info(self, timeout=None):
+        """
+        Get the device info
+        :param timeout: timeout, default is 10s
+        :return: dict with device_type, hardware_version, firmware_version, api_version, device_unique
+        """
+        return await self._arm.get_device_info(timeout=timeout)
+
+    async def reset(self, speed=None, timeout=None, x=200, y=0, z=150):
+        """
+        Reset the uArm
+        :param speed: reset speed, default is the last speed in use or 1000
+        :param timeout: timeout, default is 10s
+        :param x: reset-position-x, default is 200
+        :param y: reset-position-y, default is 0
+        :param z: reset-position-z, default is 150
+        """
+        return await self._arm.reset(speed=speed, timeout=timeout, x=x, y=y, z=z)
+
+    async def get_mode(self, timeout=None):
+        """
+        Get the mode, only support SwiftPro
+        :param timeout: timeout, default is use the default cmd timeout
+        :return: mode
+        """
+        return await self._arm.get_mode(timeout=timeout)
+
+    async def set_mode(self, mode=0, timeout=None):
+        """
+        Set the mode, only support SwiftPro
+        :param mode: mode, 0: general mode, 1: laser mode, 2: 3D Print mode, 3: pen/gripper mode
+        :param timeout: timeout, default is use the default cmd timeout
+        :return: mode
+        """
+        return await self._arm.set_mode(mode=mode, timeout=timeout)
+
+    async def get_position(self, timeout=None):
+        """
+        Get the position
+        :param timeout: timeout, default is use the default cmd timeout
+        :return: [x, y, z] or 'TIMEOUT'
+        """
+        return await self._arm.get_position(timeout=timeout)
+
+    async def set_position(self, x=None, y=None, z=None, speed=None, relative=False, wait=True, timeout=10, cmd='G0'):
+        """
+        Set the position
+        :param x: (mm) location X, default is the last x in use or 150
+        :param y: (mm) location Y, default is the last y in use or 0
+        :param z: (mm) location Z, default is the last z in use or 150
+        :param speed: (mm/min) speed of move, default is the last speed in use or 1000
+        :param relative: True/False, dafaule is False
+        :param wait: True/False, deault is True, if False the future of the reply is returned after sending
+        :param timeout: timeout, default is 10s
+        :param cmd: 'GO' or 'G1', default is 'G0'
+        :return: 'OK' or 'TIMEOUT' if wait is True else future
+        """
+        return await self._arm.set_position(x=x, y=y, z=z, speed=speed, relative=relative, wait=wait,
+                                            timeout=timeout, cmd=cmd)
+
+    async def get_polar(self, timeout=None):
+        """
+        Get the polar coordinate
+        :param timeout: timeout, default is use the default cmd timeout
+        :return: [stretch, rotation, height] or 'TIMEOUT'
+        """
+        return await self._arm.get_polar(timeout=timeout)
+
+    async def set_polar(self, stretch=None, rotation=None, height=None, speed=None, relative=False, wait=True,
+                        timeout=10):
+        """
+        Set the polar coordinate
+        :param stretch: (mm), default is the last stretch in use or 200
+        :param rotation: (degree), default is the last rotation in use or 90
+        :param height: (mm), default is the last height in use or 150
+        :param speed: (mm/min) speed of move, default is the last speed in use or 1000
+        :param relative: True/False, dafaule is False
+        :param wait: True/False, deault is True, if False the future of the reply is returned after sending
+        :param timeout: timeout, default is 10s
+        :return: 'OK' or 'TIMEOUT' if wait is True else future
+        """
+        return await self._arm.set_polar(stretch=stretch, rotation=rotation, height=height, speed=speed,
+                                         relative=relative, wait=wait, timeout=timeout)
+
+    async def set_servo_angle(self, servo_id=0, angle=90, wait=True, timeout=10, speed=None):
+        """
+        Set the servo angle
+        :param servo_id: 0/1/2/3
+        :param angle: (degree)
+        :param wait: True/False, deault is True, if False the future of the reply is returned after sending
+        :param timeout: timeout, default is 10s
+        :param speed: speed of move, default is the last speed in use
+        :return: 'OK' or 'TIMEOUT' if wait is True else future
+        """
+        return await self._arm.set_servo_angle(servo_id=servo_id, angle=angle, wait=wait, timeout=timeout,
+                                               speed=speed)
+
+    async def set_wrist(self, angle=90, wait=True, timeout=10, speed=None):
+        """
+        Set the wrist angle (SERVO HAND)
+        :param angle: (degree)
+        :param wait: True/False, deault is True, if False the future of the reply is returned after sending
+        :param timeout: timeout, default is 10s
+        :param speed: speed of move, default is the last speed in use
+        :return: 'OK' or 'TIMEOUT' if wait is True else future
+        """
+        return await self._arm.set_wrist(angle=angle, wait=wait, timeout=timeout, speed=speed)
+
+    async def set_servo_attach(self, servo_id=None, timeout=2):
+        """
+        Attach the servo
+        :param servo_id: 0/1/2/3, default is None (attach all servo)
+        :param timeout: timeout, default is 2s
+        :return: 'OK' or 'TIMEOUT'
+        """
+        return await self._arm.set_servo_attach(servo_id=servo_id, timeout=timeout)
+
+    async def set_servo_detach(self, servo_id=None, timeout=2):
+        """
+        Detach the servo
+        :param servo_id: 0/1/2/3, default is None (detach all servo)
+        :param timeout: timeout, default is 2s
+        :return: 'OK' or 'TIMEOUT'
+        """
+        return await self._arm.set_servo_detach(servo_id=servo_id, timeout=timeout)
+
+    async def set_pump(self, on=False, timeout=None):
+        """
+        Control the pump
+        :param on: True/False
+        :param timeout: timeout, default is use the default cmd timeout
+        :return: 'OK' or 'TIMEOUT'
+        """
+        return await self._arm.set_pump(on=on, timeout=timeout)
+
+    async def get_pump_status(self, timeout=None):
+        """
+        Get the pump status
+        :param timeout: timeout, default is use the default cmd timeout
+        :return: 0: stop, 1: working, 2: pumping or 'TIMEOUT'
+        """
+        return await self._arm.get_pump_status(timeout=timeout)
+
+    async def set_gripper(self, catch=False, timeout=None):
+        """
+        Control the gripper
+        :param catch: True/False
+        :param timeout: timeout, default is use the default cmd timeout
+        :return: 'OK' or 'TIMEOUT'
+        """
+        return await self._arm.set_gripper(catch=catch, timeout=timeout)
+
+    async def get_is_moving(self, timeout=None):
+        """
+        Get the moving status
+        :param timeout: timeout, default is use the default cmd timeout
+        :return: True/False
+        """
+        return await self._arm.get_is_moving(timeout=timeout)
+
+    async def set_report_position(self, interval=0, timeout=None):
+        """
+        Report the position, read the reports with positions()
+        :param interval: report interval in seconds, 0 stops the report
+        :param timeout: timeout, default is use the default cmd timeout
+        :return: 'OK' or 'TIMEOUT'
+        """
+        return await self._arm.set_report_position(interval=interval, timeout=timeout)
+
+    def positions(self, maxsize=100):
+        """
+        Async iterator over the reported positions, ends when the connection is closed
+            async for x, y, z, *_ in swift.positions():
+                ...
+        :param maxsize: buffered reports, the oldest report is dropped if a reader is too slow
+        """
+        return self._arm.positions(maxsize=maxsize)
+
+    def reports(self, prefix, maxsize=100):
+        """
+        Async iterator over the report lines with the prefix (e.g. '@4' for the keys), split by spaces
+        :param prefix: report prefix
+        :param maxsize: buffered reports, the oldest report is dropped if a reader is too slow
+        """
+        return self._arm.reports(prefix=prefix, maxsize=maxsize)
+
+    async def flush_cmd(self, timeout=None, wait_stop=False):
+        """
+        Wait until all async command return or timeout
+        :param timeout: timeout, default is None(wait all async cmd return)
+        :param wait_stop: True/False, default is False, if set True, will waiting the uArm not in moving or timeout
+        :return: 'OK' or 'TIMEOUT'
+        """
+        return await self._arm.flush_cmd(timeout=timeout, wait_stop=wait_stop)
+
+    def emergency_stop(self):
+        """
+        Stop the uArm immediately: the pending commands return 'TIMEOUT' and the firmware drops all buffered moves
+        """
+        return self._arm.emergency_stop()
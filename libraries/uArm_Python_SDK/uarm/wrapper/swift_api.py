@@ -32,6 +32,9 @@ class SwiftAPI(object):
             enable_handle_thread: True/False, default is True
             enable_write_thread: True/False, default is False
             enable_handle_report_thread: True/False, default is False
+            enable_cmd_stats: True/False, default is False, record the latency of every command, see get_cmd_stats
+            cmd_stats_dump_interval: log the command statistics every n seconds, default is None (no log)
+            com: an opened serial port like object, e.g. comm.loopback.LoopbackSerial(), default is None (open the port)
         default cmd timeout is 2s
         """
         self._arm = Swift(port=port,
@@ -136,8 +139,9 @@ class SwiftAPI(object):
         :param msg: cmd
         :param timeout: timeout, default is use the default cmd timeout
         :param callback: callback, deault is None 
+        :return: concurrent.futures.Future, the result is the reply or 'TIMEOUT'
         """
-        self._arm.send_cmd_async(msg=msg, timeout=timeout, callback=callback)
+        return self._arm.send_cmd_async(msg=msg, timeout=timeout, callback=callback)
 
     def get_power_status(self, wait=True, timeout=None, callback=None):
         """
@@ -656,6 +660,49 @@ class SwiftAPI(object):
         """
         return self._arm.flush_cmd(timeout=timeout, wait_stop=wait_stop)
 
+    def emergency_stop(self):
+        """
+        Stop the uArm immediately: the pending async commands return 'TIMEOUT' and the firmware drops all buffered moves
+        :return: None
+        """
+        return self._arm.emergency_stop()
+
+    def enable_cmd_stats(self, enable=True, dump_interval=None, dump=None):
+        """
+        Record the latency of every command, the old statistics are dropped
+        :param enable: True/False, default is True
+        :param dump_interval: dump the statistics every n seconds, default is None (no dump)
+        :param dump: called with the formatted statistics, e.g. print, default is logger.info
+        :return: None
+        """
+        return self._arm.enable_cmd_stats(enable=enable, dump_interval=dump_interval, dump=dump)
+
+    def get_cmd_stats(self):
+        """
+        Get the latency statistics per command name (e.g. 'G0'), the times are in seconds:
+            queue: waiting for a free place in the cmd cache (cmd_pend_size)
+            wire: until the command is written to the serial port (tx queue)
+            response: from the write until the reply of the uArm
+            total: from the call until the reply or timeout
+        :return: {cmd: {'timeouts': n, 'queue': {'count', 'mean', 'min', 'max', 'p50', 'p95', 'p99', 'buckets'}, ...}}
+        """
+        return self._arm.get_cmd_stats()
+
+    def reset_cmd_stats(self):
+        """
+        Drop the recorded statistics
+        :return: None
+        """
+        return self._arm.reset_cmd_stats()
+
+    def export_cmd_trace(self, path):
+        """
+        Write the last recorded commands as Chrome trace (open in chrome://tracing or https://ui.perfetto.dev)
+        :param path: json file
+        :return: None
+        """
+        return self._arm.export_cmd_trace(path)
+
     def set_fans(self, on=False, wait=True, timeout=None, callback=None):
         """
         Control the fan, only support SwiftPro, will auto set the mode to 3D printing mode (2)
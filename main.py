@@ -9,9 +9,13 @@ import sys
 import argparse
 from PyQt5.QtWidgets import QApplication
 
+from src.config import Config
+from src.robot_error import RobotError
 from src.robot_editor import RobotEditor
+from src.multi_arm_editor import MultiArmEditor
 from src.robot_handler import RobotHandler
 from src.mock_robot_handler import MockRobotHandler
+from src.simulated_robot_handler import SimulatedRobotHandler
 
 
 def main():
@@ -21,10 +25,49 @@ def main():
     # Parser arguments, not implemented yet
     parser = argparse.ArgumentParser()
     parser.add_argument("--sim", help="Turn on simulation instead of connecting to the robot arm",type =bool, default = False)
+    parser.add_argument("--arms", help="Number of robot arms controlled by this program", type=int, default=1)
     args = parser.parse_args()
 
+    # --- read and validate the config file once, invalid values stop the program before connecting
+    try:
+        Config.instance()
+    except RobotError as error:
+        print("Error: " + error.message)
+        sys.exit(1)
 
-    if not args.sim:
+    robot_handlers = []
+    texts = []
+    for _ in range(max(args.arms, 1)):
+        robot_handler, text = connect(args.sim)
+        robot_handlers.append(robot_handler)
+        texts.append(text)
+
+    # --- start main loop
+    app = QApplication(sys.argv)
+    if len(robot_handlers) == 1:
+        writer = RobotEditor(robot_handlers[0])
+        writer.write(texts[0])
+    else:
+        writer = MultiArmEditor(robot_handlers)
+        for editor, text in zip(writer.editors, texts):
+            editor.write(text)
+    # --- end of main loop
+    run = app.exec_()
+
+    # disconnect robots when closing window
+    for robot_handler in robot_handlers:
+        robot_handler.disconnect()
+    sys.exit(run)
+
+
+def connect(sim):
+    """
+    Connect to the next robot arm.
+    :param sim: use the simulation instead of the robot arm
+    :type sim: bool
+    :return: robot handler and status text
+    """
+    if not sim:
         # --- try connecting to robot
         try:
             robot_handler = RobotHandler()
@@ -34,25 +77,10 @@ def main():
             robot_handler = MockRobotHandler()
             text = "Verbindung mit uArm fehlgeschlagen!"
             print("Error: " + str(error))
-    
-
     else:
-        # To do: Implement simulation here
-        robot_handler = MockRobotHandler()
+        robot_handler = SimulatedRobotHandler()
         text = "Starten von Simulation anstelle von uArm"
-
-    
-    
-    # --- start main loop
-    app = QApplication(sys.argv)
-    writer = RobotEditor(robot_handler)
-    writer.write(text)
-    # --- end of main loop
-    run = app.exec_()
-
-    # disconnect robot when closing window
-    robot_handler.disconnect()
-    sys.exit(run)
+    return robot_handler, text
 
 
 if __name__ == '__main__':
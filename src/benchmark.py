@@ -0,0 +1,263 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+This file contains the benchmark suite, which measures the SDK, the script parser, the challenge evaluation, the
+geometry and the simulated script execution without a robot. The results are stored as json to compare the runs
+before and after an optimization.
+
+Usage: python -m src.benchmark [--output FILE] [--compare BASELINE] [--quick]
+"""
+
+import io
+import sys
+import json
+import time
+import platform
+import argparse
+import contextlib
+import statistics
+
+from libraries.uArm_Python_SDK.uarm.wrapper import SwiftAPI
+from libraries.uArm_Python_SDK.uarm.comm.loopback import FakeFirmware, LoopbackSerial
+from src.geometry_helper import GeometryHelper
+from src.simulated_robot_handler import SimulatedRobotHandler
+from src.user_challenge import Block, BlockType, Challenge
+from src.user_script import UserScript
+
+# the sample solution of 'Brücke 1' (challenges/Sample solutions) without its title line
+SAMPLE_SCRIPT = """position(4, 3)\nhoehe(1)\npumpe_an()\nposition(4, 6)\npumpe_aus()
+position(7, 6)\npumpe_an()\nhoehe(2)\nposition(4, 6)\npumpe_aus()
+position(2, 12)\nhoehe(1)\npumpe_an()\nposition(4, 8)\npumpe_aus()
+position(5, 11)\npumpe_an()\nhoehe(2)\nposition(4, 8)\npumpe_aus()
+position(6, 6)\nhoehe(1)\npumpe_an()\nhoehe(3)\nposition(4, 7)\npumpe_aus()"""
+SAMPLE_CHALLENGE = 'Brücke 1'
+
+
+def best_of(function, repeat):
+    """
+    Run the function repeat times and return the shortest wall time, like timeit.
+    :param function: function without arguments
+    :type function: function
+    :param repeat: number of runs
+    :type repeat: int
+    :return: shortest wall time in seconds
+    :rtype: float
+    """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def bench_sdk(commands, latency=0.0, baudrate=0):
+    """
+    Round trip latency of send_cmd_sync and commands per second of send_cmd_sync and send_cmd_async against the
+    fake firmware of the loopback transport.
+    :param commands: number of commands per measurement
+    :type commands: int
+    :param latency: processing time of the fake firmware per command in seconds
+    :type latency: float
+    :param baudrate: transfer time of the lines, the default 0 measures only the overhead of the SDK
+    :type baudrate: int
+    :rtype: dict
+    """
+    swift = SwiftAPI(com=LoopbackSerial(FakeFirmware(latency=latency, baudrate=baudrate)), cmd_pend_size=8)
+    try:
+        swift.waiting_ready()
+        latencies = []
+        for _ in range(commands):
+            start = time.perf_counter()
+            swift.send_cmd_sync('P2220')
+            latencies.append(time.perf_counter() - start)
+        latencies.sort()
+        start = time.perf_counter()
+        for _ in range(commands):
+            swift.send_cmd_async('P2220')
+        swift.flush_cmd()
+        async_time = time.perf_counter() - start
+    finally:
+        swift.disconnect()
+    return {'sync_round_trip_ms': statistics.mean(latencies) * 1000,
+            'sync_round_trip_p95_ms': latencies[int(0.95 * (len(latencies) - 1))] * 1000,
+            'sync_cmds_per_s': len(latencies) / sum(latencies),
+            'async_cmds_per_s': commands / async_time}
+
+
+def bench_parse(lines, repeat):
+    """
+    Parse time of a large user script.
+    :param lines: number of script lines
+    :type lines: int
+    :param repeat: number of runs
+    :type repeat: int
+    :rtype: dict
+    """
+    pattern = ["position(4, 3)", "hoehe(1)", "pumpe_an()", "position(4, 6)", "hoehe(2)", "drehen(90)", "pumpe_aus()"]
+    input_string = "\n".join(pattern[i % len(pattern)] for i in range(lines))
+    robot_handler = SimulatedRobotHandler(time_warp=True)
+    with contextlib.redirect_stdout(io.StringIO()):
+        user_script = UserScript("", robot_handler, 'Testen')
+    parse_time = best_of(lambda: user_script.load_commands(input_string, robot_handler), repeat)
+    return {'lines': lines, 'parse_ms': parse_time * 1000, 'lines_per_s': lines / parse_time}
+
+
+def bench_challenge(block_counts, repeat):
+    """
+    Cost of Challenge.placeBlock (pick up and place every block once) and Challenge.success versus the number of
+    blocks.
+    :param block_counts: numbers of blocks
+    :type block_counts: list[int]
+    :param repeat: number of runs
+    :type repeat: int
+    :rtype: dict
+    """
+    results = {}
+    for count in block_counts:
+        challenge = Challenge('Benchmark')
+        challenge.add_block_type(BlockType('One', [1, 1]))
+        side = max(1, int(count ** 0.5))
+        positions = [[i % side, i // side, 1] for i in range(count)]
+        for position in positions:
+            challenge.add_start_position(Block(list(position), 'One'))
+            challenge.add_final_position(Block(list(position), 'One'))
+        challenge.reset()
+
+        def place_all():
+            for position in positions:
+                challenge.getBlock(list(position))
+                challenge.placeBlock(list(position))
+        with contextlib.redirect_stdout(io.StringIO()):
+            place_time = best_of(place_all, repeat)
+            success_time = best_of(challenge.success, repeat)
+        results[str(count)] = {'place_block_us': place_time / count * 1e6, 'success_ms': success_time * 1000}
+    return results
+
+
+def bench_geometry(poses, repeat):
+    """
+    Throughput of the scalar and the vectorized user to uArm transformation.
+    :param poses: number of poses
+    :type poses: int
+    :param repeat: number of runs
+    :type repeat: int
+    :rtype: dict
+    """
+    geometry_helper = GeometryHelper()
+    poses_user = [[4 + i % 4, 3 + i % 6, 1 + i % 3] for i in range(poses)]
+
+    def scalar():
+        for x_user, y_user, z_user in poses_user:
+            geometry_helper.transform_pose_user_to_uarm(x_user, y_user, z_user)
+    scalar_time = best_of(scalar, repeat)
+    vector_time = best_of(lambda: geometry_helper.transform_poses_user_to_uarm(poses_user), repeat)
+    return {'scalar_poses_per_s': poses / scalar_time, 'vectorized_poses_per_s': poses / vector_time}
+
+
+def bench_script(repeat, input_string=SAMPLE_SCRIPT, challenge=SAMPLE_CHALLENGE):
+    """
+    End to end wall time of a sample solution on the simulated robot in time-warp mode, plus the predicted robot
+    time of the plain, pipelined and optimized execution.
+    :param repeat: number of runs
+    :type repeat: int
+    :rtype: dict
+    """
+    results = {}
+    for mode, pipelined, optimize in (('plain', False, False), ('pipelined', True, False), ('optimized', True, True)):
+        robot_handler = SimulatedRobotHandler(time_warp=True)
+
+        def run():
+            robot_handler.reset_timer()
+            user_script = UserScript(input_string, robot_handler, challenge)
+            if user_script.run_script(robot_handler, pipelined, optimize) != challenge:
+                raise RuntimeError('the sample solution did not solve {}'.format(challenge))
+        with contextlib.redirect_stdout(io.StringIO()):
+            wall_time = best_of(run, repeat)
+        results[mode] = {'wall_ms': wall_time * 1000, 'predicted_robot_s': robot_handler.predicted_time}
+    return results
+
+
+def run_benchmarks(quick=False):
+    """
+    Run all benchmarks.
+    :param quick: smaller sizes, e.g. for a smoke test
+    :type quick: bool
+    :return: {'meta': ..., 'results': ...}
+    :rtype: dict
+    """
+    repeat = 1 if quick else 5
+    results = {
+        'sdk': bench_sdk(50 if quick else 500),
+        'parse': bench_parse(100 if quick else 5000, repeat),
+        'challenge': bench_challenge([10, 100] if quick else [10, 100, 1000], repeat),
+        'geometry': bench_geometry(100 if quick else 10000, repeat),
+        'script': bench_script(repeat),
+    }
+    meta = {'time': time.strftime('%Y-%m-%dT%H:%M:%S'), 'python': platform.python_version(),
+            'platform': platform.platform(), 'quick': quick}
+    return {'meta': meta, 'results': results}
+
+
+def flatten(results, prefix=''):
+    """
+    Flatten the nested results to {'group.name.metric': value}.
+    """
+    flat = {}
+    for key, value in results.items():
+        if isinstance(value, dict):
+            flat.update(flatten(value, prefix + key + '.'))
+        else:
+            flat[prefix + key] = value
+    return flat
+
+
+def compare(baseline, current):
+    """
+    Compare two benchmark runs.
+    :return: rows (metric, baseline, current, change in percent), metrics ending with _per_s are better if higher,
+             all others if lower
+    :rtype: list[tuple]
+    """
+    baseline = flatten(baseline['results'])
+    current = flatten(current['results'])
+    rows = []
+    for metric in sorted(set(baseline) & set(current)):
+        if baseline[metric] == 0:
+            continue
+        change = (current[metric] - baseline[metric]) / baseline[metric] * 100
+        rows.append((metric, baseline[metric], current[metric], change))
+    return rows
+
+
+def main():
+    """
+    Command line interface of the benchmark suite.
+    """
+    parser = argparse.ArgumentParser(description="Benchmark the SDK, the script parser, the challenges and the "
+                                                 "simulated script execution")
+    parser.add_argument("--output", default=None, help="json output file, default is stdout")
+    parser.add_argument("--compare", default=None, help="json file of an earlier run to compare with")
+    parser.add_argument("--quick", action="store_true", help="smaller sizes, e.g. for a smoke test")
+    args = parser.parse_args()
+
+    current = run_benchmarks(args.quick)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as output_file:
+            json.dump(current, output_file, indent=2, ensure_ascii=False)
+    elif not args.compare:
+        json.dump(current, sys.stdout, indent=2, ensure_ascii=False)
+        sys.stdout.write('\n')
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as baseline_file:
+            baseline = json.load(baseline_file)
+        for metric, before, after, change in compare(baseline, current):
+            better = change > 0 if metric.endswith('_per_s') else change < 0
+            print("{:<50} {:>14.4f} {:>14.4f} {:>+8.1f}% {}".format(metric, before, after, change,
+                                                                   'besser' if better else ''))
+
+
+if __name__ == '__main__':
+    main()
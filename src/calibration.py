@@ -0,0 +1,250 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+This file contains the Calibration class, which measures the settle times of the uArm actuators and stores the fitted
+settle models in the [CALIBRATION] section of config/config.ini.
+
+Usage: python -m src.calibration [--repeat N] [--rest SECONDS] [--dry-run]
+"""
+
+import re
+import json
+import time
+import argparse
+
+import numpy
+
+from libraries.uArm_Python_SDK.uarm.wrapper import SwiftAPI
+from src.config import Config
+from src.robot_error import ErrorCode, RobotError
+
+
+def fit_settle_model(samples, margin=0.0):
+    """
+    Fit a settle model seconds + seconds per unit * amount to the measurements. The line has the slope of the least
+    squares fit and is moved up until it covers all measurements, so no measured move waits too short.
+    :param samples: measured (amount, seconds) pairs, amount in mm or degrees
+    :type samples: list[tuple]
+    :param margin: safety margin in seconds which is added to the model
+    :type margin: float
+    :return: [seconds, seconds per unit]
+    :rtype: list[float]
+    """
+    amounts = numpy.array([amount for amount, _ in samples], dtype=float)
+    seconds = numpy.array([settle for _, settle in samples], dtype=float)
+    per_unit = 0.0
+    if len(numpy.unique(amounts)) > 1:
+        per_unit = max(0.0, float(numpy.polyfit(amounts, seconds, 1)[0]))
+    base = max(0.0, float(numpy.max(seconds - per_unit * amounts)))
+    return [round(base + margin, 4), round(per_unit, 6)]
+
+
+def write_calibration(models, path=None):
+    """
+    Replace the options of the [CALIBRATION] section in the config file, the comments and the other sections are
+    kept.
+    :param models: option name and value, e.g. {'settle_xy': [0.05, 0.0002]}
+    :type models: dict
+    :param path: path of the config file, None uses config/config.ini
+    :type path: str
+    """
+    path = path or Config.default_path()
+    with open(path, encoding='utf-8') as config_file:
+        lines = config_file.readlines()
+    section = None
+    written = set()
+    for index, line in enumerate(lines):
+        header = re.match(r"\s*\[(\w+)\]", line)
+        option = re.match(r"\s*(\w+)\s*=", line)
+        if header:
+            section = header.group(1)
+        elif section == 'CALIBRATION' and option and option.group(1) in models:
+            name = option.group(1)
+            lines[index] = "{} = {}\n".format(name, json.dumps(models[name]))
+            written.add(name)
+    missing = sorted(set(models) - written)
+    if missing:
+        message = "In der Konfigurationsdatei fehlt der Eintrag {} im Abschnitt [CALIBRATION].".format(missing[0])
+        raise RobotError(ErrorCode.E0016, message)
+    with open(path, 'w', encoding='utf-8') as config_file:
+        config_file.writelines(lines)
+
+
+class Calibration:
+    """
+    Exercises each actuator of a connected uArm with moves of different sizes and measures how long the arm needs to
+    come to rest after the firmware reported the end of the move (flush_cmd with wait_stop), like MotionSync waits:
+        xy: travel in the xy plane versus distance
+        z: travel in z direction versus distance
+        wrist: wrist rotation versus angle
+        pump: turning the pump on and off
+    The arm is at rest when the angles of the base and arm servos (or the pump status) did not change for a few readings
+    in a row. The firmware cannot read the wrist servo, the wrist rotation is measured by the vibration of the arm.
+    """
+    XY_DISTANCES = (10, 40, 80, 160, 240)
+    Z_DISTANCES = (10, 30, 60, 100)
+    WRIST_ANGLES = (10, 45, 90, 150)
+
+    def __init__(self, swift, repeat=3, rest=1.0, stable_samples=3, tolerance=0.2, margin=0.05):
+        """
+        Constructor.
+        :param swift: connected uArm
+        :type swift: SwiftAPI
+        :param repeat: measurements per move size
+        :type repeat: int
+        :param rest: seconds waited before each measured move, so the arm is at rest
+        :type rest: float
+        :param stable_samples: readings in a row without change which count as rest
+        :type stable_samples: int
+        :param tolerance: largest change of the servo angles in degrees which counts as rest
+        :type tolerance: float
+        :param margin: safety margin in seconds which is added to the fitted models
+        :type margin: float
+        """
+        self.__swift = swift
+        self.__repeat = repeat
+        self.__rest = rest
+        self.__stable_samples = stable_samples
+        self.__tolerance = tolerance
+        self.__margin = margin
+        config = Config.instance()
+        self.__center = config.home_position
+        self.__timeout = config.motion_timeout
+        # measured (amount, seconds) per option of the config file
+        self.samples = {'settle_xy': [], 'settle_z': [], 'settle_wrist': [], 'settle_pump_on': [],
+                        'settle_pump_off': []}
+
+    def run(self, progress=None):
+        """
+        Measure all actuators and fit the settle models.
+        :param progress: called with a text after each measurement
+        :type progress: function
+        :return: values of the [CALIBRATION] options
+        :rtype: dict
+        """
+        x_center, y_center, z_center = self.__center
+        for _ in range(self.__repeat):
+            for distance in self.XY_DISTANCES:
+                self.__swift.set_position(x=x_center, y=y_center - distance / 2, z=z_center)
+                self.__record('settle_xy', distance, progress, self.__servo_angles, self.__servos_at_rest,
+                              lambda: self.__swift.set_position(x=x_center, y=y_center + distance / 2, z=z_center))
+            for distance in self.Z_DISTANCES:
+                self.__swift.set_position(x=x_center, y=y_center, z=z_center - distance / 2)
+                self.__record('settle_z', distance, progress, self.__servo_angles, self.__servos_at_rest,
+                              lambda: self.__swift.set_position(x=x_center, y=y_center, z=z_center + distance / 2))
+            for angle in self.WRIST_ANGLES:
+                self.__swift.set_wrist(angle=90 - angle / 2)
+                self.__record('settle_wrist', angle, progress, self.__servo_angles, self.__servos_at_rest,
+                              lambda: self.__swift.set_wrist(angle=90 + angle / 2))
+            self.__record('settle_pump_on', 0, progress, self.__pump_status, lambda previous, status: status != 0,
+                          lambda: self.__swift.set_pump(on=True))
+            self.__record('settle_pump_off', 0, progress, self.__pump_status, lambda previous, status: status == 0,
+                          lambda: self.__swift.set_pump(on=False))
+        self.__swift.set_wrist(angle=90)
+        self.__swift.flush_cmd(timeout=self.__timeout, wait_stop=True)
+        return self.models()
+
+    def models(self):
+        """
+        Fit the settle models to the measurements.
+        :return: values of the [CALIBRATION] options
+        :rtype: dict
+        """
+        models = {name: fit_settle_model(samples, self.__margin) for name, samples in self.samples.items()}
+        models['settle_pump_on'] = models['settle_pump_on'][0]
+        models['settle_pump_off'] = models['settle_pump_off'][0]
+        return models
+
+    def __record(self, name, amount, progress, probe, at_rest, command):
+        """
+        Measure one move and store the settle time.
+        :param probe: reads the state of the arm
+        :param at_rest: called with the previous and the current reading, True if the arm is at rest
+        :param command: sends the measured move
+        """
+        self.__wait_stop()
+        time.sleep(self.__rest)
+        command()
+        settle = self.__settle_time(probe, at_rest)
+        self.samples[name].append((amount, settle))
+        if progress is not None:
+            progress("{} {}: {:.3f} s".format(name, amount, settle))
+
+    def __settle_time(self, probe, at_rest):
+        """
+        Seconds from the end of the move reported by the firmware until the arm is at rest.
+        """
+        self.__wait_stop()
+        start = time.perf_counter()
+        at_rest_since = start
+        previous = probe()
+        readings = 0
+        while readings < self.__stable_samples:
+            if time.perf_counter() - start > self.__timeout:
+                message = "Der Roboter kommt nach der Bewegung nicht zur Ruhe, die Kalibrierung wurde abgebrochen."
+                raise RobotError(ErrorCode.E0019, message)
+            reading = probe()
+            if at_rest(previous, reading):
+                readings += 1
+            else:
+                readings = 0
+                at_rest_since = time.perf_counter()
+            previous = reading
+        return at_rest_since - start
+
+    def __wait_stop(self):
+        if self.__swift.flush_cmd(timeout=self.__timeout, wait_stop=True) != 'OK':
+            message = "Der Roboter hat die Bewegung nicht rechtzeitig beendet, überprüfe die Verbindung."
+            raise RobotError(ErrorCode.E0002, message)
+
+    def __servo_angles(self):
+        angles = self.__swift.get_servo_angle()
+        if not isinstance(angles, list):
+            message = "Die Roboter Position konnte nicht gelesen werden, überprüfe die Verbindung."
+            raise RobotError(ErrorCode.E0001, message)
+        return angles
+
+    def __servos_at_rest(self, previous, angles):
+        return max(abs(angle - angle_previous) for angle, angle_previous in zip(angles, previous)) <= self.__tolerance
+
+    def __pump_status(self):
+        status = self.__swift.get_pump_status()
+        if not isinstance(status, int):
+            message = "Der Status der Pumpe konnte nicht gelesen werden, überprüfe die Verbindung."
+            raise RobotError(ErrorCode.E0001, message)
+        return status
+
+
+def main():
+    """
+    Command line interface of the calibration, the arm has to be connected and the board must be empty.
+    """
+    parser = argparse.ArgumentParser(description="Measure the settle times of the uArm and store them in the config "
+                                                 "file")
+    parser.add_argument("--repeat", type=int, default=3, help="measurements per move size")
+    parser.add_argument("--rest", type=float, default=1.0, help="seconds waited before each measured move")
+    parser.add_argument("--dry-run", action="store_true", help="only print the settle models")
+    args = parser.parse_args()
+
+    config = Config.instance()
+    swift = SwiftAPI(filters={'hwid': 'USB VID:PID=2341:0042'}, cmd_pend_size=config.cmd_pend_size)
+    try:
+        swift.waiting_ready(timeout=5)
+        swift.set_mode(0)
+        swift.reset(wait=True, speed=10000)
+        models = Calibration(swift, args.repeat, args.rest).run(progress=print)
+    finally:
+        swift.set_pump(on=False)
+        swift.disconnect()
+
+    for name, value in models.items():
+        print("{} = {}".format(name, json.dumps(value)))
+    if not args.dry_run:
+        write_calibration(models)
+        # check the written values
+        Config.reload()
+        print("Gespeichert in {}".format(Config.default_path()))
+
+
+if __name__ == '__main__':
+    main()
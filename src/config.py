@@ -0,0 +1,177 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+This file contains the Config class, which holds the validated general options of config/config.ini.
+"""
+
+import json
+import os
+from dataclasses import dataclass, fields
+from typing import Tuple
+try:
+    import configparser
+except:
+    from six.moves import configparser
+
+from src.robot_error import ErrorCode, RobotError
+
+
+@dataclass(frozen=True)
+class Config:
+    """
+    Typed and immutable general options. The config file is read and validated once (Config.instance()), all classes
+    use the same object afterwards. Config.reload() reads the file again, objects created before keep their values.
+    """
+    # [CHALLENGES]
+    required_challenges: int
+    # [ROBOT]
+    reset_position: Tuple[int, int, int]
+    edge_length: float
+    x_offset: float
+    y_offset: float
+    z_offset: float
+    xy_base_offset: float
+    z_base_offset: float
+    min_radius_xy: float
+    max_radius_xy: float
+    servo_three_limit: Tuple[float, float]
+    board_size: Tuple[int, int]
+    max_height: int
+    motion_timeout: float
+    pipelined_execution: bool
+    optimize_moves: bool
+    cmd_pend_size: int
+    # [SIMULATION]
+    speed: float
+    acceleration: float
+    wrist_speed: float
+    pump_time: float
+    home_position: Tuple[float, float, float]
+    time_warp: bool
+    # [CALIBRATION]
+    settle_xy: Tuple[float, float]
+    settle_z: Tuple[float, float]
+    settle_wrist: Tuple[float, float]
+    settle_pump_on: float
+    settle_pump_off: float
+
+    # section of each option in the config file
+    SECTIONS = {
+        'required_challenges': 'CHALLENGES',
+        'speed': 'SIMULATION', 'acceleration': 'SIMULATION', 'wrist_speed': 'SIMULATION',
+        'pump_time': 'SIMULATION', 'home_position': 'SIMULATION', 'time_warp': 'SIMULATION',
+        'settle_xy': 'CALIBRATION', 'settle_z': 'CALIBRATION', 'settle_wrist': 'CALIBRATION',
+        'settle_pump_on': 'CALIBRATION', 'settle_pump_off': 'CALIBRATION',
+    }
+
+    __instance = None
+
+    @staticmethod
+    def default_path():
+        """
+        Returns the path of config/config.ini.
+        """
+        parent_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        return os.path.join(parent_path, "config/config.ini")
+
+    @classmethod
+    def instance(cls):
+        """
+        Returns the shared configuration, the config file is only read on the first call.
+        :rtype: Config
+        """
+        if cls.__instance is None:
+            cls.__instance = cls.load(cls.default_path())
+        return cls.__instance
+
+    @classmethod
+    def reload(cls, path=None):
+        """
+        Read the config file again and replace the shared configuration.
+        :param path: path of the config file, None uses config/config.ini
+        :type path: str
+        :rtype: Config
+        """
+        cls.__instance = cls.load(path or cls.default_path())
+        return cls.__instance
+
+    @classmethod
+    def load(cls, path):
+        """
+        Read and validate a config file.
+        :param path: path of the config file
+        :type path: str
+        :return: validated configuration
+        :rtype: Config
+        """
+        parser = configparser.ConfigParser()
+        if not parser.read(path, encoding='utf-8'):
+            message = "Die Konfigurationsdatei {} konnte nicht gelesen werden.".format(path)
+            raise RobotError(ErrorCode.E0016, message)
+
+        values = {}
+        for field in fields(cls):
+            section = cls.SECTIONS.get(field.name, 'ROBOT')
+            if not parser.has_option(section, field.name):
+                message = "In der Konfigurationsdatei fehlt der Eintrag {} im Abschnitt [{}].".format(field.name,
+                                                                                                   section)
+                raise RobotError(ErrorCode.E0016, message)
+            try:
+                value = json.loads(parser[section][field.name])
+            except ValueError:
+                value = None
+            values[field.name] = cls.__convert(field.name, field.type, value)
+
+        config = cls(**values)
+        config.__validate()
+        return config
+
+    @staticmethod
+    def __invalid(name, reason):
+        message = "Ungültiger Wert für {} in der Konfigurationsdatei: {}.".format(name, reason)
+        return RobotError(ErrorCode.E0016, message)
+
+    @classmethod
+    def __convert(cls, name, kind, value):
+        """
+        Convert a json value to the type of the option, lists become tuples.
+        """
+        if kind is bool:
+            if not isinstance(value, bool):
+                raise cls.__invalid(name, "true oder false erwartet")
+            return value
+        if kind in (int, float):
+            if isinstance(value, bool) or not isinstance(value, (int, float)) or (kind is int and value != int(value)):
+                raise cls.__invalid(name, "Zahl erwartet")
+            return int(value) if kind is int else value
+        # tuple of numbers
+        item_kind = kind.__args__[0]
+        if not isinstance(value, list) or len(value) != len(kind.__args__):
+            raise cls.__invalid(name, "Liste mit {} Zahlen erwartet".format(len(kind.__args__)))
+        return tuple(cls.__convert(name, item_kind, item) for item in value)
+
+    def __validate(self):
+        """
+        Check the ranges of the options.
+        """
+        positive = ['edge_length', 'min_radius_xy', 'max_radius_xy', 'max_height', 'motion_timeout', 'cmd_pend_size',
+                    'speed', 'acceleration', 'wrist_speed']
+        not_negative = ['required_challenges', 'pump_time', 'settle_pump_on', 'settle_pump_off']
+        for name in positive:
+            if getattr(self, name) <= 0:
+                raise self.__invalid(name, "muss grösser als 0 sein")
+        for name in not_negative:
+            if getattr(self, name) < 0:
+                raise self.__invalid(name, "darf nicht negativ sein")
+        for name in ['settle_xy', 'settle_z', 'settle_wrist']:
+            if min(getattr(self, name)) < 0:
+                raise self.__invalid(name, "[Sekunden, Sekunden pro Einheit] dürfen nicht negativ sein")
+        if self.min_radius_xy >= self.max_radius_xy:
+            raise self.__invalid('min_radius_xy', "muss kleiner als max_radius_xy sein")
+        lower, higher = self.servo_three_limit
+        if not 0 <= lower < higher <= 180:
+            raise self.__invalid('servo_three_limit', "[untere Grenze, obere Grenze] zwischen 0 und 180 erwartet")
+        if min(self.board_size) <= 0:
+            raise self.__invalid('board_size', "muss grösser als 0 sein")
+        if self.reset_position[2] < 0:
+            raise self.__invalid('reset_position', "die Höhe darf nicht negativ sein")
@@ -4,18 +4,13 @@
 This file contains the GeometryHelper class.
 """
 
+import math
+
 import numpy
 
 from src.robot_error import ErrorCode, RobotError
 from src.debug import Debug
-
-import json
-
-import os
-try:
-    import configparser
-except:
-    from six.moves import configparser
+from src.config import Config
 
 
 class GeometryHelper:
@@ -46,20 +41,16 @@ class GeometryHelper:
         self.load_general_options()
     
     def load_general_options(self):
-        parent_path = os.path.dirname(os.path.dirname( os.path.abspath(__file__)))
-        path = os.path.join(parent_path,"config/config.ini")
-        parser = configparser.ConfigParser()
-        parser.read(path)
-        
-        self.__edge_length = json.loads(parser['ROBOT']['edge_length'])
-        self.__x_offset = json.loads(parser['ROBOT']['x_offset'])
-        self.__y_offset = json.loads(parser['ROBOT']['y_offset'])
-        self.__z_offset = json.loads(parser['ROBOT']['z_offset'])
-        self.__xy_base_offset = json.loads(parser['ROBOT']['xy_base_offset'])
-        self.__z_base_offset = json.loads(parser['ROBOT']['z_base_offset'] )
-        self.__min_radius_xy = json.loads(parser['ROBOT']['min_radius_xy'])
-        self.__max_radius_xy = json.loads(parser['ROBOT']['max_radius_xy'])
-        self.__servo_three_limits= json.loads(parser['ROBOT']['servo_three_limit'])
+        config = Config.instance()
+        self.__edge_length = config.edge_length
+        self.__x_offset = config.x_offset
+        self.__y_offset = config.y_offset
+        self.__z_offset = config.z_offset
+        self.__xy_base_offset = config.xy_base_offset
+        self.__z_base_offset = config.z_base_offset
+        self.__min_radius_xy = config.min_radius_xy
+        self.__max_radius_xy = config.max_radius_xy
+        self.__servo_three_limits = list(config.servo_three_limit)
 
 
     def transform_position_user_to_uarm(self, x_user, y_user, z_uarm):
@@ -82,16 +73,61 @@ class GeometryHelper:
 
         # check if input is in range of robot
         # TODO (ALR): This is just a basic workspace restriction, add more if necessary.
-        xy_length = numpy.sqrt(x_uarm ** 2 + y_uarm ** 2)
+        xy_length = math.sqrt(x_uarm ** 2 + y_uarm ** 2)
         xy_radius = abs(xy_length - self.__xy_base_offset)
         z_radius = abs(z_uarm - self.__z_base_offset)
-        radius = numpy.sqrt(xy_radius ** 2 + z_radius ** 2)
+        radius = math.sqrt(xy_radius ** 2 + z_radius ** 2)
         if radius > (self.__max_radius_xy - self.__xy_base_offset) or x_uarm < 0 or xy_length <= self.__min_radius_xy:
             message = "Die eingegebenen Koordinaten sind nicht für den Roboter erreichbar."
             raise RobotError(ErrorCode.E0000, message)
 
         return {'x': x_uarm, 'y': y_uarm}
 
+    def transform_pose_user_to_uarm(self, x_user, y_user, z_user):
+        """
+        Transform a whole pose in user frame to uarm frame and check that the target pose is in the workspace.
+        :param x_user: x-position in user frame
+        :type x_user: int
+        :param y_user: y-position in user frame
+        :type y_user: int
+        :param z_user: z-position in user frame
+        :type z_user: int
+        :return: pose in uarm frame {'x': x, 'y', y, 'z': z}
+        :rtype: dict
+        """
+        z_uarm = self.__z_offset + z_user * self.__edge_length
+        uarm_dict = self.transform_position_user_to_uarm(x_user, y_user, z_uarm)
+        uarm_dict['z'] = self.transform_height_user_to_uarm(z_user, uarm_dict['x'], uarm_dict['y'])
+        return uarm_dict
+
+    def transform_poses_user_to_uarm(self, poses_user):
+        """
+        Vectorized version of transform_pose_user_to_uarm: transform many poses in user frame in one pass. Unreachable
+        poses do not raise an error, they are marked in the masks instead.
+        :param poses_user: poses in user frame, one row [x_user, y_user, z_user] per pose
+        :type poses_user: numpy.ndarray or list, shape (N, 3)
+        :return: {'pose': poses in uarm frame (N, 3), 'position_ok': position in workspace (N),
+                  'height_ok': height in workspace (N), 'reachable': position and height in workspace (N)}
+        :rtype: dict
+        """
+        poses_user = numpy.asarray(poses_user, dtype=float).reshape(-1, 3)
+        # transform coordinates, adding .5 to be in center of square
+        x_uarm = (poses_user[:, 0] + .5) * self.__edge_length + self.__x_offset
+        y_uarm = (poses_user[:, 1] + .5) * self.__edge_length + self.__y_offset
+        z_uarm = self.__z_offset + poses_user[:, 2] * self.__edge_length
+
+        # same workspace restrictions as transform_position_user_to_uarm and transform_height_user_to_uarm
+        xy_length = numpy.sqrt(x_uarm ** 2 + y_uarm ** 2)
+        xy_radius = numpy.abs(xy_length - self.__xy_base_offset)
+        z_radius = numpy.abs(z_uarm - self.__z_base_offset)
+        radius = numpy.sqrt(xy_radius ** 2 + z_radius ** 2)
+        in_sphere = radius <= (self.__max_radius_xy - self.__xy_base_offset)
+        position_ok = in_sphere & (x_uarm >= 0) & (xy_length > self.__min_radius_xy)
+        height_ok = in_sphere & (z_uarm >= self.__z_offset) & (z_uarm >= self.__edge_length + self.__z_offset)
+
+        return {'pose': numpy.column_stack((x_uarm, y_uarm, z_uarm)), 'position_ok': position_ok,
+                'height_ok': height_ok, 'reachable': position_ok & height_ok}
+
     def calculate_equal_wrist_rotation_new(self, x_uarm_old, x_uarm_new, y_uarm_old, y_uarm_new, wrist_old):
         """
         Calculates new wrist rotation that keeps the gripper rotation equal in the world frame. 
@@ -110,10 +146,10 @@ class GeometryHelper:
         :rtype: float
         """
         # angle from world x-axis to arm
-        alpha_1_rad = numpy.arctan2(y_uarm_old, x_uarm_old)
-        alpha_2_rad = numpy.arctan2(y_uarm_new, x_uarm_new)
-        alpha_1_deg = numpy.degrees(alpha_1_rad)
-        alpha_2_deg = numpy.degrees(alpha_2_rad)
+        alpha_1_rad = math.atan2(y_uarm_old, x_uarm_old)
+        alpha_2_rad = math.atan2(y_uarm_new, x_uarm_new)
+        alpha_1_deg = math.degrees(alpha_1_rad)
+        alpha_2_deg = math.degrees(alpha_2_rad)
         # calculate degree difference 
         
         beta_1 =  alpha_2_deg -alpha_1_deg
@@ -151,7 +187,7 @@ class GeometryHelper:
         loss = 360 # tries to minimize loss and uses a high value in the initialization
         for angle in result:
             for limit in self.__servo_three_limits:
-                tmp = numpy.absolute(angle - limit)
+                tmp = abs(angle - limit)
                 if tmp < loss:
                     final_angle = limit
                     loss = tmp
@@ -179,10 +215,10 @@ class GeometryHelper:
         :rtype: float
         """
         # angle from world x-axis to arm
-        alpha_1_rad = numpy.arctan2(y_uarm_old, x_uarm_old)
-        alpha_2_rad = numpy.arctan2(y_uarm_new, x_uarm_new)
-        alpha_1_deg = numpy.degrees(alpha_1_rad)
-        alpha_2_deg = numpy.degrees(alpha_2_rad)
+        alpha_1_rad = math.atan2(y_uarm_old, x_uarm_old)
+        alpha_2_rad = math.atan2(y_uarm_new, x_uarm_new)
+        alpha_1_deg = math.degrees(alpha_1_rad)
+        alpha_2_deg = math.degrees(alpha_2_rad)
         # angle from world x-axis to end effector orientation (-90 because of the asymetric servo range 0-180)
         beta_1 = alpha_1_deg + 90.0 - wrist_old
         # calculate the corresponding new wrist angle for new position, so that the orientation of the grabbed object
@@ -209,8 +245,8 @@ class GeometryHelper:
         # angle from world x-axis to arm but without the need of a block center position since we only need the angle!
         x_uarm_2 = (x_user ) * self.__edge_length + self.__x_offset
         y_uarm_2 = (y_user ) * self.__edge_length + self.__y_offset
-        alpha_1_rad = numpy.arctan2(y_uarm_2, x_uarm_2)
-        alpha_1_deg = numpy.degrees(alpha_1_rad)
+        alpha_1_rad = math.atan2(y_uarm_2, x_uarm_2)
+        alpha_1_deg = math.degrees(alpha_1_rad)
         # Note: angle on (0,0) point of board 180 Grad, angle on (0,15) => 0 Grad
         
         # The rotation needs to be reversed
@@ -240,10 +276,10 @@ class GeometryHelper:
         z_uarm = self.__z_offset + z_user * self.__edge_length
 
         # check if height is valid
-        xy_length = numpy.sqrt(x_uarm**2 + y_uarm**2)
+        xy_length = math.sqrt(x_uarm**2 + y_uarm**2)
         xy_radius = abs(xy_length - self.__xy_base_offset)
         z_radius = abs(z_uarm - self.__z_base_offset)
-        radius = numpy.sqrt(xy_radius**2 + z_radius**2)
+        radius = math.sqrt(xy_radius**2 + z_radius**2)
         # check if z_uarm value in workspace
         if radius > (self.__max_radius_xy - self.__xy_base_offset) or z_uarm < self.__z_offset or z_uarm < self.__edge_length + self.__z_offset:
             message = "Die gewünschte Höhe ist für den Roboter nicht erreichbar, bitte geben Sie einen anderen Wert an."
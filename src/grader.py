@@ -0,0 +1,128 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+This file contains the Grader class, which evaluates many user scripts against the challenges without a robot.
+
+Usage: python -m src.grader <script directory> [--challenge NAME] [--workers N] [--output FILE]
+"""
+
+import os
+import io
+import sys
+import json
+import argparse
+import contextlib
+from concurrent.futures import ProcessPoolExecutor
+
+from src.robot_error import RobotError
+from src.user_script import UserScript
+from src.user_challenge import UserChallenge
+from src.simulated_robot_handler import SimulatedRobotHandler
+
+
+def grade_script(script_path, challenge):
+    """
+    Run one user script against one challenge on the simulated robot in time-warp mode.
+    :param script_path: path of the script file
+    :type script_path: str
+    :param challenge: name of the challenge
+    :type challenge: str
+    :return: result {'script', 'challenge', 'success', 'result', 'error_code', 'message', 'steps', 'predicted_time'}
+    :rtype: dict
+    """
+    result = {'script': script_path, 'challenge': challenge, 'success': False, 'result': None, 'error_code': None,
+              'message': None, 'steps': 0, 'predicted_time': 0.0}
+    with open(script_path, encoding='utf-8') as script_file:
+        input_string = script_file.read()
+
+    # the challenge classes print their progress, which is not wanted in the json output
+    with contextlib.redirect_stdout(io.StringIO()):
+        robot_handler = SimulatedRobotHandler(time_warp=True)
+        robot_handler.reset_timer()
+        user_script = None
+        try:
+            user_script = UserScript(input_string, robot_handler, challenge)
+            success = user_script.run_script(robot_handler)
+            result['result'] = success if success else False
+            result['success'] = success == challenge
+        except RobotError as error:
+            result['error_code'] = error.error_code.name
+            result['message'] = error.message
+        except Exception as error:
+            # a broken submission must not stop the whole batch
+            result['error_code'] = type(error).__name__
+            result['message'] = str(error)
+        if user_script is not None:
+            result['steps'] = user_script.steps
+        result['predicted_time'] = robot_handler.predicted_time
+    return result
+
+
+class Grader:
+    """
+    Grades a directory of user scripts against all (or the selected) challenges in a process pool.
+    """
+    def __init__(self, challenges=None, workers=None):
+        """
+        Constructor.
+        :param challenges: names of the challenges, None grades against all challenges
+        :type challenges: list[str]
+        :param workers: number of worker processes, None uses the number of cpus
+        :type workers: int
+        """
+        if not challenges:
+            with contextlib.redirect_stdout(io.StringIO()):
+                challenge_infos, _ = UserChallenge.challenge_name_path()
+            challenges = challenge_infos['names']
+        self.__challenges = challenges
+        self.__workers = workers
+
+    @staticmethod
+    def script_paths(directory):
+        """
+        Returns the sorted paths of all script files (.txt) in the directory.
+        """
+        return sorted(os.path.join(directory, file) for file in os.listdir(directory) if file.endswith('.txt'))
+
+    def grade(self, script_paths):
+        """
+        Grade all scripts against all challenges.
+        :param script_paths: paths of the script files
+        :type script_paths: list[str]
+        :return: one result per script and challenge, see grade_script
+        :rtype: list[dict]
+        """
+        jobs = [(path, challenge) for path in script_paths for challenge in self.__challenges]
+        if not jobs:
+            return []
+        workers = self.__workers or os.cpu_count() or 1
+        # larger chunks keep the inter process communication small for hundreds of scripts
+        chunksize = max(1, len(jobs) // (4 * workers))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(grade_script, *zip(*jobs), chunksize=chunksize))
+
+
+def main():
+    """
+    Command line interface of the grader, writes the results as json.
+    """
+    parser = argparse.ArgumentParser(description="Grade user scripts against the challenges without a robot")
+    parser.add_argument("directory", help="directory containing the user scripts (.txt)")
+    parser.add_argument("--challenge", action="append", help="challenge name, can be given multiple times")
+    parser.add_argument("--workers", type=int, default=None, help="number of worker processes")
+    parser.add_argument("--output", default=None, help="json output file, default is stdout")
+    args = parser.parse_args()
+
+    grader = Grader(args.challenge, args.workers)
+    results = grader.grade(Grader.script_paths(args.directory))
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as output_file:
+            json.dump(results, output_file, indent=2, ensure_ascii=False)
+    else:
+        json.dump(results, sys.stdout, indent=2, ensure_ascii=False)
+        sys.stdout.write('\n')
+
+
+if __name__ == '__main__':
+    main()
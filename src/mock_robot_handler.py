@@ -20,7 +20,7 @@ class MockRobotHandler:
         """
         print("Disconnecting MockRobotHandler.")
 
-    def reset(self):
+    def reset(self, force=False):
         """
         Mock reset method.
         """
@@ -38,6 +38,12 @@ class MockRobotHandler:
         """
         print("height_new: ", z_user_list)
         
+    def pose_new(self, pose_user):
+        """
+        Mock pose_new method.
+        """
+        print("pose_new: ", pose_user)
+
     def drehen(self, angle):
         """
         Mock height_new method.
@@ -55,3 +61,27 @@ class MockRobotHandler:
         Mock pump_off method.
         """
         print("pump_off")
+
+    def start_pipeline(self):
+        """
+        Mock start_pipeline method.
+        """
+        print("start_pipeline")
+
+    def stop_pipeline(self):
+        """
+        Mock stop_pipeline method.
+        """
+        print("stop_pipeline")
+
+    def synchronize(self):
+        """
+        Mock synchronize method.
+        """
+        print("synchronize")
+
+    def emergency_stop(self):
+        """
+        Mock emergency_stop method.
+        """
+        print("emergency_stop")
@@ -0,0 +1,163 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+This file contains the MotionPlanner class, which shortens the moves of a parsed user script.
+"""
+
+from src.config import Config
+from src.user_functions import FunctionNames
+from src.reachability_table import ReachabilityTable
+
+
+class MotionPlanner:
+    """
+    Optimization pass over the parsed function calls of a user script. Only the moves between two block events
+    (pumpe_an, pumpe_aus, drehen) are changed, the robot arrives at the same pose before each event, so the challenge
+    sees the same block positions:
+        - moves which do not change the pose or are undone again are removed
+        - if the whole move can be done above all blocks, it is done as one 3D move (pose_new)
+        - otherwise the arm travels on the safe height (one level above the highest block) if this needs less moves
+        - if no safe height is reachable, only superseded moves are removed
+    """
+    def __init__(self, challenge, coordinates):
+        """
+        Constructor.
+        :param challenge: copy of the current challenge state, it is changed by the planning
+        :type challenge: Challenge
+        :param coordinates: start pose of the robot in user frame [x, y, z]
+        :type coordinates: list[int]
+        """
+        self.__challenge = challenge
+        self.__coordinates = tuple(coordinates)
+        self.__reachability = ReachabilityTable.instance()
+        self.__max_height = Config.instance().max_height
+
+    def plan(self, function_calls, robot_handler):
+        """
+        Returns the optimized function calls.
+        :param function_calls: parsed function calls {'function', 'args', 'name', 'line'}
+        :type function_calls: list[dict]
+        :param robot_handler: handler whose functions are used for the new moves
+        :type robot_handler: RobotHandler
+        :return: function calls with the same block events and less moves
+        :rtype: list[dict]
+        """
+        planned = []
+        segment = []
+        for function_call in function_calls:
+            if function_call["name"] in (FunctionNames.position.name, FunctionNames.hoehe.name):
+                segment.append(function_call)
+                continue
+            planned += self.__plan_segment(segment, robot_handler)
+            segment = []
+            self.__apply_event(function_call)
+            planned.append(function_call)
+        planned += self.__plan_segment(segment, robot_handler)
+        return planned
+
+    def __apply_event(self, function_call):
+        """
+        Update the block positions of the challenge copy.
+        """
+        name = function_call["name"]
+        if name == FunctionNames.pumpe_an.name:
+            self.__challenge.pump_on(list(self.__coordinates))
+        elif name == FunctionNames.pumpe_aus.name:
+            self.__challenge.pump_off(list(self.__coordinates))
+        elif name == FunctionNames.drehen.name:
+            self.__challenge.rotate_man_block(function_call["args"][0])
+
+    def __safe_level(self):
+        """
+        Lowest level above all placed blocks. The held block hangs at the level of the gripper.
+        """
+        return max((cell[2] for cell in self.__challenge.occupancy), default=0) + 1
+
+    def __plan_segment(self, segment, robot_handler):
+        """
+        Plan the moves between two block events.
+        :return: planned function calls
+        :rtype: list[dict]
+        """
+        if not segment:
+            return []
+        start = self.__coordinates
+        # poses after each move
+        literal = []
+        pose = start
+        for function_call in segment:
+            if function_call["name"] == FunctionNames.position.name:
+                pose = (function_call["args"][0], function_call["args"][1], pose[2])
+            else:
+                pose = (pose[0], pose[1], function_call["args"][0])
+            literal.append(pose)
+        end = literal[-1]
+        self.__coordinates = end
+        line = segment[-1]["line"]
+
+        safe_level = self.__safe_level()
+        candidates = [self.__reduce(start, literal, safe_level)]
+        if start[:2] == end[:2] or min(start[2], end[2]) >= safe_level:
+            # vertical move or everything above the blocks: one direct move
+            candidates.append([end])
+        elif safe_level <= self.__max_height:
+            # up to the safe height, travel, down to the target
+            waypoints = [(start[0], start[1], max(start[2], safe_level)), (end[0], end[1], max(end[2], safe_level)),
+                         end]
+            if all(self.__reachability.is_reachable(*waypoint) for waypoint in waypoints):
+                candidates.append(self.__remove_repeated(start, waypoints))
+        # the fewest moves, literal moves are kept if there is no improvement
+        waypoints = min(candidates, key=len)
+        return self.__to_calls(start, waypoints, robot_handler, line)
+
+    @staticmethod
+    def __remove_repeated(start, waypoints):
+        """
+        Remove waypoints which do not change the pose.
+        """
+        reduced = []
+        previous = start
+        for waypoint in waypoints:
+            if waypoint != previous:
+                reduced.append(waypoint)
+            previous = waypoint
+        return reduced
+
+    def __reduce(self, start, literal, safe_level):
+        """
+        Keep the path of the script, but merge consecutive height changes and consecutive position changes above all
+        blocks, since only their last target matters.
+        """
+        reduced = []
+        for pose in self.__remove_repeated(start, literal):
+            if reduced:
+                last_start = reduced[-2] if len(reduced) > 1 else start
+                vertical = last_start[:2] == reduced[-1][:2] == pose[:2]
+                level = last_start[2] == reduced[-1][2] == pose[2]
+                if vertical or (level and pose[2] >= safe_level):
+                    reduced[-1] = pose
+                    if reduced[-1] == last_start:
+                        reduced.pop()
+                    continue
+            reduced.append(pose)
+        return reduced
+
+    @staticmethod
+    def __to_calls(start, waypoints, robot_handler, line):
+        """
+        Convert waypoints to function calls, a change of position and height is one pose_new call.
+        """
+        calls = []
+        previous = start
+        for waypoint in waypoints:
+            if waypoint[2] == previous[2]:
+                calls.append({"function": robot_handler.position_new, "args": [waypoint[0], waypoint[1]],
+                              "name": FunctionNames.position.name, "line": line})
+            elif waypoint[:2] == previous[:2]:
+                calls.append({"function": robot_handler.height_new, "args": [waypoint[2]],
+                              "name": FunctionNames.hoehe.name, "line": line})
+            else:
+                calls.append({"function": robot_handler.pose_new, "args": list(waypoint),
+                              "name": FunctionNames.pose.name, "line": line})
+            previous = waypoint
+        return calls
@@ -0,0 +1,143 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+This file contains the MotionSync class, which waits until the uArm has really finished a command.
+"""
+
+import threading
+from enum import Enum
+
+from src.config import Config
+from src.robot_error import ErrorCode, RobotError
+from src.timeline import span
+
+
+class Actuator(Enum):
+    """
+    Actuators of the uArm with their own settle time. The settle time of xy, z and wrist grows with the size of the
+    move (mm or degrees), see src/calibration.py.
+    """
+    xy = 1
+    z = 2
+    wrist = 3
+    pump_on = 4
+    pump_off = 5
+
+
+class SettleModel:
+    """
+    Settle margin of the actuators as seconds + seconds per unit * size of the move, see src/calibration.py. Used by
+    MotionSync for the real arm and by the SimulatedRobotHandler, so both wait the same time.
+    """
+    def __init__(self, config=None):
+        """
+        Constructor.
+        :param config: configuration with the [CALIBRATION] options, None uses Config.instance()
+        :type config: Config
+        """
+        config = config or Config.instance()
+        # [seconds, seconds per mm or degree]
+        self.__models = {
+            Actuator.xy: config.settle_xy,
+            Actuator.z: config.settle_z,
+            Actuator.wrist: config.settle_wrist,
+            Actuator.pump_on: (config.settle_pump_on, 0.0),
+            Actuator.pump_off: (config.settle_pump_off, 0.0),
+        }
+
+    def settle_time(self, actuator, amount=0.0):
+        """
+        Returns the settle margin of a move in seconds.
+        :param actuator: actuator which was moved
+        :type actuator: Actuator
+        :param amount: size of the move, mm for xy and z, degrees for the wrist
+        :type amount: float
+        :rtype: float
+        """
+        seconds, per_unit = self.__models[actuator]
+        return seconds + per_unit * abs(amount)
+
+    def slowest(self, moves):
+        """
+        Returns the move with the longest settle margin.
+        :param moves: size of the move per actuator
+        :type moves: dict[Actuator, float]
+        :return: actuator and settle margin in seconds, (None, 0.0) without moves
+        :rtype: tuple
+        """
+        settle_times = {actuator: self.settle_time(actuator, amount) for actuator, amount in moves.items()}
+        if not settle_times:
+            return None, 0.0
+        actuator = max(settle_times, key=settle_times.get)
+        return actuator, settle_times[actuator]
+
+
+class MotionSync:
+    """
+    Replaces the fixed sleep after each command. The firmware is asked until the arm stopped moving (flush_cmd with
+    wait_stop), afterwards only a short settle margin is added. The margin is calibrated per actuator as
+    seconds + seconds per unit * size of the move, so short hops wait less than moves across the whole board.
+    """
+    def __init__(self, swift):
+        """
+        Constructor.
+        :param swift: connected uArm
+        :type swift: SwiftAPI
+        """
+        self.__swift = swift
+        # set by the emergency stop, interrupts the waiting
+        self.__stop = threading.Event()
+        # Timeline of the running script, None if no timeline is recorded
+        self.timeline = None
+        self.load_general_options()
+
+    def load_general_options(self):
+        config = Config.instance()
+        self.__settle_model = SettleModel(config)
+        self.__timeout = config.motion_timeout
+
+    def settle_time(self, actuator, amount=0.0):
+        """
+        Returns the settle margin of a move in seconds, see SettleModel.settle_time.
+        :rtype: float
+        """
+        return self.__settle_model.settle_time(actuator, amount)
+
+    def stop(self):
+        """
+        Interrupt the current and all following waits until clear_stop() is called. Can be called from another thread.
+        """
+        self.__stop.set()
+
+    def clear_stop(self):
+        """
+        Allow waiting again after an emergency stop.
+        """
+        self.__stop.clear()
+
+    def check_stop(self):
+        """
+        Raise an error if the emergency stop is active.
+        """
+        if self.__stop.is_set():
+            message = "Der Roboter wurde angehalten."
+            raise RobotError(ErrorCode.E0005, message)
+
+    def wait(self, moves=None):
+        """
+        Block until all sent commands are answered and the arm stopped moving, then wait the settle margin of the
+        slowest move.
+        :param moves: size of the largest move per actuator since the last wait, see settle_time
+        :type moves: dict[Actuator, float]
+        """
+        with span(self.timeline, 'flush'):
+            ret = self.__swift.flush_cmd(timeout=self.__timeout, wait_stop=True)
+        self.check_stop()
+        if ret != 'OK':
+            message = "Der Roboter hat die Bewegung nicht rechtzeitig beendet, überprüfe die Verbindung."
+            raise RobotError(ErrorCode.E0002, message)
+        if moves:
+            slowest, settle = self.__settle_model.slowest(moves)
+            with span(self.timeline, 'settle', slowest.name):
+                self.__stop.wait(settle)
+        self.check_stop()
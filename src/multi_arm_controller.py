@@ -0,0 +1,186 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+This file contains the MultiArmController class, which runs a UserScript on each of several arms at the same time.
+"""
+
+import threading
+
+from src.robot_error import ErrorCode, RobotError
+
+
+class ArmBarrier:
+    """
+    Synchronization point of the arms for warten(). Unlike threading.Barrier an arm which finished its script leaves
+    the barrier, so scripts with a different number of warten() calls do not block each other.
+    """
+    def __init__(self, parties, timeout=None):
+        """
+        Constructor.
+        :param parties: number of arms running a script
+        :type parties: int
+        :param timeout: maximal waiting time at the barrier in seconds, None waits forever
+        :type timeout: float
+        """
+        self.__condition = threading.Condition()
+        self.__parties = parties
+        self.__timeout = timeout
+        self.__waiting = 0
+        self.__generation = 0
+        self.__broken = False
+
+    @property
+    def parties(self):
+        """
+        Number of arms which did not finish their script yet.
+        """
+        return self.__parties
+
+    def wait(self):
+        """
+        Wait until all remaining arms reached the barrier. Raises E0018 if another arm stopped with an error.
+        """
+        with self.__condition:
+            self.__check_broken()
+            generation = self.__generation
+            self.__waiting += 1
+            if self.__waiting >= self.__parties:
+                self.__release()
+                return
+            released = self.__condition.wait_for(
+                lambda: self.__generation != generation or self.__broken, self.__timeout)
+            # an aborted barrier is also released by the leave() of the failed arm
+            self.__check_broken()
+            if not released:
+                self.__broken = True
+                self.__condition.notify_all()
+                message = "Die anderen Roboterarme haben warten() nicht rechtzeitig erreicht."
+                raise RobotError(ErrorCode.E0018, message)
+
+    def leave(self):
+        """
+        Remove a finished arm from the barrier, the waiting arms are released if only they are left.
+        """
+        with self.__condition:
+            self.__parties -= 1
+            if self.__waiting > 0 and self.__waiting >= self.__parties:
+                self.__release()
+
+    def abort(self):
+        """
+        Release all waiting arms with E0018, e.g. when a script failed. Can be called from another thread.
+        """
+        with self.__condition:
+            self.__broken = True
+            self.__condition.notify_all()
+
+    def __release(self):
+        self.__waiting = 0
+        self.__generation += 1
+        self.__condition.notify_all()
+
+    def __check_broken(self):
+        if self.__broken:
+            message = "Ein anderer Roboterarm wurde angehalten."
+            raise RobotError(ErrorCode.E0018, message)
+
+
+class MultiArmController:
+    """
+    Runs one UserScript per arm, each arm on its own thread with its own command stream. The scripts are synchronized
+    at their warten() calls, an error of one arm stops the other arms at their next warten(). Used headless with
+    run_scripts() and by the MultiArmEditor with start(), whose editors run the scripts on their own threads.
+    """
+    def __init__(self, robot_handlers, barrier_timeout=None):
+        """
+        Constructor.
+        :param robot_handlers: one robot handler per arm
+        :type robot_handlers: list
+        :param barrier_timeout: maximal waiting time at warten() in seconds, None waits forever
+        :type barrier_timeout: float
+        """
+        self.__robot_handlers = list(robot_handlers)
+        self.__barrier_timeout = barrier_timeout
+        self.__user_scripts = []
+        self.__barrier = None
+
+    @property
+    def robot_handlers(self):
+        return self.__robot_handlers
+
+    def start(self, starters):
+        """
+        Start the arms with a new shared barrier. An arm which does not start leaves the barrier, so the other arms do
+        not wait for it.
+        :param starters: one function per robot handler, called with the barrier, returns True if the script of the
+                         arm was started; None leaves the arm idle
+        :type starters: list
+        :return: number of started arms
+        :rtype: int
+        """
+        if len(starters) != len(self.__robot_handlers):
+            raise ValueError("one starter per robot handler is required")
+        self.__barrier = ArmBarrier(len(starters), self.__barrier_timeout)
+        started = 0
+        for starter in starters:
+            if starter is not None and starter(self.__barrier):
+                started += 1
+            else:
+                self.__barrier.leave()
+        return started
+
+    def run_scripts(self, user_scripts, pipelined=False, optimize=False, progress_callback=None):
+        """
+        Run the scripts concurrently and wait until all arms finished.
+        :param user_scripts: one UserScript per robot handler, None leaves the arm idle
+        :type user_scripts: list
+        :param pipelined: stream the movements to the uArms, see UserScript.run_script
+        :type pipelined: bool
+        :param optimize: merge and shorten the moves, see UserScript.run_script
+        :type optimize: bool
+        :param progress_callback: called with (arm index, executed commands, total commands, line number)
+        :type progress_callback: function
+        :return: per arm the result of run_script, the RobotError of a failed script or None for idle arms
+        :rtype: list
+        """
+        if len(user_scripts) != len(self.__robot_handlers):
+            raise ValueError("one user script per robot handler is required")
+        self.__user_scripts = list(user_scripts)
+        results = [None] * len(user_scripts)
+        threads = []
+
+        def run(index, barrier):
+            callback = None
+            if progress_callback is not None:
+                callback = lambda step, total, line: progress_callback(index, step, total, line)
+            try:
+                results[index] = user_scripts[index].run_script(self.__robot_handlers[index], pipelined, optimize,
+                                                                callback, barrier)
+            except RobotError as error:
+                results[index] = error
+
+        def starter(index):
+            def start(barrier):
+                thread = threading.Thread(target=run, args=(index, barrier), daemon=True)
+                threads.append(thread)
+                thread.start()
+                return True
+            return start
+
+        self.start([None if user_script is None else starter(index)
+                    for index, user_script in enumerate(user_scripts)])
+        for thread in threads:
+            thread.join()
+        return results
+
+    def cancel(self):
+        """
+        Stop all arms immediately. Can be called from another thread.
+        """
+        for user_script in self.__user_scripts:
+            if user_script is not None:
+                user_script.cancel()
+        if self.__barrier is not None:
+            self.__barrier.abort()
+        for robot_handler in self.__robot_handlers:
+            robot_handler.emergency_stop()
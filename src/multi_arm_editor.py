@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+This file contains the MultiArmEditor class, one window with a RobotEditor per arm.
+"""
+
+from PyQt5.QtWidgets import QWidget, QPushButton, QVBoxLayout, QHBoxLayout, QTabWidget, QLabel
+
+from src.robot_editor import RobotEditor
+from src.multi_arm_controller import MultiArmController
+
+
+class MultiArmEditor(QWidget):
+    """
+    Shows the editors of all arms as tabs. Each arm can be started alone or all arms together, the scripts started
+    together are synchronized at their warten() calls.
+    """
+    def __init__(self, robot_handlers):
+        """
+        Initialize editor.
+        :param robot_handlers: one robot handler per arm
+        :type robot_handlers: list
+        """
+        super(MultiArmEditor, self).__init__()
+
+        self.__run_all_button = QPushButton('Alle starten')
+        self.__stop_all_button = QPushButton('Alle stoppen')
+        self.__output_console = QLabel()
+        self.__tabs = QTabWidget()
+        self.editors = []
+        for index, robot_handler in enumerate(robot_handlers, start=1):
+            editor = RobotEditor(robot_handler)
+            self.editors.append(editor)
+            self.__tabs.addTab(editor, "Arm {}".format(index))
+        # the editors run the scripts, the controller synchronizes them at warten()
+        self.__controller = MultiArmController(robot_handlers)
+
+        self.__init_ui()
+
+    def __init_ui(self):
+        """
+        Initialize UI.
+        """
+        h_box = QHBoxLayout()
+        h_box.addWidget(self.__run_all_button)
+        h_box.addWidget(self.__stop_all_button)
+        h_box.addWidget(self.__output_console)
+        h_box.addStretch(1)
+
+        v_box = QVBoxLayout()
+        v_box.addLayout(h_box)
+        v_box.addWidget(self.__tabs)
+
+        self.__run_all_button.setToolTip('Führt die Befehle aller Arme gleichzeitig aus, warten() wartet auf die anderen Arme')
+        self.__stop_all_button.setToolTip('Stopt alle Arme und setzt diese wieder in die Ausgangslage zurück.')
+
+        self.__run_all_button.clicked.connect(self.__run_all)
+        self.__stop_all_button.clicked.connect(self.__stop_all)
+
+        self.setLayout(v_box)
+        self.setWindowTitle('Robot Editor')
+        self.show()
+
+    def __run_all(self):
+        """
+        Start the scripts of all arms with a shared barrier.
+        """
+        # an arm whose script cannot be started, e.g. because of an error, does not take part
+        started = self.__controller.start([editor.start_script for editor in self.editors])
+        self.__output_console.setText("{} von {} Armen gestartet.".format(started, len(self.editors)))
+
+    def __stop_all(self):
+        """
+        Stop the scripts of all arms.
+        """
+        for editor in self.editors:
+            editor.stop_script()
+        self.__output_console.setText("Alle Arme werden angehalten.")
+
+    def write(self, text):
+        """
+        Write text in output console.
+        :param text: text to be written
+        :type text: str
+        """
+        self.__output_console.setText(text)
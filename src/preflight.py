@@ -0,0 +1,106 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+This file contains the Preflight class, which checks a whole user script before the robot moves.
+"""
+
+from src.user_functions import FunctionNames
+from src.robot_error import RobotError
+from src.geometry_helper import GeometryHelper
+from src.reachability_table import ReachabilityTable
+from src.debug import Debug
+
+
+class Preflight:
+    """
+    Executes the parsed function calls of a user script symbolically: the moves are checked with the reachability
+    table and the block logic with a copy of the challenge. Every error is collected with its line number instead of
+    stopping at the first one. Wrist limits only give warnings, because the robot still does the closest possible
+    rotation.
+    """
+    def __init__(self, challenge, coordinates):
+        """
+        Constructor.
+        :param challenge: copy of the current challenge state, it is changed by the check
+        :type challenge: Challenge
+        :param coordinates: start pose of the robot in user frame [x, y, z]
+        :type coordinates: list[int]
+        """
+        self.__challenge = challenge
+        self.__coordinates = list(coordinates)
+        self.__reachability = ReachabilityTable.instance()
+        self.__geometry_helper = GeometryHelper()
+        # orientation of the held block in world frame in degrees (see ReachabilityTable)
+        self.__orientation = None
+        self.errors = []  # list of (line, RobotError)
+        self.warnings = []  # list of (line, message)
+
+    def check(self, function_calls):
+        """
+        Check all function calls.
+        :param function_calls: parsed function calls {'name', 'args', 'line'}
+        :type function_calls: list[dict]
+        :return: True if no error was found
+        :rtype: bool
+        """
+        for function_call in function_calls:
+            try:
+                self.__step(function_call["name"], function_call["args"], function_call["line"])
+            except RobotError as error:
+                self.errors.append((function_call["line"], error))
+        return not self.errors
+
+    def error_message(self):
+        """
+        Returns all errors in one message, one line per error.
+        :rtype: str
+        """
+        return "\n".join("Zeile {}: {}".format(line, error.message) for line, error in self.errors)
+
+    def __step(self, name, args, line):
+        """
+        Execute one function call symbolically. The state only changes if the call is valid.
+        """
+        [x_user, y_user, z_user] = self.__coordinates
+        if name == FunctionNames.position.name:
+            [x_user, y_user] = args
+            self.__reachability.transform_pose_user_to_uarm(x_user, y_user, z_user)
+            self.__coordinates = [x_user, y_user, z_user]
+            self.__check_orientation(line)
+        elif name == FunctionNames.hoehe.name:
+            z_user = args[0]
+            uarm_dict = self.__reachability.transform_pose_user_to_uarm(x_user, y_user, self.__coordinates[2])
+            self.__reachability.transform_height_user_to_uarm(z_user, uarm_dict['x'], uarm_dict['y'])
+            self.__coordinates[2] = z_user
+        elif name == FunctionNames.pose.name:
+            [x_user, y_user, z_user] = args
+            uarm_dict = self.__reachability.transform_pose_user_to_uarm(x_user, y_user, z_user)
+            self.__reachability.transform_height_user_to_uarm(z_user, uarm_dict['x'], uarm_dict['y'])
+            self.__coordinates = [x_user, y_user, z_user]
+            self.__check_orientation(line)
+        elif name == FunctionNames.pumpe_an.name:
+            self.__challenge.pump_on(list(self.__coordinates))
+            # the wrist is turned before picking up the block
+            wrist = self.__geometry_helper.adjust_wrist_rotation_before_pumpe_an(x_user, y_user)
+            self.__orientation = self.__reachability.base_angle(x_user, y_user) + 90 - wrist
+        elif name == FunctionNames.pumpe_aus.name:
+            self.__challenge.pump_off(list(self.__coordinates))
+            self.__orientation = None
+        elif name == FunctionNames.drehen.name:
+            self.__challenge.rotate_man_block(args[0])
+            # turning the wrist by the angle turns the block the other way in world frame
+            self.__orientation -= args[0]
+            self.__check_orientation(line)
+
+    def __check_orientation(self, line):
+        """
+        Warn if the wrist cannot hold the orientation of the held block at the current position.
+        """
+        if self.__orientation is None:
+            return
+        [x_user, y_user, _] = self.__coordinates
+        if not self.__reachability.orientation_feasible(x_user, y_user, self.__orientation):
+            message = "Die Orientierung des Blocks kann an der Position ({}, {}) nicht beibehalten werden, der Block " \
+                      "wird so weit wie möglich gedreht.".format(x_user, y_user)
+            Debug.msg("Zeile {}: {}".format(line, message))
+            self.warnings.append((line, message))
@@ -0,0 +1,227 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+This file contains the ReachabilityTable class, which precomputes the workspace of the uArm for the whole board.
+
+Usage: python -m src.reachability_table [--output FILE]
+"""
+
+import sys
+import json
+import argparse
+
+import numpy
+
+from src.config import Config
+from src.geometry_helper import GeometryHelper
+from src.robot_error import ErrorCode, RobotError
+
+
+class ReachabilityTable:
+    """
+    Lookup table for every board cell (x, y) and level z in 0..max_height of user frame. It holds the pose in uarm
+    frame, the result of the workspace checks of GeometryHelper, the base angle of the arm and the feasible interval of
+    the object orientation.
+
+    The object orientation is the angle from the world x-axis to the gripper in degrees, orientation =
+    base_angle + 90 - wrist (see GeometryHelper.calculate_equal_wrist_rotation). With the wrist servo limits this gives
+    the interval [base_angle + 90 - higher limit, base_angle + 90 - lower limit] per cell.
+
+    The transform functions have the same signature and errors as the ones of GeometryHelper, poses outside of the
+    table are passed on to GeometryHelper.
+    """
+    __instance = None
+
+    def __init__(self):
+        """
+        Build the table from the shared configuration.
+        """
+        config = Config.instance()
+        self.__config = config
+        self.__geometry_helper = GeometryHelper()
+        self.__edge_length = config.edge_length
+        self.__x_offset = config.x_offset
+        self.__y_offset = config.y_offset
+        self.__z_offset = config.z_offset
+        self.__size = (config.board_size[0], config.board_size[1], config.max_height + 1)
+
+        # all cells and levels in one vectorized transformation
+        grid = numpy.indices(self.__size).reshape(3, -1).T
+        result = self.__geometry_helper.transform_poses_user_to_uarm(grid)
+        self.__pose = result['pose'].reshape(self.__size + (3,))
+        self.__position_ok = result['position_ok'].reshape(self.__size)
+        self.__height_ok = result['height_ok'].reshape(self.__size)
+        self.__reachable = result['reachable'].reshape(self.__size)
+
+        # base angle and orientation interval only depend on the cell
+        x_uarm = self.__pose[:, :, 0, 0]
+        y_uarm = self.__pose[:, :, 0, 1]
+        self.__base_angle = numpy.degrees(numpy.arctan2(y_uarm, x_uarm))
+        lower, higher = config.servo_three_limit
+        self.__servo_three_limit = (lower, higher)
+        self.__orientation_interval = numpy.stack((self.__base_angle + 90 - higher,
+                                                   self.__base_angle + 90 - lower), axis=-1)
+
+    @classmethod
+    def instance(cls):
+        """
+        Returns the shared table, it is built on the first call and again after Config.reload().
+        :rtype: ReachabilityTable
+        """
+        if cls.__instance is None or cls.__instance.__config is not Config.instance():
+            cls.__instance = cls()
+        return cls.__instance
+
+    @property
+    def size(self):
+        """
+        Size of the table (cells in x, cells in y, levels).
+        """
+        return self.__size
+
+    def __index(self, x_user, y_user, z_user):
+        """
+        Returns the table index of the pose or None if the pose is not in the table.
+        """
+        index = (x_user, y_user, z_user)
+        for value, size in zip(index, self.__size):
+            if value != int(value) or not 0 <= value < size:
+                return None
+        return tuple(int(value) for value in index)
+
+    def __user_from_uarm(self, value_uarm, offset, center):
+        """
+        Returns the user frame value of an uarm frame value if it is exactly on the grid, otherwise None.
+        """
+        value_user = round((value_uarm - offset) / self.__edge_length - center)
+        if (value_user + center) * self.__edge_length + offset == value_uarm:
+            return value_user
+        return None
+
+    def is_reachable(self, x_user, y_user, z_user):
+        """
+        Returns True if the pose in user frame is in the workspace.
+        :rtype: bool
+        """
+        index = self.__index(x_user, y_user, z_user)
+        if index is None:
+            return bool(self.__geometry_helper.transform_poses_user_to_uarm([[x_user, y_user, z_user]])['reachable'][0])
+        return bool(self.__reachable[index])
+
+    def base_angle(self, x_user, y_user):
+        """
+        Angle from the world x-axis to the arm in degrees when the arm is above the cell. Cells outside of the board
+        are computed with GeometryHelper.
+        :rtype: float
+        """
+        index = self.__index(x_user, y_user, 0)
+        if index is None:
+            [x_uarm, y_uarm, _] = self.__geometry_helper.transform_poses_user_to_uarm([[x_user, y_user, 0]])['pose'][0]
+            return float(numpy.degrees(numpy.arctan2(y_uarm, x_uarm)))
+        return float(self.__base_angle[index[:2]])
+
+    def orientation_interval(self, x_user, y_user):
+        """
+        Interval of object orientations in degrees which the wrist can hold above the cell.
+        :return: [lowest orientation, highest orientation]
+        :rtype: list[float]
+        """
+        index = self.__index(x_user, y_user, 0)
+        if index is None:
+            lower, higher = self.__servo_three_limit
+            base_angle = self.base_angle(x_user, y_user)
+            return [base_angle + 90 - higher, base_angle + 90 - lower]
+        return [float(angle) for angle in self.__orientation_interval[index[:2]]]
+
+    def orientation_feasible(self, x_user, y_user, orientation):
+        """
+        Returns True if the wrist can hold an object with the orientation above the cell. Objects are symmetric to 180
+        degree rotations.
+        :param orientation: object orientation in degrees
+        :type orientation: float
+        :rtype: bool
+        """
+        lower, higher = self.orientation_interval(x_user, y_user)
+        # smallest equivalent orientation above the lower limit
+        orientation = lower + (orientation - lower) % 180
+        return bool(orientation <= higher)
+
+    def transform_pose_user_to_uarm(self, x_user, y_user, z_user):
+        """
+        Table version of GeometryHelper.transform_pose_user_to_uarm.
+        """
+        index = self.__index(x_user, y_user, z_user)
+        if index is None:
+            return self.__geometry_helper.transform_pose_user_to_uarm(x_user, y_user, z_user)
+        if not self.__position_ok[index]:
+            message = "Die eingegebenen Koordinaten sind nicht für den Roboter erreichbar."
+            raise RobotError(ErrorCode.E0000, message)
+        if not self.__height_ok[index]:
+            message = "Die gewünschte Höhe ist für den Roboter nicht erreichbar, bitte geben Sie einen anderen Wert an."
+            raise RobotError(ErrorCode.E0004, message)
+        [x_uarm, y_uarm, z_uarm] = self.__pose[index]
+        return {'x': float(x_uarm), 'y': float(y_uarm), 'z': float(z_uarm)}
+
+    def transform_position_user_to_uarm(self, x_user, y_user, z_uarm):
+        """
+        Table version of GeometryHelper.transform_position_user_to_uarm.
+        """
+        z_user = self.__user_from_uarm(z_uarm, self.__z_offset, 0)
+        index = None if z_user is None else self.__index(x_user, y_user, z_user)
+        if index is None:
+            return self.__geometry_helper.transform_position_user_to_uarm(x_user, y_user, z_uarm)
+        if not self.__position_ok[index]:
+            message = "Die eingegebenen Koordinaten sind nicht für den Roboter erreichbar."
+            raise RobotError(ErrorCode.E0000, message)
+        [x_uarm, y_uarm, _] = self.__pose[index]
+        return {'x': float(x_uarm), 'y': float(y_uarm)}
+
+    def transform_height_user_to_uarm(self, z_user, x_uarm, y_uarm):
+        """
+        Table version of GeometryHelper.transform_height_user_to_uarm.
+        """
+        x_user = self.__user_from_uarm(x_uarm, self.__x_offset, .5)
+        y_user = self.__user_from_uarm(y_uarm, self.__y_offset, .5)
+        index = None if x_user is None or y_user is None else self.__index(x_user, y_user, z_user)
+        if index is None:
+            return self.__geometry_helper.transform_height_user_to_uarm(z_user, x_uarm, y_uarm)
+        if not self.__height_ok[index]:
+            message = "Die gewünschte Höhe ist für den Roboter nicht erreichbar, bitte geben Sie einen anderen Wert an."
+            raise RobotError(ErrorCode.E0004, message)
+        return float(self.__pose[index][2])
+
+    def export(self):
+        """
+        Export the table for the user interface, e.g. to shade unreachable cells. All arrays are indexed [x][y][z] or
+        [x][y].
+        :return: {'size', 'reachable', 'position_ok', 'height_ok', 'pose', 'base_angle', 'orientation_interval'}
+        :rtype: dict
+        """
+        return {'size': list(self.__size),
+                'reachable': self.__reachable.tolist(),
+                'position_ok': self.__position_ok.tolist(),
+                'height_ok': self.__height_ok.tolist(),
+                'pose': self.__pose.tolist(),
+                'base_angle': self.__base_angle.tolist(),
+                'orientation_interval': self.__orientation_interval.tolist()}
+
+
+def main():
+    """
+    Command line interface, writes the table as json.
+    """
+    parser = argparse.ArgumentParser(description="Export the reachability table of the board")
+    parser.add_argument("--output", default=None, help="json output file, default is stdout")
+    args = parser.parse_args()
+
+    table = ReachabilityTable.instance().export()
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as output_file:
+            json.dump(table, output_file)
+    else:
+        json.dump(table, sys.stdout)
+        sys.stdout.write('\n')
+
+
+if __name__ == '__main__':
+    main()
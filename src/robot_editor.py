@@ -6,15 +6,14 @@ This file contains the RobotEditor class.
 
 
 import os
-try:
-    import configparser
-except:
-    from six.moves import configparser
-from PyQt5.QtCore import QThread, QSize
-from PyQt5.QtGui import QColor,QPixmap
+from PyQt5.QtCore import QThread, QSize, pyqtSignal
+from PyQt5.QtGui import QColor,QPixmap, QTextCursor, QTextFormat
 from PyQt5.QtWidgets import QPlainTextEdit, QWidget, QPushButton, QVBoxLayout, QHBoxLayout, QComboBox, QLabel, QTextEdit
 
+from src.config import Config
 from src.robot_error import RobotError
+from src.timeline import Timeline
+from src.timeline_window import TimelineWindow
 from src.user_script import UserScript
 from src.user_challenge import UserChallenge
 from src.window_success_cube import MagicCubeWindow
@@ -25,11 +24,60 @@ class Thread(QThread):
     def __init__(self,robot_handler):
         super(Thread, self).__init__()
         self.robot_handler = robot_handler
+        # home the arm even if the pose is known (set by the stop button)
+        self.force = False
     def run(self):
-        UserScript.reset(self.robot_handler)  
+        UserScript.reset(self.robot_handler, self.force)
+        self.force = False
         QThread.sleep(1)
 
 
+class ScriptThread(QThread):
+    ''' Runs a user script, the progress is sent to the editor with signals'''
+    # executed commands, total commands
+    step_progress = pyqtSignal(int, int)
+    # line number of the current command
+    current_line = pyqtSignal(int)
+    # blocks at their goal, total goals
+    block_state = pyqtSignal(int, int)
+    # result of run_script
+    script_finished = pyqtSignal(object)
+    # error message
+    script_error = pyqtSignal(str)
+
+    def __init__(self, robot_handler):
+        super(ScriptThread, self).__init__()
+        self.robot_handler = robot_handler
+        self.user_script = None
+        self.pipelined = False
+        self.optimize = False
+        # ArmBarrier of a multi-arm run
+        self.barrier = None
+        # Timeline of the run
+        self.timeline = None
+
+    def cancel(self):
+        ''' Stops the script before the next command'''
+        if self.user_script is not None:
+            self.user_script.cancel()
+
+    def run(self):
+        try:
+            success = self.user_script.run_script(self.robot_handler, self.pipelined, self.optimize,
+                                                  self.__progress, self.barrier, self.timeline)
+        except RobotError as error:
+            self.script_error.emit(error.message)
+        else:
+            self.script_finished.emit(success)
+
+    def __progress(self, step, total, line):
+        self.step_progress.emit(step, total)
+        self.current_line.emit(line)
+        if step > 0:
+            # the block state changes only with executed commands
+            self.block_state.emit(*self.user_script.progress())
+
+
 
 
 class RobotEditor(QWidget):
@@ -52,6 +100,8 @@ class RobotEditor(QWidget):
         self.__reset_button = QPushButton('Stop')
         self.__reset_task_button = QPushButton('Aufgabe zurücksetzen')
         self.__magic_cube_button = QPushButton('Magic Cube Kommunikation')
+        self.__timeline_button = QPushButton('Zeitablauf')
+        self.__timeline_button.setEnabled(False)
         self.__challenge_choice = QComboBox()
         
         # adds challenge informations to self.challenge_infos (dict) and completes the text challenge info text, sample text and adds the challenges
@@ -59,7 +109,20 @@ class RobotEditor(QWidget):
         
         # Allows only one click on the reset button
         self.__running_reset = Thread(self.__robot_handler)
-        self.__running_reset.finished.connect(lambda: self.__reset_button.setEnabled(True))
+        self.__running_reset.finished.connect(self.__reset_finished)
+
+        # Runs the user script, the GUI stays responsive
+        self.__running_script = ScriptThread(self.__robot_handler)
+        self.__running_script.step_progress.connect(self.__script_step)
+        self.__running_script.current_line.connect(self.__highlight_line)
+        self.__running_script.block_state.connect(self.__script_blocks)
+        self.__running_script.script_finished.connect(self.__script_finished)
+        self.__running_script.script_error.connect(self.__script_error)
+        self.__running_script.finished.connect(self.__script_stopped)
+        # blocks at their goal during the run
+        self.__blocks_text = ""
+        # the robot is reset when the script thread finished (stop button or error)
+        self.__reset_after_script = False
         
         
         
@@ -85,6 +148,9 @@ class RobotEditor(QWidget):
         # General challenge requirements and victory conditions: Will be updated in the loading process of the config.ini file (see self.__init_general_options())
         self.__required_challenges = 2
         self.completed_challenges = []
+        self.__pipelined_execution = False
+        self.__optimize_moves = False
+        self.__init_general_options()
         
         # Last box
         
@@ -110,12 +176,10 @@ class RobotEditor(QWidget):
         '''
         Read the general options out of the config file in the config folder. Add additional changeable parameter in the config file
         '''
-        parent_path = os.path.dirname(os.path.dirname( os.path.abspath(__file__)))
-        path = os.path.join(parent_path,"config/config.ini")
-        parser = configparser.ConfigParser()
-        parser.read(path)
-        
-        self.__required_challenges = parser['CHALLENGES']['required_challenges']
+        config = Config.instance()
+        self.__required_challenges = config.required_challenges
+        self.__pipelined_execution = config.pipelined_execution
+        self.__optimize_moves = config.optimize_moves
       
     def __init_ui(self):
         """
@@ -149,6 +213,7 @@ class RobotEditor(QWidget):
         # fourth horrizontal button, opens cube connection window
         h_box_4 = QHBoxLayout()
         h_box_4.addWidget(self.__magic_cube_button)
+        h_box_4.addWidget(self.__timeline_button)
         
         # Last Box, label and comment
         h_box_final = QHBoxLayout()
@@ -163,6 +228,7 @@ class RobotEditor(QWidget):
         self.__reset_task_button.setToolTip('Löscht den Fortschritt der aktuellen Challenge.')
         self.__challenge_choice.setToolTip('Wählt eine Challenge aus')
         self.__magic_cube_button.setToolTip('Öffnet ein Fenster, um den aktuellen Fortschritt dem Magic Cube zu senden.')
+        self.__timeline_button.setToolTip('Zeigt, wie lange die Befehle des letzten Durchlaufs gedauert haben.')
         
         
         
@@ -180,11 +246,12 @@ class RobotEditor(QWidget):
 
 
         # button connections
-        self.__run_button.clicked.connect(self.__run_script)
+        self.__run_button.clicked.connect(lambda: self.start_script())
         self.__reset_button.clicked.connect(self.__reset_button_clicked)
         self.__reset_task_button.clicked.connect(self.__reset_challenge)
         self.__challenge_choice.activated[str].connect(self.__choice_event)
         self.__magic_cube_button.clicked.connect(self.send_to_cube_window)
+        self.__timeline_button.clicked.connect(self.timeline_window)
 
         # layout
         self.setLayout(v_box)
@@ -197,53 +264,134 @@ class RobotEditor(QWidget):
 
         self.show()
 
-    def __run_script(self):
+    def start_script(self, barrier=None):
         """
-        Run script if possible, if not display error message.
+        Load the script and run it on the script thread, if not possible display error message.
+        :param barrier: barrier shared with the editors of the other arms, used by warten()
+        :type barrier: ArmBarrier
+        :return: True if the script was started
+        :rtype: bool
         """
-        self.__run_button.setEnabled(False)
+        if self.__running_script.isRunning():
+            return False
+        if self.__running_reset.isRunning():
+            self.__output_console.setText("Der Roboter wird zurückgesetzt, bitte warten.")
+            return False
         input_string = self.__text.toPlainText()
         
-        success = False
         if input_string =='':
             self.__output_console.setText("Keine Befehle eingegeben. Bitte gebe Befehle in das Befehleingabefeld ein.")
+            return False
+        challenge = self.__challenge_choice.currentText()
+        try:
+            if hasattr(self, 'user_script') and self.user_script.current_challenge() == challenge:
+                print('Continue challenge')
+                self.user_script.load_commands(input_string, self.__robot_handler)
+            else:
+                print('Load new challenge')
+                self.user_script = UserScript(input_string, self.__robot_handler, challenge)
+        except RobotError as error:
+            self.__output_console.setText("FEHLER: " + error.message)
+            return False
+
+        self.__output_console.setText("Skript wird ausgeführt.")
+        self.__blocks_text = ""
+        # the highlighted lines must not change during the run
+        self.__run_button.setEnabled(False)
+        self.__reset_task_button.setEnabled(False)
+        self.__challenge_choice.setEnabled(False)
+        self.__text.setReadOnly(True)
+        self.__running_script.user_script = self.user_script
+        self.__running_script.pipelined = self.__pipelined_execution
+        self.__running_script.optimize = self.__optimize_moves
+        self.__running_script.barrier = barrier
+        self.__running_script.timeline = Timeline()
+        self.__timeline_button.setEnabled(False)
+        self.__running_script.start()
+        return True
+
+    def stop_script(self):
+        """
+        Stop the running script like the stop button.
+        """
+        self.__reset_button_clicked()
+
+    def __script_step(self, step, total):
+        """
+        Show the progress of the running script.
+        """
+        self.__output_console.setText("Skript wird ausgeführt. Befehl {} von {}.".format(step + 1, total)
+                                      + self.__blocks_text)
+
+    def __script_blocks(self, reached, total):
+        """
+        Show the blocks at their goal during the run.
+        """
+        self.__blocks_text = " Blöcke am Ziel: {} von {}".format(reached, total)
+
+    def __highlight_line(self, line):
+        """
+        Highlight the line of the current command.
+        :param line: line number, starting at 1
+        :type line: int
+        """
+        selection = QTextEdit.ExtraSelection()
+        selection.format.setBackground(QColor(255, 255, 150))
+        selection.format.setProperty(QTextFormat.FullWidthSelection, True)
+        selection.cursor = QTextCursor(self.__text.document().findBlockByNumber(line - 1))
+        self.__text.setExtraSelections([selection])
+
+    def __script_finished(self, success):
+        """
+        Show the result of the script.
+        """
+        if success == False:
+            reached, total = self.user_script.progress()
+            self.__output_console.setText("Aufgabe noch nicht erfüllt, versuche es erneut. Blöcke am Ziel: {} von {}".format(reached, total))
+        elif success == 'test':
+            self.__output_console.setText("Befehle ausgeführt. Testmodus.")
         else:
-            self.__output_console.setText("Skript wird ausgeführt.")
-            challenge = self.__challenge_choice.currentText()
-            try:
-                if hasattr(self, 'user_script'):
-                    if self.user_script.current_challenge() == challenge:
-                        print('Continue challenge')
-                        self.user_script.load_commands(input_string, self.__robot_handler)
-                    else:
-                        print('Load new challenge')
-                        self.user_script = UserScript(input_string, self.__robot_handler, challenge)
-                        
-                else:
-                        print('Load new challenge')
-                        self.user_script = UserScript(input_string, self.__robot_handler, challenge)
-                        
-                success = self.user_script.run_script(self.__robot_handler)
-                
-                if success == False:
-                    self.__output_console.setText("Aufgabe noch nicht erfüllt, versuche es erneut.")
-                elif success == 'test':
-                    self.__output_console.setText("Befehle ausgeführt. Testmodus.")
-                else:
-                    # TODO (ALR): Add Magic Cube Wifi toggle here.
-                    n = self.challenge_solved(success)
-                    self.__output_console.setText("Aufgabe {} erfolgreich ausgeführt. Super! Gelöste Challenges: {} von {}".format(success,n,self.__required_challenges))
-                    self.send_to_cube_window()
-            except RobotError as error:
-                self.__output_console.setText("FEHLER: " + error.message)
-                self.__reset()
-                
+            # TODO (ALR): Add Magic Cube Wifi toggle here.
+            n = self.challenge_solved(success)
+            self.__output_console.setText("Aufgabe {} erfolgreich ausgeführt. Super! Gelöste Challenges: {} von {}".format(success,n,self.__required_challenges))
+            self.send_to_cube_window()
+        for warning in self.user_script.warnings:
+            self.__output_console.setText(self.__output_console.text() + "\nWarnung " + warning)
+
+    def __script_error(self, message):
+        """
+        Show the error of the script and move the robot back.
+        """
+        self.__output_console.setText("FEHLER: " + message)
+        self.__reset_after_script = True
+
+    def __script_stopped(self):
+        """
+        Enable the editor again after the script thread finished, the robot is moved back if the script was stopped
+        or failed.
+        """
+        self.__text.setExtraSelections([])
+        self.__text.setReadOnly(False)
         self.__run_button.setEnabled(True)
-    
+        self.__reset_task_button.setEnabled(True)
+        self.__challenge_choice.setEnabled(True)
+        self.__timeline_button.setEnabled(True)
+        if self.__reset_after_script:
+            self.__reset_after_script = False
+            self.__reset()
 
     def __reset_button_clicked(self):
         ''' The reset function when the reset button is clicked'''
         
+        if not self.__running_reset.isRunning():
+            self.__running_reset.force = True
+        if self.__running_script.isRunning():
+            # the robot is reset when the script thread stopped
+            self.__output_console.setText("Skript wird abgebrochen.")
+            self.__reset_after_script = True
+            self.__running_script.cancel()
+            self.__robot_handler.emergency_stop()
+            return
         self.__output_console.setText("Zurücksetzen des Roboters.")
         self.__reset()
     def __reset(self):
@@ -253,8 +401,18 @@ class RobotEditor(QWidget):
 
         if not self.__running_reset.isRunning():          
             self.__reset_button.setEnabled(False)
+            # no script may move the robot during the reset
+            self.__run_button.setEnabled(False)
             self.__running_reset.start()
 
+    def __reset_finished(self):
+        """
+        Enable the buttons again after the reset thread finished.
+        """
+        self.__reset_button.setEnabled(True)
+        if not self.__running_script.isRunning():
+            self.__run_button.setEnabled(True)
+
             
             
     def __reset_challenge(self):
@@ -318,6 +476,13 @@ class RobotEditor(QWidget):
         self.__magic_cube_window = MagicCubeWindow(self.challenge_solved(),self.__required_challenges)
     
     
+    def timeline_window(self):
+        '''
+        Opens a window with the timeline of the last script run
+        '''
+        if self.__running_script.timeline is not None:
+            self.__timeline_window = TimelineWindow(self.__running_script.timeline)
+
     def add_challenges(self):
         ''' 
         Loads the challenges and add the description text, sample text and all the challenges to the dropdown menu
@@ -40,7 +40,7 @@ class ErrorCode(Enum):
     E0002 = 2   # RobotHandler
     E0003 = 3   # GeometryHelper
     E0004 = 4   # GeometryHelper
-    E0005 = 5   # RobotHandler
+    E0005 = 5   # RobotHandler: emergency stop
     E0006 = 6   # UserScript
     E0007 = 7   # UserScript
     E0008 = 8   # UserScript
@@ -51,9 +51,14 @@ class ErrorCode(Enum):
     E0013 = 13  # UserChallenge
     E0014 = 14  # UserChallenge
     E0015 = 15  # UserChallenge: Block in Air
+    E0016 = 16  # Config: invalid config file
+    E0017 = 17  # UserScript: script cancelled
+    E0018 = 18  # ArmBarrier: another arm stopped
+    E0019 = 19  # Calibration: arm does not come to rest
     
     #Error bei falscher Eingabe: User script
     E0100 = 100 # UserScript: Drehung falsch
+    E0101 = 101 # UserScript: warten falsch
 
 
     
\ No newline at end of file
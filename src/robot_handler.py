@@ -4,24 +4,31 @@
 This file contains the RobotHandler class, which handles the communication with the uArm Swift pro.
 """
 
-import time
-
-
+import math
 
 
 from libraries.uArm_Python_SDK.uarm.wrapper import SwiftAPI
+from src.config import Config
 from src.geometry_helper import GeometryHelper
+from src.reachability_table import ReachabilityTable
+from src.motion_sync import Actuator, MotionSync
 from src.robot_error import ErrorCode, RobotError
+from src.timeline import span
 from src.user_challenge import UserChallenge
 
 
 class RobotHandler:
-    def __init__(self):
+    def __init__(self, swift=None):
         """
         Connect on initialization.
+        :param swift: uArm to use instead of the one on the USB port, e.g. a SwiftAPI on the loopback transport
+        :type swift: SwiftAPI
         """
-        # connect to uArm
-        self.__swift = SwiftAPI(filters={'hwid': 'USB VID:PID=2341:0042'})
+        self.load_general_options()
+        # connect to uArm, a larger command window allows streaming movements
+        if swift is None:
+            swift = SwiftAPI(filters={'hwid': 'USB VID:PID=2341:0042'}, cmd_pend_size=self.__cmd_pend_size)
+        self.__swift = swift
         self.__swift.waiting_ready(timeout=5)
         # set general mode: 0
         self.__swift.set_mode(0)
@@ -34,34 +41,137 @@ class RobotHandler:
         self.__angle_range_servo_limit = self.__higher_servo_limit-self.__lower_servo_limit
         self.__pick_up_height_correction = -9
 
-        # set sleep time to wait for servo to finish
-        self.__sleep_time = 1.0
+        # waits until the arm really finished a command
+        self.__motion_sync = MotionSync(self.__swift)
+        # in pipelined mode only the synchronization points wait for the arm
+        self.__pipelined = False
+        # largest move per actuator since the last synchronization point
+        self.__pending_moves = {}
 
         # initialize geometry helper
         self.__geometry_helper = GeometryHelper()
+        # precomputed workspace of the board, moves are table lookups
+        self.__reachability = ReachabilityTable.instance()
 
         # initialize empty position values
         self.__x_uarm = 0
         self.__y_uarm = 0
         self.__z_uarm = 0
         self.__wrist_angle = 0
+        self.__pump = False
+        self.x_user = None
+        self.y_user = None
+        self.z_user = None
+        # the tracked pose is only trusted after a full reset and until a command failed
+        self.__state_known = False
+        # wrist angle at the start position, known after the first full reset
+        self.__reset_wrist_angle = None
         # set values and move to predefined position (3, 8)
-        self.reset()
+        self.reset(force=True)
+
+    def load_general_options(self):
+        config = Config.instance()
+        self.__cmd_pend_size = config.cmd_pend_size
+        self.__reset_position = config.reset_position
+        self.__max_height = config.max_height
+
+    @property
+    def timeline(self):
+        """
+        Timeline of the running script, None if no timeline is recorded.
+        """
+        return self.__motion_sync.timeline
+
+    @timeline.setter
+    def timeline(self, timeline):
+        self.__motion_sync.timeline = timeline
+
+    def start_pipeline(self):
+        """
+        Start pipelined mode: movements are streamed to the uArm and the firmware blends consecutive moves. Only the
+        pump commands wait until the arm really stopped.
+        """
+        self.__pipelined = True
+
+    def stop_pipeline(self):
+        """
+        Wait for all streamed commands and leave pipelined mode, also if the waiting fails.
+        """
+        try:
+            self.synchronize()
+        finally:
+            self.__pipelined = False
+
+    def synchronize(self, moves=None):
+        """
+        Synchronization point: wait until all sent commands are finished.
+        :param moves: moves right before the synchronization point, see MotionSync.wait
+        :type moves: dict[Actuator, float]
+        """
+        self.__add_moves(moves or {})
+        try:
+            self.__motion_sync.wait(self.__pending_moves)
+        except RobotError:
+            # the arm did not report the end of the movement, the tracked pose can be wrong
+            self.__state_known = False
+            raise
+        finally:
+            self.__pending_moves = {}
+
+    def __settle(self, moves):
+        """
+        Wait for the moves unless the commands are streamed in pipelined mode.
+        :param moves: size of the move per actuator, see MotionSync.settle_time
+        :type moves: dict[Actuator, float]
+        """
+        if self.__pipelined:
+            self.__add_moves(moves)
+        else:
+            self.synchronize(moves)
+
+    def __add_moves(self, moves):
+        """
+        Remember the largest move per actuator until the next synchronization point.
+        """
+        for actuator, amount in moves.items():
+            self.__pending_moves[actuator] = max(self.__pending_moves.get(actuator, 0.0), amount)
+
+    def emergency_stop(self):
+        """
+        Stop the arm immediately. The queued commands are dropped, the firmware stops the current move and every
+        following command or wait raises E0005 until the next reset. Can be called from another thread.
+        """
+        self.__motion_sync.stop()
+        self.__swift.emergency_stop()
+        # the arm stopped somewhere on its way
+        self.__state_known = False
 
     def disconnect(self):
         """
-        Disconnect robot.
+        Disconnect robot after the running commands are finished.
         """
-        self.__swift.flush_cmd()
-        time.sleep(3)
+        try:
+            self.synchronize()
+        except RobotError:
+            # stopped or not answering, the connection is closed anyway
+            pass
         self.__swift.disconnect()
 
-    def reset(self):
+    def reset(self, force=False):
         """
-        Reset robot, go back to start position.
+        Reset robot, go back to start position. If the tracked pose is known, the arm moves directly to the start
+        position (nothing is done if it is already there), otherwise the arm is homed first.
+        :param force: always home the arm
+        :type force: bool
         """
+        self.__motion_sync.clear_stop()
+        if not force and self.__state_known:
+            self.__reset_known_state()
+            return
+
         # reset arm to home
-        self.__swift.reset(wait=True, speed=10000)
+        with span(self.timeline, 'reset'):
+            self.__swift.reset(wait=True, speed=10000)
         # get pose values in uarm frame
         pose = self.__swift.get_position()
         # check if successful
@@ -69,6 +179,10 @@ class RobotHandler:
             self.__x_uarm = pose[0]
             self.__y_uarm = pose[1]
             self.__z_uarm = pose[2]
+            # the home pose is not a pose in user frame
+            self.x_user = None
+            self.y_user = None
+            self.z_user = None
         else:
             message = "Die Roboter Position konnte nicht gelesen werden, überprüfe die Verbindung."
             raise RobotError(ErrorCode.E0001, message)
@@ -78,110 +192,179 @@ class RobotHandler:
         wrist_angle = 90.0
         self.__swift.set_servo_angle(servo_id=3, angle=wrist_angle)
         self.__wrist_angle = wrist_angle
+        # the wrist angle is unknown after homing, 90 degrees is the largest rotation to the middle
+        self.synchronize({Actuator.wrist: 90.0})
 
+        # move to fix starting position in one move
+        [x_user, y_user, z_user] = self.__reset_position
+        self.move_to(x_user, y_user, z_user)
+        self.__reset_wrist_angle = self.__wrist_angle
+        self.__state_known = True
 
-        self.__swift.flush_cmd()
-        time.sleep(self.__sleep_time)
-
-        # move to fix starting position
-        self.position_new([3, 8])
-        self.height_new([2])
-        self.__swift.flush_cmd()
+    def __reset_known_state(self):
+        """
+        Go back to the start position from the tracked pose without homing the arm.
+        """
+        if self.__pump:
+            self.pump_off()
+        [x_user, y_user, z_user] = self.__reset_position
+        if [self.x_user, self.y_user, self.z_user] == [x_user, y_user, z_user] and \
+                self.__wrist_angle == self.__reset_wrist_angle:
+            return
+        # lift first, so the arm does not move through the blocks
+        if self.z_user < self.__max_height and \
+                self.__reachability.is_reachable(self.x_user, self.y_user, self.__max_height):
+            self.move_to(z_user=self.__max_height)
+        self.move_to(x_user, y_user, z_user, wrist=self.__reset_wrist_angle)
+        self.synchronize()
 
-    def position_new(self, position_user):
+    def move_to(self, x_user=None, y_user=None, z_user=None, wrist=None):
         """
-        Move robot arm to new position x, y in user frame.
-        :param position_user: position in user frame [x_user, y_user]
-        :type position_user: list[int]
+        Move robot arm to a new pose in user frame. The target pose is computed once and the xyz and wrist commands are
+        sent together, so the wrist rotates while the arm travels.
+        :param x_user: x-position in user frame, None keeps the current position
+        :type x_user: int
+        :param y_user: y-position in user frame, None keeps the current position
+        :type y_user: int
+        :param z_user: height in user frame, None keeps the current height
+        :type z_user: int
+        :param wrist: absolute wrist angle in degrees, None keeps the orientation of the gripped object
+        :type wrist: float
         """
-        [x_user, y_user] = position_user
-        self.x_user = x_user
-        self.y_user = y_user
-        # transform frames of positions
-        uarm_dict = self.__geometry_helper.transform_position_user_to_uarm(x_user, y_user, self.__z_uarm)
-        x_uarm_new = uarm_dict['x']
-        y_uarm_new = uarm_dict['y']
-
-        # calculate new wrist angle that keeps object in the same orientation
-        wrist_angle_new = self.__geometry_helper.calculate_equal_wrist_rotation_new(self.__x_uarm, x_uarm_new,
-                                                                                self.__y_uarm, y_uarm_new,
-                                                                                self.__wrist_angle)
-        #z_uarm_new = self.__geometry_helper.transform_height_user_to_uarm(self.__z_uarm, x_uarm_new, y_uarm_new)
-        self.__swift.set_position(x=x_uarm_new, y=y_uarm_new)
-        self.__swift.set_wrist(angle=wrist_angle_new, wait=True)
-        self.__swift.flush_cmd()
-        time.sleep(self.__sleep_time)
+        self.__motion_sync.check_stop()
+        with span(self.timeline, 'geometry'):
+            x_uarm_new, y_uarm_new, z_uarm_new, wrist_angle_new = self.__target_pose(x_user, y_user, z_user, wrist)
+
+        # move arm and wrist at the same time
+        moves = {Actuator.xy: math.hypot(x_uarm_new - self.__x_uarm, y_uarm_new - self.__y_uarm),
+                 Actuator.z: abs(z_uarm_new - self.__z_uarm)}
+        self.__swift.set_position(x=x_uarm_new, y=y_uarm_new, z=z_uarm_new)
+        if wrist_angle_new != self.__wrist_angle:
+            self.__swift.set_wrist(angle=wrist_angle_new)
+            moves[Actuator.wrist] = abs(wrist_angle_new - self.__wrist_angle)
+        self.__settle(moves)
 
         # set new values
+        if x_user is not None and y_user is not None:
+            self.x_user = x_user
+            self.y_user = y_user
+        if z_user is not None:
+            self.z_user = z_user
         self.__x_uarm = x_uarm_new
         self.__y_uarm = y_uarm_new
+        self.__z_uarm = z_uarm_new
         # set wrist angle to new, not to corrected because the correction is only for the motor
         self.__wrist_angle = wrist_angle_new
 
+    def __target_pose(self, x_user, y_user, z_user, wrist):
+        """
+        Compute the target pose of move_to in uarm frame.
+        :return: x, y, z and wrist angle in uarm frame
+        :rtype: tuple
+        """
+        move_xy = x_user is not None and y_user is not None
+        # transform frames of positions
+        if move_xy and z_user is not None:
+            uarm_dict = self.__reachability.transform_pose_user_to_uarm(x_user, y_user, z_user)
+            x_uarm_new = uarm_dict['x']
+            y_uarm_new = uarm_dict['y']
+            z_uarm_new = uarm_dict['z']
+        elif move_xy:
+            uarm_dict = self.__reachability.transform_position_user_to_uarm(x_user, y_user, self.__z_uarm)
+            x_uarm_new = uarm_dict['x']
+            y_uarm_new = uarm_dict['y']
+            z_uarm_new = self.__z_uarm
+        else:
+            x_uarm_new = self.__x_uarm
+            y_uarm_new = self.__y_uarm
+            z_uarm_new = self.__z_uarm
+            if z_user is not None:
+                z_uarm_new = self.__reachability.transform_height_user_to_uarm(z_user, self.__x_uarm, self.__y_uarm)
+
+        if wrist is None:
+            # calculate new wrist angle that keeps object in the same orientation
+            wrist_angle_new = self.__geometry_helper.calculate_equal_wrist_rotation_new(self.__x_uarm, x_uarm_new,
+                                                                                        self.__y_uarm, y_uarm_new,
+                                                                                        self.__wrist_angle)
+        else:
+            wrist_angle_new = wrist
+        return x_uarm_new, y_uarm_new, z_uarm_new, wrist_angle_new
+
+    def position_new(self, position_user):
+        """
+        Move robot arm to new position x, y in user frame.
+        :param position_user: position in user frame [x_user, y_user]
+        :type position_user: list[int]
+        """
+        [x_user, y_user] = position_user
+        self.move_to(x_user=x_user, y_user=y_user)
+
     def height_new(self, z_user_list):
-        """x_uarm_new
+        """
         Move robot arm to z position in user frame.
         :param z_user_list: new height in user frame [z_user]
         :type z_user_list: list[int]
         """
-        z_user = z_user_list[0]
-        # calculate new height in uarm frame
-        z_uarm_new = self.__geometry_helper.transform_height_user_to_uarm(z_user, self.__x_uarm, self.__y_uarm)
+        self.move_to(z_user=z_user_list[0])
 
-        # move arm
-        self.__swift.set_position(z=z_uarm_new)
-        self.__swift.flush_cmd()
-        time.sleep(self.__sleep_time)
-
-        # set values
-        self.__z_uarm = z_uarm_new
+    def pose_new(self, pose_user):
+        """
+        Move robot arm to new pose x, y, z in user frame in one move.
+        :param pose_user: pose in user frame [x_user, y_user, z_user]
+        :type pose_user: list[int]
+        """
+        [x_user, y_user, z_user] = pose_user
+        self.move_to(x_user=x_user, y_user=y_user, z_user=z_user)
 
     def pump_on(self):
         """
         Turn on the pump.
         """
+        self.__motion_sync.check_stop()
         #Correct angle to allow a wide range of corrections
-        angle =  self.__geometry_helper.adjust_wrist_rotation_before_pumpe_an(self.x_user,self.y_user)
+        with span(self.timeline, 'geometry'):
+            angle =  self.__geometry_helper.adjust_wrist_rotation_before_pumpe_an(self.x_user,self.y_user)
+        rotation = abs(angle - self.__wrist_angle)
         self.__wrist_angle = angle
         self.__swift.set_servo_angle(servo_id=3,angle = self.__wrist_angle)
-        self.__swift.flush_cmd()
-        time.sleep(self.__sleep_time)
-        
-       
+        # synchronization point: the streamed moves and the wrist have to be finished before picking up
+        self.synchronize({Actuator.wrist: rotation})
 
         # move arm slightly down (those, the arm will not touch blocks and only grips them if the pump is on)
         z_uarm_corrected = self.__z_uarm +self.__pick_up_height_correction
         self.__swift.set_position(z=z_uarm_corrected)
-        self.__swift.flush_cmd()
-        time.sleep(self.__sleep_time)
+        self.synchronize({Actuator.z: abs(self.__pick_up_height_correction)})
         
         # TUrns pump on
         self.__swift.set_pump(on=True)
-        self.__swift.flush_cmd()
-        time.sleep(self.__sleep_time)
+        self.__pump = True
+        self.synchronize({Actuator.pump_on: 0.0})
         
         # move arm slightly up again to reach previous position
         z_uarm_corrected = self.__z_uarm -self.__pick_up_height_correction
         self.__swift.set_position(z=z_uarm_corrected)
-        self.__swift.flush_cmd()
-        time.sleep(self.__sleep_time)
+        self.__settle({Actuator.z: abs(self.__pick_up_height_correction)})
 
     def pump_off(self):
         """
         Turn off the pump.
         """
+        self.__motion_sync.check_stop()
+        # synchronization point: the block may only be released once the arm arrived
+        self.synchronize()
         self.__swift.set_pump(on=False)
-        self.__swift.flush_cmd()
-        time.sleep(self.__sleep_time)
+        self.__pump = False
+        self.synchronize({Actuator.pump_off: 0.0})
    
     def drehen(self, rotation):
+        self.__motion_sync.check_stop()
         rotation = rotation[0]
         current_angle = self.__wrist_angle
-        angle = self.__geometry_helper.gripper_angle_rotation(current_angle,rotation)
+        with span(self.timeline, 'geometry'):
+            angle = self.__geometry_helper.gripper_angle_rotation(current_angle,rotation)
         self.__wrist_angle = angle
         self.__swift.set_servo_angle(servo_id=3,angle = self.__wrist_angle)
-        self.__swift.flush_cmd()
-        time.sleep(self.__sleep_time)
+        self.__settle({Actuator.wrist: abs(angle - current_angle)})
  
         
 
@@ -202,8 +385,7 @@ class RobotHandler:
                     print("angle {}".format(rot))
                     self.__wrist_angle = self.__wrist_servo_correction(rot)
                     self.__swift.set_servo_angle(servo_id=3,angle = self.__wrist_angle)
-                    self.__swift.flush_cmd()
-                    time.sleep(self.__sleep_time*2)
+                    self.__motion_sync.wait({Actuator.wrist: 10.0})
             elif (args[0])[0] == 1:
             
                 for x in range( 5,7,1):
@@ -0,0 +1,319 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+This file contains the SimulatedRobotHandler class, which simulates the uArm without hardware.
+"""
+
+import math
+import threading
+
+from src.config import Config
+from src.geometry_helper import GeometryHelper
+from src.reachability_table import ReachabilityTable
+from src.robot_error import ErrorCode, RobotError
+from src.debug import Debug
+from src.motion_sync import Actuator, SettleModel
+from src.timeline import span
+
+
+class SimulatedRobotHandler:
+    """
+    Kinematic simulation of the RobotHandler. The same geometry transformations and workspace checks are used as on
+    the real uArm, the travel time of each command is modelled with a trapezoidal speed profile.
+    """
+    def __init__(self, time_warp=None):
+        """
+        Initialize simulation and move to the reset position.
+        :param time_warp: complete all movements instantly, None uses the value of the config file
+        :type time_warp: bool
+        """
+        self.load_general_options()
+        if time_warp is not None:
+            self.__time_warp = time_warp
+
+        # same pick up correction as the real uArm
+        self.__pick_up_height_correction = -9
+
+        # initialize geometry helper
+        self.__geometry_helper = GeometryHelper()
+        # precomputed workspace of the board, moves are table lookups
+        self.__reachability = ReachabilityTable.instance()
+
+        # simulated state
+        self.__x_uarm = self.__home_position[0]
+        self.__y_uarm = self.__home_position[1]
+        self.__z_uarm = self.__home_position[2]
+        self.__wrist_angle = 90.0
+        self.__pump = False
+        self.x_user = None
+        self.y_user = None
+        self.z_user = None
+
+        # pipelined mode: waiting time is only added at synchronization points
+        self.__pipelined = False
+        self.__pending_settle = 0.0
+        # set by the emergency stop, interrupts the simulated movements
+        self.__stop = threading.Event()
+
+        # predicted runtime in seconds
+        self.__predicted_time = 0.0
+        # Timeline of the running script, None if no timeline is recorded
+        self.timeline = None
+
+        # wrist angle at the start position, known after the first full reset
+        self.__reset_wrist_angle = None
+        self.reset(force=True)
+
+    def load_general_options(self):
+        config = Config.instance()
+        self.__reset_position = config.reset_position
+        self.__max_height = config.max_height
+        # same settle margins as the real arm
+        self.__settle_model = SettleModel(config)
+        self.__speed = config.speed
+        self.__acceleration = config.acceleration
+        self.__wrist_speed = config.wrist_speed
+        self.__pump_time = config.pump_time
+        self.__home_position = config.home_position
+        self.__time_warp = config.time_warp
+
+    @property
+    def predicted_time(self):
+        """
+        Predicted runtime of all commands since the last reset_timer call in seconds.
+        """
+        return self.__predicted_time
+
+    @property
+    def pose(self):
+        """
+        Current simulated pose in uarm frame [x, y, z, wrist].
+        """
+        return [self.__x_uarm, self.__y_uarm, self.__z_uarm, self.__wrist_angle]
+
+    @property
+    def pump(self):
+        """
+        True if the pump is on.
+        """
+        return self.__pump
+
+    def reset_timer(self):
+        self.__predicted_time = 0.0
+
+    def travel_time(self, distance):
+        """
+        Duration of a linear move with a trapezoidal speed profile.
+        :param distance: travel distance in mm
+        :type distance: float
+        :return: travel time in seconds
+        :rtype: float
+        """
+        # distance needed to accelerate to full speed and brake again
+        ramp_distance = self.__speed ** 2 / self.__acceleration
+        if distance >= ramp_distance:
+            return distance / self.__speed + self.__speed / self.__acceleration
+        return 2.0 * math.sqrt(distance / self.__acceleration)
+
+    def __elapse(self, duration, settle):
+        """
+        Let the simulated time pass for one command.
+        :param duration: duration of the movement in seconds
+        :type duration: float
+        :param settle: settle margin after the movement in seconds
+        :type settle: float
+        """
+        if self.__pipelined:
+            self.__pending_settle = max(self.__pending_settle, settle)
+            settle = 0.0
+        self.__predicted_time += duration + settle
+        if not self.__time_warp:
+            with span(self.timeline, 'flush'):
+                self.__stop.wait(duration)
+            if settle > 0:
+                with span(self.timeline, 'settle'):
+                    self.__stop.wait(settle)
+        self.__check_stop()
+
+    def __check_stop(self):
+        """
+        Raise an error if the emergency stop is active.
+        """
+        if self.__stop.is_set():
+            message = "Der Roboter wurde angehalten."
+            raise RobotError(ErrorCode.E0005, message)
+
+    def __move(self, x_uarm, y_uarm, z_uarm, wrist_angle):
+        """
+        Simulate a combined xyz and wrist movement, the wrist rotates while the arm travels.
+        """
+        self.__check_stop()
+        # same moves as RobotHandler.move_to reports to MotionSync
+        moves = {Actuator.xy: math.hypot(x_uarm - self.__x_uarm, y_uarm - self.__y_uarm),
+                 Actuator.z: abs(z_uarm - self.__z_uarm)}
+        rotation = abs(wrist_angle - self.__wrist_angle)
+        if rotation > 0:
+            moves[Actuator.wrist] = rotation
+        _, settle = self.__settle_model.slowest(moves)
+        distance = math.hypot(moves[Actuator.xy], moves[Actuator.z])
+        self.__elapse(max(self.travel_time(distance), rotation / self.__wrist_speed), settle)
+
+        self.__x_uarm = x_uarm
+        self.__y_uarm = y_uarm
+        self.__z_uarm = z_uarm
+        self.__wrist_angle = wrist_angle
+
+    def start_pipeline(self):
+        self.__pipelined = True
+
+    def stop_pipeline(self):
+        try:
+            self.synchronize()
+        finally:
+            self.__pipelined = False
+
+    def synchronize(self):
+        """
+        Synchronization point: add the settle margin of the streamed commands.
+        """
+        settle = self.__pending_settle
+        self.__pending_settle = 0.0
+        self.__predicted_time += settle
+        if not self.__time_warp and settle > 0:
+            with span(self.timeline, 'settle'):
+                self.__stop.wait(settle)
+        self.__check_stop()
+
+    def emergency_stop(self):
+        """
+        Stop the simulated arm, every following command raises E0005 until the next reset.
+        """
+        self.__stop.set()
+        # the pose is unknown, the next reset homes the arm
+        self.__reset_wrist_angle = None
+
+    def disconnect(self):
+        Debug.msg("Disconnecting SimulatedRobotHandler.")
+
+    def reset(self, force=False):
+        """
+        Reset simulated robot, go back to start position. The same shortcut as in RobotHandler.reset is used.
+        :param force: always home the arm
+        :type force: bool
+        """
+        self.__stop.clear()
+        self.synchronize()
+        if not force and self.__reset_wrist_angle is not None:
+            self.__reset_known_state()
+            return
+        # home position of the uArm
+        [x_home, y_home, z_home] = self.__home_position
+        self.__move(x_home, y_home, z_home, 90.0)
+        self.x_user = None
+        self.y_user = None
+        self.z_user = None
+        self.pump_off()
+
+        # move to fix starting position in one move
+        [x_user, y_user, z_user] = self.__reset_position
+        self.move_to(x_user, y_user, z_user)
+        self.__reset_wrist_angle = self.__wrist_angle
+
+    def __reset_known_state(self):
+        if self.__pump:
+            self.pump_off()
+        [x_user, y_user, z_user] = self.__reset_position
+        if [self.x_user, self.y_user, self.z_user] == [x_user, y_user, z_user] and \
+                self.__wrist_angle == self.__reset_wrist_angle:
+            return
+        # lift first, so the arm does not move through the blocks
+        if self.z_user < self.__max_height and \
+                self.__reachability.is_reachable(self.x_user, self.y_user, self.__max_height):
+            self.move_to(z_user=self.__max_height)
+        self.move_to(x_user, y_user, z_user, wrist=self.__reset_wrist_angle)
+        self.synchronize()
+
+    def move_to(self, x_user=None, y_user=None, z_user=None, wrist=None):
+        """
+        Move simulated arm to a new pose in user frame, see RobotHandler.move_to.
+        """
+        move_xy = x_user is not None and y_user is not None
+        with span(self.timeline, 'geometry'):
+            # transform frames of positions
+            if move_xy and z_user is not None:
+                uarm_dict = self.__reachability.transform_pose_user_to_uarm(x_user, y_user, z_user)
+                x_uarm_new = uarm_dict['x']
+                y_uarm_new = uarm_dict['y']
+                z_uarm_new = uarm_dict['z']
+            elif move_xy:
+                uarm_dict = self.__reachability.transform_position_user_to_uarm(x_user, y_user, self.__z_uarm)
+                x_uarm_new = uarm_dict['x']
+                y_uarm_new = uarm_dict['y']
+                z_uarm_new = self.__z_uarm
+            else:
+                x_uarm_new = self.__x_uarm
+                y_uarm_new = self.__y_uarm
+                z_uarm_new = self.__z_uarm
+                if z_user is not None:
+                    z_uarm_new = self.__reachability.transform_height_user_to_uarm(z_user, self.__x_uarm,
+                                                                                   self.__y_uarm)
+
+            if wrist is None:
+                wrist_angle_new = self.__geometry_helper.calculate_equal_wrist_rotation_new(
+                    self.__x_uarm, x_uarm_new, self.__y_uarm, y_uarm_new, self.__wrist_angle)
+            else:
+                wrist_angle_new = wrist
+
+        self.__move(x_uarm_new, y_uarm_new, z_uarm_new, wrist_angle_new)
+
+        if move_xy:
+            self.x_user = x_user
+            self.y_user = y_user
+        if z_user is not None:
+            self.z_user = z_user
+
+    def position_new(self, position_user):
+        [x_user, y_user] = position_user
+        self.move_to(x_user=x_user, y_user=y_user)
+
+    def height_new(self, z_user_list):
+        self.move_to(z_user=z_user_list[0])
+
+    def pose_new(self, pose_user):
+        [x_user, y_user, z_user] = pose_user
+        self.move_to(x_user=x_user, y_user=y_user, z_user=z_user)
+
+    def drehen(self, rotation):
+        with span(self.timeline, 'geometry'):
+            angle = self.__geometry_helper.gripper_angle_rotation(self.__wrist_angle, rotation[0])
+        self.__move(self.__x_uarm, self.__y_uarm, self.__z_uarm, angle)
+
+    def pump_on(self):
+        """
+        Simulate picking up a block: adjust wrist, move slightly down, turn on pump and move up again.
+        """
+        with span(self.timeline, 'geometry'):
+            angle = self.__geometry_helper.adjust_wrist_rotation_before_pumpe_an(self.x_user, self.y_user)
+        self.__move(self.__x_uarm, self.__y_uarm, self.__z_uarm, angle)
+        self.synchronize()
+
+        z_uarm = self.__z_uarm
+        self.__move(self.__x_uarm, self.__y_uarm, z_uarm + self.__pick_up_height_correction, angle)
+        self.synchronize()
+        self.__pump = True
+        self.__elapse(self.__pump_time, self.__settle_model.settle_time(Actuator.pump_on))
+        self.synchronize()
+        self.__move(self.__x_uarm, self.__y_uarm, z_uarm - self.__pick_up_height_correction, angle)
+        self.__z_uarm = z_uarm
+
+    def pump_off(self):
+        """
+        Simulate releasing a block.
+        """
+        self.synchronize()
+        self.__pump = False
+        self.__elapse(self.__pump_time, self.__settle_model.settle_time(Actuator.pump_off))
+        self.synchronize()
+
+    def test_c(self, *args):
+        Debug.msg("test_c is not simulated")
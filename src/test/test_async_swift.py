@@ -0,0 +1,94 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+This file contains the AsyncSwiftAPI test of the uArm SDK, run against the fake firmware of the loopback transport.
+"""
+
+import asyncio
+import unittest
+
+from libraries.uArm_Python_SDK.uarm.wrapper.async_swift_api import AsyncSwiftAPI
+from libraries.uArm_Python_SDK.uarm.comm.loopback import FakeFirmware, LoopbackSerial
+from libraries.uArm_Python_SDK.uarm.swift import protocol
+
+
+class TestAsyncSwift(unittest.TestCase):
+    """
+    AsyncSwiftAPI test class.
+    """
+    def setUp(self):
+        self.firmware = FakeFirmware(latency=0.0, baudrate=0, time_factor=0)
+
+    def test_send_cmd(self):
+        """
+        Test connecting and sending commands.
+        """
+        async def run():
+            async with AsyncSwiftAPI(com=LoopbackSerial(self.firmware)) as swift:
+                self.assertTrue(swift.connected)
+                self.assertTrue(await swift.waiting_ready())
+                self.assertEqual(await swift.send_cmd_sync(protocol.GET_POSITION), ['OK', 'X200.00', 'Y0.00',
+                                                                                   'Z150.00'])
+                self.assertEqual(await swift.set_position(x=180, y=30, z=120, speed=1000), protocol.OK)
+                # without waiting the future of the reply is returned
+                reply = await swift.set_position(x=190, wait=False)
+                self.assertEqual(await reply, protocol.OK)
+                self.assertEqual(await swift.flush_cmd(timeout=1, wait_stop=True), protocol.OK)
+                self.assertEqual(await swift.get_position(), [190.0, 30.0, 120.0])
+            self.assertFalse(swift.connected)
+        asyncio.run(run())
+
+    def test_timeout(self):
+        """
+        Test that an unanswered command returns TIMEOUT and frees its place in the command window.
+        """
+        async def run():
+            async with AsyncSwiftAPI(com=LoopbackSerial(self.firmware), cmd_pend_size=2) as swift:
+                self.firmware.latency = 5.0
+                replies = await asyncio.gather(*[swift.send_cmd_sync(protocol.GET_POSITION, timeout=0.05)
+                                                 for _ in range(3)])
+                self.assertEqual(replies, [protocol.TIMEOUT] * 3)
+                self.firmware.latency = 0.0
+                self.assertEqual(await swift.get_position(timeout=1), [200.0, 0.0, 150.0])
+        asyncio.run(run())
+
+    def test_cancel(self):
+        """
+        Test that cancelled commands free their place in the command window.
+        """
+        async def run():
+            async with AsyncSwiftAPI(com=LoopbackSerial(self.firmware), cmd_pend_size=2) as swift:
+                self.firmware.latency = 5.0
+                tasks = [asyncio.ensure_future(swift.send_cmd_sync(protocol.GET_POSITION, timeout=10))
+                         for _ in range(2)]
+                await asyncio.sleep(0.05)
+                for task in tasks:
+                    task.cancel()
+                results = await asyncio.gather(*tasks, return_exceptions=True)
+                self.assertTrue(all(isinstance(result, asyncio.CancelledError) for result in results))
+                self.firmware.latency = 0.0
+                self.assertEqual(await asyncio.wait_for(swift.get_position(timeout=1), 2), [200.0, 0.0, 150.0])
+        asyncio.run(run())
+
+    def test_disconnect(self):
+        """
+        Test that disconnecting resolves the pending commands and ends the report iterators.
+        """
+        async def run():
+            swift = AsyncSwiftAPI(com=LoopbackSerial(self.firmware))
+            await swift.connect()
+            self.firmware.latency = 5.0
+            reply = await swift.send_cmd_async(protocol.GET_POSITION, timeout=10)
+            reports = [report async for report in self.__reports_until_disconnect(swift)]
+            self.assertEqual(reports, [])
+            self.assertEqual(await asyncio.wait_for(reply, 1), protocol.TIMEOUT)
+            self.assertFalse(swift.connected)
+            self.assertEqual(await swift.send_cmd_sync(protocol.GET_POSITION), protocol.TIMEOUT)
+        asyncio.run(run())
+
+    @staticmethod
+    async def __reports_until_disconnect(swift):
+        positions = swift.positions()
+        asyncio.get_running_loop().call_later(0.05, swift.disconnect)
+        async for position in positions:
+            yield position
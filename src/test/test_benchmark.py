@@ -0,0 +1,38 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+This file contains the benchmark suite test.
+"""
+
+import unittest
+
+from src.benchmark import bench_challenge, bench_script, bench_sdk, compare
+
+
+class TestBenchmark(unittest.TestCase):
+    """
+    Benchmark suite smoke test with small sizes.
+    """
+    def test_benchmarks(self):
+        """
+        Test that the benchmarks run and report their metrics.
+        """
+        sdk = bench_sdk(10)
+        self.assertGreater(sdk['sync_cmds_per_s'], 0)
+        self.assertGreater(sdk['async_cmds_per_s'], 0)
+
+        challenge = bench_challenge([4], 1)
+        self.assertIn('place_block_us', challenge['4'])
+
+        script = bench_script(1)
+        # pipelining never takes longer on the robot
+        self.assertLessEqual(script['pipelined']['predicted_robot_s'], script['plain']['predicted_robot_s'])
+
+    def test_compare(self):
+        """
+        Test the comparison of two runs.
+        """
+        baseline = {'results': {'sdk': {'sync_round_trip_ms': 2.0, 'async_cmds_per_s': 100.0}, 'old': {'x': 1}}}
+        current = {'results': {'sdk': {'sync_round_trip_ms': 1.0, 'async_cmds_per_s': 150.0}}}
+        self.assertEqual(compare(baseline, current), [('sdk.async_cmds_per_s', 100.0, 150.0, 50.0),
+                                                      ('sdk.sync_round_trip_ms', 2.0, 1.0, -50.0)])
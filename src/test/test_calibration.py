@@ -0,0 +1,65 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+This file contains the Calibration class test.
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from libraries.uArm_Python_SDK.uarm.wrapper import SwiftAPI
+from libraries.uArm_Python_SDK.uarm.comm.loopback import FakeFirmware, LoopbackSerial
+from src.calibration import Calibration, fit_settle_model, write_calibration
+from src.config import Config
+from src.motion_sync import Actuator, MotionSync
+
+
+class TestCalibration(unittest.TestCase):
+    """
+    Calibration test class.
+    """
+    def test_fit_settle_model(self):
+        """
+        Test that the fitted model covers all measurements.
+        """
+        samples = [(10, 0.06), (100, 0.11), (100, 0.13), (200, 0.16)]
+        seconds, per_unit = fit_settle_model(samples)
+        self.assertGreater(per_unit, 0)
+        for amount, settle in samples:
+            self.assertGreaterEqual(seconds + per_unit * amount, settle - 1e-6)
+        # without different move sizes only the largest time is used
+        self.assertEqual(fit_settle_model([(0, 0.2), (0, 0.3)], margin=0.1), [0.4, 0.0])
+
+    def test_run(self):
+        """
+        Test the calibration against the fake firmware of the loopback transport and write the result.
+        """
+        swift = SwiftAPI(com=LoopbackSerial(FakeFirmware(latency=0.0, baudrate=0, time_factor=0)))
+        try:
+            swift.waiting_ready()
+            models = Calibration(swift, repeat=1, rest=0.0, stable_samples=2).run()
+        finally:
+            swift.disconnect()
+        self.assertEqual(len(models['settle_xy']), 2)
+        self.assertIsInstance(models['settle_pump_on'], float)
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'config.ini')
+            shutil.copy(Config.default_path(), path)
+            write_calibration({'settle_xy': [0.02, 0.001], 'settle_pump_off': 0.3}, path)
+            config = Config.load(path)
+        self.assertEqual(config.settle_xy, (0.02, 0.001))
+        self.assertEqual(config.settle_pump_off, 0.3)
+        self.assertEqual(config.reset_position, Config.instance().reset_position)
+
+    def test_settle_time(self):
+        """
+        Test that short moves wait less than long moves.
+        """
+        motion_sync = MotionSync(None)
+        seconds, per_unit = Config.instance().settle_xy
+        self.assertEqual(motion_sync.settle_time(Actuator.xy), seconds)
+        self.assertAlmostEqual(motion_sync.settle_time(Actuator.xy, 200), seconds + 200 * per_unit)
+        self.assertLess(motion_sync.settle_time(Actuator.xy, 10), motion_sync.settle_time(Actuator.xy, 300))
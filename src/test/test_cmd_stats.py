@@ -0,0 +1,94 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+This file contains the Histogram and CommandStats test of the uArm SDK.
+"""
+
+import os
+import json
+import time
+import tempfile
+import unittest
+
+from libraries.uArm_Python_SDK.uarm.tools.stats import Histogram, CommandStats
+
+
+class TestCmdStats(unittest.TestCase):
+    """
+    Histogram and CommandStats test class.
+    """
+    def test_histogram(self):
+        """
+        Test the buckets and percentiles of known samples.
+        """
+        histogram = Histogram()
+        for value in [1e-5, 2e-5, 3e-5, 1e-3, -1.0]:
+            histogram.add(value)
+        # bucket i counts the values up to 1e-5 * 2 ** i seconds, negative values count as 0
+        self.assertEqual([(index, count) for index, count in enumerate(histogram.buckets) if count],
+                         [(0, 2), (1, 1), (2, 1), (7, 1)])
+        self.assertEqual(histogram.count, 5)
+        self.assertAlmostEqual(histogram.mean, 1.06e-3 / 5)
+        self.assertEqual((histogram.min, histogram.max), (0.0, 1e-3))
+        # the upper bound of the bucket, but not more than the largest value
+        self.assertEqual(histogram.percentile(40), 1e-5)
+        self.assertEqual(histogram.percentile(60), 2e-5)
+        self.assertEqual(histogram.percentile(80), 4e-5)
+        self.assertEqual(histogram.percentile(95), 1e-3)
+        self.assertEqual(histogram.to_dict()['buckets'], {'1e-05': 2, '2e-05': 1, '4e-05': 1, '0.00128': 1})
+
+        # values above the last bucket are counted in it
+        histogram = Histogram()
+        histogram.add(1000.0)
+        self.assertEqual(histogram.buckets[-1], 1)
+        self.assertEqual(histogram.percentile(50), 1000.0)
+        self.assertEqual(Histogram().percentile(50), 0.0)
+
+    def test_chrome_trace(self):
+        """
+        Test one span per phase of each command and the export.
+        """
+        stats = CommandStats(name='loopback')
+        start = time.monotonic()
+        stats.record('G0', 1, 'G0 X200', start, start + 0.001, start + 0.002, start + 0.010, False)
+        # a command which timed out before it was written has no wire and response phase
+        stats.record('P2220', 2, 'P2220', start, start + 0.020, None, start + 0.030, True)
+        trace = stats.chrome_trace()
+        events = [event for event in trace['traceEvents'] if event['ph'] == 'X']
+        self.assertEqual([(event['name'], event['cat']) for event in events],
+                         [('G0', 'queue'), ('G0', 'wire'), ('G0', 'response'), ('P2220 TIMEOUT', 'queue')])
+        self.assertEqual([event['pid'] for event in trace['traceEvents']], ['loopback'] * 5)
+        for event, duration in zip(events, [1000, 1000, 8000, 20000]):
+            self.assertAlmostEqual(event['dur'], duration, places=3)
+            self.assertEqual(event['tid'], event['cat'])
+        self.assertAlmostEqual(events[1]['ts'], events[0]['ts'] + 1000, places=3)
+        self.assertEqual(events[0]['args'], {'cnt': 1, 'msg': 'G0 X200', 'timeout': False})
+
+        summary = stats.summary()
+        self.assertEqual(summary['P2220']['timeouts'], 1)
+        # a timeout says nothing about the response time
+        self.assertEqual(summary['P2220']['response']['count'], 0)
+        self.assertAlmostEqual(summary['G0']['total']['mean'], 0.010)
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'trace.json')
+            stats.export_chrome_trace(path)
+            with open(path) as trace_file:
+                self.assertEqual(json.load(trace_file), json.loads(json.dumps(trace)))
+
+    def test_stop_dump(self):
+        """
+        Test that no summary is dumped after stop_dump.
+        """
+        stats = CommandStats()
+        dumps = []
+        stats.start_dump(0.01, dumps.append)
+        deadline = time.monotonic() + 2
+        while not dumps and time.monotonic() < deadline:
+            time.sleep(0.01)
+        stats.stop_dump()
+        count = len(dumps)
+        self.assertGreater(count, 0)
+        self.assertTrue(dumps[0].startswith('cmd'))
+        time.sleep(0.05)
+        self.assertEqual(len(dumps), count)
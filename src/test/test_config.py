@@ -0,0 +1,48 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+This file contains the Config class test.
+"""
+
+import os
+import tempfile
+import unittest
+
+from src.config import Config
+from src.robot_error import RobotError, ErrorCode
+
+
+class TestConfig(unittest.TestCase):
+    """
+    Config test.
+    """
+    def test_instance(self):
+        """
+        Test that the shared configuration is read once and typed.
+        """
+        config = Config.instance()
+        self.assertIs(Config.instance(), config)
+        self.assertEqual(config.reset_position, (3, 8, 2))
+        self.assertIsInstance(config.pipelined_execution, bool)
+        self.assertIsInstance(config.required_challenges, int)
+        with self.assertRaises(AttributeError):
+            config.edge_length = 50
+
+    def test_invalid(self):
+        """
+        Test that invalid values are rejected when the file is loaded.
+        """
+        with open(Config.default_path(), encoding='utf-8') as config_file:
+            text = config_file.read()
+        for old, new in [('cmd_pend_size = 8', 'cmd_pend_size = 0'),
+                         ('servo_three_limit = [12,168]', 'servo_three_limit = [168,12]'),
+                         ('pipelined_execution = true', 'pipelined_execution = 1'),
+                         ('reset_position = [3, 8, 2]', 'reset_position = [3, 8]')]:
+            self.assertIn(old, text)
+            with tempfile.TemporaryDirectory() as directory:
+                path = os.path.join(directory, 'config.ini')
+                with open(path, 'w', encoding='utf-8') as config_file:
+                    config_file.write(text.replace(old, new))
+                with self.assertRaises(RobotError) as raised:
+                    Config.load(path)
+                self.assertEqual(raised.exception.error_code, ErrorCode.E0016)
@@ -67,3 +67,23 @@ class TestGeometryHelper(unittest.TestCase):
         with self.assertRaises(RobotError) as raised:
             geometry_helper.transform_height_user_to_uarm(10, 100, 100)
         self.assertEqual(raised.exception.error_code, ErrorCode.E0004)
+
+    def test_transform_poses_user_to_uarm(self):
+        """
+        Test that the vectorized transformation agrees with transform_pose_user_to_uarm.
+        """
+        geometry_helper = GeometryHelper()
+        poses = [[x, y, z] for x in range(-1, 12) for y in range(-1, 17) for z in range(-1, 5)]
+        result = geometry_helper.transform_poses_user_to_uarm(poses)
+        self.assertEqual(result['pose'].shape, (len(poses), 3))
+        for i, [x, y, z] in enumerate(poses):
+            try:
+                pose = geometry_helper.transform_pose_user_to_uarm(x, y, z)
+                reachable = True
+            except RobotError:
+                reachable = False
+            self.assertEqual(bool(result['reachable'][i]), reachable)
+            if reachable:
+                self.assertAlmostEqual(result['pose'][i][0], pose['x'])
+                self.assertAlmostEqual(result['pose'][i][1], pose['y'])
+                self.assertAlmostEqual(result['pose'][i][2], pose['z'])
@@ -0,0 +1,58 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+This file contains the Grader class test.
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from src.grader import Grader, grade_script
+
+
+SOLUTION = "position(4, 3)\nhoehe(1)\npumpe_an()\nposition(4, 6)\npumpe_aus()\n" \
+           "position(7, 6)\npumpe_an()\nhoehe(2)\nposition(4, 6)\npumpe_aus()\n" \
+           "position(2, 12)\nhoehe(1)\npumpe_an()\nposition(4, 8)\npumpe_aus()\n" \
+           "position(5, 11)\npumpe_an()\nhoehe(2)\nposition(4, 8)\npumpe_aus()\n" \
+           "position(6, 6)\nhoehe(1)\npumpe_an()\nhoehe(3)\nposition(4, 7)\npumpe_aus()\n"
+
+
+class TestGrader(unittest.TestCase):
+    """
+    Grader test.
+    """
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        with open(os.path.join(self.directory, 'solution.txt'), 'w', encoding='utf-8') as script_file:
+            script_file.write(SOLUTION)
+        with open(os.path.join(self.directory, 'wrong.txt'), 'w', encoding='utf-8') as script_file:
+            script_file.write("position(4, 4)\nhoehe(1)\npumpe_an()\n")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_grade_script(self):
+        """
+        Test grading single scripts.
+        """
+        result = grade_script(os.path.join(self.directory, 'solution.txt'), 'Brücke 1')
+        self.assertTrue(result['success'])
+        self.assertIsNone(result['error_code'])
+        self.assertEqual(result['steps'], 26)
+
+        result = grade_script(os.path.join(self.directory, 'wrong.txt'), 'Brücke 1')
+        self.assertFalse(result['success'])
+        self.assertEqual(result['error_code'], 'E0013')
+        # the preflight check rejects the script before the robot moves
+        self.assertEqual(result['steps'], 0)
+        self.assertTrue(result['message'].startswith('Zeile 3:'))
+
+    def test_grade(self):
+        """
+        Test grading a directory in the process pool.
+        """
+        grader = Grader(['Brücke 1'], workers=2)
+        results = grader.grade(Grader.script_paths(self.directory))
+        self.assertEqual([result['success'] for result in results], [True, False])
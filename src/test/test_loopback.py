@@ -0,0 +1,64 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+This file contains the test of the loopback transports of the uArm SDK.
+"""
+
+import os
+import tempfile
+import unittest
+
+from libraries.uArm_Python_SDK.uarm.wrapper import SwiftAPI
+from libraries.uArm_Python_SDK.uarm.comm.loopback import FakeFirmware, LoopbackSerial, RecordingSerial, \
+    ReplayFirmware
+from libraries.uArm_Python_SDK.uarm.swift import protocol
+
+
+def session(swift):
+    """
+    Commands of the recorded session, returns the replies.
+    """
+    try:
+        return [swift.set_position(x=180, y=30, z=120, speed=1000, wait=True), swift.get_position(),
+                swift.get_device_info()['device_unique']]
+    finally:
+        swift.disconnect()
+
+
+class TestLoopback(unittest.TestCase):
+    """
+    RecordingSerial and ReplayFirmware test class.
+    """
+    def setUp(self):
+        self.__directory = tempfile.TemporaryDirectory()
+        self.__path = os.path.join(self.__directory.name, 'session.jsonl')
+        # the recorded firmware differs from the default model, so the replies must come from the recording
+        firmware = FakeFirmware(latency=0.0, baudrate=0, time_factor=0,
+                                device_info=('SwiftPro', '3.3', '4.0.0', '4.0.0', 'RECORDED'))
+        self.__recorded = session(SwiftAPI(com=RecordingSerial(LoopbackSerial(firmware), self.__path)))
+
+    def tearDown(self):
+        self.__directory.cleanup()
+
+    def test_replay(self):
+        """
+        Test that the replay answers a session like the recorded firmware.
+        """
+        self.assertEqual(self.__recorded, [protocol.OK, [180.0, 30.0, 120.0], 'RECORDED'])
+        firmware = ReplayFirmware(self.__path, time_factor=0, strict=True)
+        self.assertEqual(session(SwiftAPI(com=LoopbackSerial(firmware))), self.__recorded)
+        firmware.check()
+
+    def test_divergence(self):
+        """
+        Test that a command which is not in the recording fails the strict replay.
+        """
+        firmware = ReplayFirmware(self.__path, time_factor=0, strict=True)
+        swift = SwiftAPI(com=LoopbackSerial(firmware))
+        try:
+            self.assertEqual(swift.set_position(x=180, y=40, z=120, speed=1000, wait=True, timeout=0.2),
+                             protocol.TIMEOUT)
+        finally:
+            swift.disconnect()
+        with self.assertRaises(RuntimeError):
+            firmware.check()
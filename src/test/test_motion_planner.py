@@ -0,0 +1,63 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+This file contains the MotionPlanner class test.
+"""
+
+import unittest
+
+from src.user_script import UserScript
+from src.user_challenge import ChallengeRegistry
+from src.motion_planner import MotionPlanner
+from src.preflight import Preflight
+from src.user_functions import FunctionNames
+from src.simulated_robot_handler import SimulatedRobotHandler
+
+
+SCRIPT = "position(1, 1)\nposition(4, 3)\nhoehe(3)\nhoehe(1)\npumpe_an()\nhoehe(3)\nposition(5, 5)\n" \
+         "position(4, 6)\nhoehe(1)\npumpe_aus()\nhoehe(3)\nposition(6, 6)\nhoehe(1)\npumpe_an()\nhoehe(3)\n" \
+         "position(4, 6)\nhoehe(3)\n"
+
+
+class TestMotionPlanner(unittest.TestCase):
+    """
+    MotionPlanner test.
+    """
+    def test_plan(self):
+        """
+        Test that superseded moves are removed and moves above all blocks are merged.
+        """
+        robot = SimulatedRobotHandler(time_warp=True)
+        user_script = UserScript(SCRIPT, robot, 'Testen')
+        function_calls = user_script._UserScript__function_calls
+        planner = MotionPlanner(ChallengeRegistry.challenge('Testen'), [3, 8, 2])
+        planned = [(call["name"], call["args"]) for call in planner.plan(function_calls, robot)]
+        self.assertEqual(planned, [('position', [4, 3]), ('hoehe', [1]), ('pumpe_an', []),
+                                   ('hoehe', [3]), ('position', [4, 6]), ('hoehe', [1]), ('pumpe_aus', []),
+                                   ('hoehe', [3]), ('position', [6, 6]), ('hoehe', [1]), ('pumpe_an', []),
+                                   ('hoehe', [3]), ('position', [4, 6])])
+
+        # start and target above all blocks: one move
+        user_script = UserScript("position(5, 5)\nhoehe(3)\nposition(6, 5)", robot, 'Testen')
+        function_calls = user_script._UserScript__function_calls
+        planner = MotionPlanner(ChallengeRegistry.challenge('Testen'), [3, 8, 2])
+        planned_calls = planner.plan(function_calls, robot)
+        planned = [(call["name"], call["args"]) for call in planned_calls]
+        self.assertEqual(planned, [(FunctionNames.pose.name, [6, 5, 3])])
+        # the planned calls only use function names which the preflight check knows
+        preflight = Preflight(ChallengeRegistry.challenge('Testen'), [3, 8, 2])
+        self.assertTrue(preflight.check(planned_calls))
+        self.assertEqual(preflight._Preflight__coordinates, [6, 5, 3])
+
+    def test_run(self):
+        """
+        Test that the optimized script has the same result in less time.
+        """
+        times = []
+        for optimize in [False, True]:
+            robot = SimulatedRobotHandler(time_warp=True)
+            user_script = UserScript(SCRIPT, robot, 'Testen')
+            robot.reset_timer()
+            self.assertEqual(user_script.run_script(robot, optimize=optimize), 'test')
+            times.append(robot.predicted_time)
+        self.assertLess(times[1], times[0])
@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+This file contains the MotionSync class test.
+"""
+
+import unittest
+
+from src.motion_sync import Actuator, MotionSync, SettleModel
+from src.robot_error import RobotError, ErrorCode
+from src.timeline import Timeline
+
+
+class StubSwift:
+    """
+    Answers flush_cmd with a fixed reply and counts the calls.
+    """
+    def __init__(self, reply='OK'):
+        self.reply = reply
+        self.flushes = []
+
+    def flush_cmd(self, timeout=None, wait_stop=False):
+        self.flushes.append(wait_stop)
+        return self.reply
+
+
+class TestMotionSync(unittest.TestCase):
+    """
+    MotionSync test class.
+    """
+    def test_timeout(self):
+        """
+        Test that an arm which does not stop in time raises E0002.
+        """
+        swift = StubSwift('TIMEOUT')
+        with self.assertRaises(RobotError) as raised:
+            MotionSync(swift).wait({Actuator.xy: 10.0})
+        self.assertEqual(raised.exception.error_code, ErrorCode.E0002)
+        # the firmware is asked until the arm stopped
+        self.assertEqual(swift.flushes, [True])
+
+    def test_stop(self):
+        """
+        Test that the waits raise E0005 after stop() until clear_stop().
+        """
+        motion_sync = MotionSync(StubSwift())
+        motion_sync.stop()
+        with self.assertRaises(RobotError) as raised:
+            motion_sync.wait({Actuator.pump_on: 0.0})
+        self.assertEqual(raised.exception.error_code, ErrorCode.E0005)
+        with self.assertRaises(RobotError):
+            motion_sync.check_stop()
+        motion_sync.clear_stop()
+        motion_sync.wait()
+
+    def test_settle(self):
+        """
+        Test that only the settle margin of the slowest pending move is waited.
+        """
+        settle_model = SettleModel()
+        moves = {Actuator.xy: 40.0, Actuator.z: 20.0, Actuator.wrist: 30.0}
+        slowest = max(moves, key=lambda actuator: settle_model.settle_time(actuator, moves[actuator]))
+        settle = settle_model.settle_time(slowest, moves[slowest])
+
+        motion_sync = MotionSync(StubSwift())
+        motion_sync.timeline = Timeline()
+        motion_sync.wait(moves)
+        spans = motion_sync.timeline.steps[1]['spans']
+        self.assertEqual([(span['kind'], span['detail']) for span in spans], [('settle', slowest.name)])
+        duration = spans[0]['end'] - spans[0]['start']
+        self.assertGreaterEqual(duration, settle)
+        self.assertLess(duration, settle + sum(settle_model.settle_time(actuator, amount)
+                                               for actuator, amount in moves.items() if actuator != slowest))
+        self.assertEqual(settle_model.slowest(moves), (slowest, settle))
+
+        # without moves only the flush is waited
+        motion_sync.timeline = Timeline()
+        motion_sync.wait()
+        self.assertEqual([step['name'] for step in motion_sync.timeline.steps], ['flush'])
@@ -0,0 +1,101 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+This file contains the MultiArmController class test.
+"""
+
+import threading
+import unittest
+
+from src.robot_error import RobotError, ErrorCode
+from src.multi_arm_controller import ArmBarrier, MultiArmController
+from src.simulated_robot_handler import SimulatedRobotHandler
+from src.user_script import UserScript
+
+
+class TestMultiArmController(unittest.TestCase):
+    """
+    MultiArmController and ArmBarrier unit test.
+    """
+    def test_barrier(self):
+        """
+        Test that finished arms leave the barrier and an aborted barrier releases the waiting arms.
+        """
+        barrier = ArmBarrier(2, timeout=5)
+        waiter = threading.Thread(target=barrier.wait)
+        waiter.start()
+        barrier.leave()
+        waiter.join(5)
+        self.assertFalse(waiter.is_alive())
+        self.assertEqual(barrier.parties, 1)
+        # the last arm does not wait for anybody
+        barrier.wait()
+
+        barrier = ArmBarrier(2)
+        errors = []
+
+        def wait():
+            try:
+                barrier.wait()
+            except RobotError as error:
+                errors.append(error.error_code)
+        waiter = threading.Thread(target=wait)
+        waiter.start()
+        barrier.abort()
+        waiter.join(5)
+        self.assertEqual(errors, [ErrorCode.E0018])
+
+        with self.assertRaises(RobotError) as raised:
+            ArmBarrier(2, timeout=0.01).wait()
+        self.assertEqual(raised.exception.error_code, ErrorCode.E0018)
+
+    def test_run_scripts(self):
+        """
+        Test different scripts on two arms, synchronized at warten().
+        """
+        robots = [SimulatedRobotHandler(time_warp=True), SimulatedRobotHandler(time_warp=True)]
+        scripts = [UserScript("position(4, 3)\nwarten()\nhoehe(1)", robots[0], 'Testen'),
+                   UserScript("position(4, 3)\nhoehe(1)\nhoehe(2)\nwarten()", robots[1], 'Testen')]
+        events = []
+        controller = MultiArmController(robots, barrier_timeout=5)
+        results = controller.run_scripts(scripts, progress_callback=lambda *args: events.append(args))
+        self.assertEqual(results, ['test', 'test'])
+        # the first arm continues after the second arm reached warten()
+        self.assertGreater(events.index((0, 2, 3, 3)), events.index((1, 3, 4, 4)))
+
+        # warten() is a no-op for a single arm
+        self.assertEqual(scripts[0].run_script(robots[0]), 'test')
+
+    def test_failed_arm(self):
+        """
+        Test that an error of one arm stops the other arm at warten().
+        """
+        robots = [SimulatedRobotHandler(time_warp=True), SimulatedRobotHandler(time_warp=True)]
+        scripts = [UserScript("position(4, 3)\nwarten()\nhoehe(1)", robots[0], 'Testen'),
+                   UserScript("position(10, 10)\nwarten()", robots[1], 'Testen'),
+                   None]
+        controller = MultiArmController(robots + [SimulatedRobotHandler(time_warp=True)], barrier_timeout=5)
+        results = controller.run_scripts(scripts)
+        self.assertEqual(results[0].error_code, ErrorCode.E0018)
+        self.assertEqual(results[1].error_code, ErrorCode.E0000)
+        self.assertIsNone(results[2])
+
+        with self.assertRaises(RobotError) as raised:
+            UserScript("warten(1)", robots[0], 'Testen')
+        self.assertEqual(raised.exception.error_code, ErrorCode.E0101)
+
+    def test_start(self):
+        """
+        Test that arms which do not start leave the shared barrier.
+        """
+        robots = [SimulatedRobotHandler(time_warp=True) for _ in range(3)]
+        controller = MultiArmController(robots, barrier_timeout=5)
+        barriers = []
+
+        def start(barrier):
+            barriers.append(barrier)
+            return True
+        self.assertEqual(controller.start([start, lambda barrier: False, None]), 1)
+        # the started arm does not wait for the others at warten()
+        self.assertEqual(barriers[0].parties, 1)
+        barriers[0].wait()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+This file contains the ReachabilityTable class test.
+"""
+
+import math
+import unittest
+
+from src.robot_error import RobotError, ErrorCode
+from src.geometry_helper import GeometryHelper
+from src.reachability_table import ReachabilityTable
+
+
+class TestReachabilityTable(unittest.TestCase):
+    """
+    ReachabilityTable test.
+    """
+    def test_transform(self):
+        """
+        Test that the table lookups agree with the GeometryHelper transformations, including the errors.
+        """
+        geometry_helper = GeometryHelper()
+        table = ReachabilityTable.instance()
+        self.assertIs(ReachabilityTable.instance(), table)
+        [size_x, size_y, levels] = table.size
+        for x in range(-1, size_x + 1):
+            for y in range(-1, size_y + 1):
+                for z in range(levels + 1):
+                    try:
+                        expected = geometry_helper.transform_pose_user_to_uarm(x, y, z)
+                    except RobotError as error:
+                        expected = error.error_code
+                    try:
+                        result = table.transform_pose_user_to_uarm(x, y, z)
+                    except RobotError as error:
+                        result = error.error_code
+                    self.assertEqual(result, expected)
+                    self.assertEqual(table.is_reachable(x, y, z), isinstance(expected, dict))
+
+        pose = table.transform_pose_user_to_uarm(3, 8, 2)
+        self.assertEqual(table.transform_position_user_to_uarm(4, 8, pose['z']),
+                         geometry_helper.transform_position_user_to_uarm(4, 8, pose['z']))
+        self.assertEqual(table.transform_height_user_to_uarm(3, pose['x'], pose['y']), pose['z'] + 40)
+        with self.assertRaises(RobotError) as raised:
+            table.transform_height_user_to_uarm(0, pose['x'], pose['y'])
+        self.assertEqual(raised.exception.error_code, ErrorCode.E0004)
+
+    def test_orientation(self):
+        """
+        Test the feasible orientation interval of the wrist.
+        """
+        table = ReachabilityTable.instance()
+        [lower, higher] = table.orientation_interval(7, 7)
+        self.assertAlmostEqual(higher - lower, 156.0)
+        self.assertTrue(table.orientation_feasible(7, 7, lower))
+        self.assertTrue(table.orientation_feasible(7, 7, higher + 180))
+        self.assertFalse(table.orientation_feasible(7, 7, higher + 10))
+
+        # cells outside of the board do not wrap around to the other side of the table
+        [size_x, size_y, _] = table.size
+        for x_user, y_user in [(-1, 7), (size_x, 7), (7, size_y + 2)]:
+            [x_uarm, y_uarm, _] = GeometryHelper().transform_poses_user_to_uarm([[x_user, y_user, 0]])['pose'][0]
+            self.assertAlmostEqual(table.base_angle(x_user, y_user), math.degrees(math.atan2(y_uarm, x_uarm)))
+            [lower, higher] = table.orientation_interval(x_user, y_user)
+            self.assertAlmostEqual(higher - lower, 156.0)
+            self.assertTrue(table.orientation_feasible(x_user, y_user, lower))
+        self.assertNotAlmostEqual(table.base_angle(-1, 7), table.base_angle(size_x - 1, 7))
+
+        export = table.export()
+        self.assertEqual(len(export['reachable']), table.size[0])
+        self.assertEqual(len(export['reachable'][0][0]), table.size[2])
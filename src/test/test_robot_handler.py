@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+This file contains the RobotHandler class test.
+"""
+
+import unittest
+
+from src.reachability_table import ReachabilityTable
+from src.robot_error import RobotError, ErrorCode
+from src.robot_handler import RobotHandler
+
+
+class StubSwift:
+    """
+    Records the commands sent to the uArm, the arm is always at rest.
+    """
+    def __init__(self):
+        self.calls = []
+
+    def __record(self, name, **kwargs):
+        self.calls.append((name, kwargs))
+        return 'OK'
+
+    def waiting_ready(self, timeout=5):
+        return True
+
+    def set_mode(self, mode=0):
+        return self.__record('set_mode', mode=mode)
+
+    def reset(self, **kwargs):
+        return self.__record('reset', **kwargs)
+
+    def get_position(self):
+        return [200.0, 0.0, 150.0]
+
+    def set_position(self, **kwargs):
+        return self.__record('set_position', **kwargs)
+
+    def set_wrist(self, **kwargs):
+        return self.__record('set_wrist', **kwargs)
+
+    def set_servo_angle(self, **kwargs):
+        return self.__record('set_servo_angle', **kwargs)
+
+    def set_pump(self, **kwargs):
+        return self.__record('set_pump', **kwargs)
+
+    def flush_cmd(self, timeout=None, wait_stop=False):
+        return self.__record('flush_cmd', wait_stop=wait_stop)
+
+
+class TestRobotHandler(unittest.TestCase):
+    """
+    RobotHandler test class.
+    """
+    def test_move_to(self):
+        """
+        Test that the position and the wrist are sent together before one synchronization point.
+        """
+        swift = StubSwift()
+        robot = RobotHandler(swift)
+        swift.calls.clear()
+        robot.move_to(4, 3, 1, wrist=45.0)
+        target = ReachabilityTable.instance().transform_pose_user_to_uarm(4, 3, 1)
+        self.assertEqual(swift.calls, [('set_position', {'x': target['x'], 'y': target['y'], 'z': target['z']}),
+                                       ('set_wrist', {'angle': 45.0}),
+                                       ('flush_cmd', {'wait_stop': True})])
+        self.assertEqual([robot.x_user, robot.y_user, robot.z_user], [4, 3, 1])
+
+    def test_unreachable(self):
+        """
+        Test that an unreachable pose raises before a command is sent.
+        """
+        swift = StubSwift()
+        robot = RobotHandler(swift)
+        pose = [robot.x_user, robot.y_user, robot.z_user]
+        swift.calls.clear()
+        with self.assertRaises(RobotError) as raised:
+            robot.move_to(10, 10, 1, wrist=45.0)
+        self.assertEqual(raised.exception.error_code, ErrorCode.E0000)
+        self.assertEqual(swift.calls, [])
+        self.assertEqual([robot.x_user, robot.y_user, robot.z_user], pose)
@@ -0,0 +1,139 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+This file contains the SimulatedRobotHandler class test.
+"""
+
+import unittest
+
+from src.config import Config
+from src.motion_sync import Actuator, SettleModel
+from src.robot_error import RobotError, ErrorCode
+from src.simulated_robot_handler import SimulatedRobotHandler
+from src.user_script import UserScript
+
+
+class TestSimulatedRobotHandler(unittest.TestCase):
+    """
+    SimulatedRobotHandler test.
+    """
+    def test_move(self):
+        """
+        Test pose, pump state and predicted time of simulated movements.
+        """
+        robot = SimulatedRobotHandler(time_warp=True)
+        robot.reset_timer()
+        robot.position_new([4, 3])
+        robot.height_new([1])
+        self.assertEqual(robot.pose[2], 40.0)
+        self.assertGreater(robot.predicted_time, 0.0)
+
+        robot.pump_on()
+        self.assertTrue(robot.pump)
+        robot.pump_off()
+        self.assertFalse(robot.pump)
+
+        with self.assertRaises(RobotError) as raised:
+            robot.position_new([10, 10])
+        self.assertEqual(raised.exception.error_code, ErrorCode.E0000)
+
+    def test_travel_time(self):
+        """
+        Test the trapezoidal speed profile.
+        """
+        robot = SimulatedRobotHandler(time_warp=True)
+        self.assertEqual(robot.travel_time(0), 0.0)
+        self.assertLess(robot.travel_time(10), robot.travel_time(100))
+        self.assertLess(robot.travel_time(100), robot.travel_time(300))
+
+    def test_settle_time(self):
+        """
+        Test that the simulation waits the settle margin of MotionSync.
+        """
+        robot = SimulatedRobotHandler(time_warp=True)
+        settle_model = SettleModel()
+        robot.reset_timer()
+        robot.pump_off()
+        self.assertAlmostEqual(robot.predicted_time,
+                               Config.instance().pump_time + settle_model.settle_time(Actuator.pump_off))
+
+    def test_reset(self):
+        """
+        Test that reset only moves if the robot is not at the start position.
+        """
+        robot = SimulatedRobotHandler(time_warp=True)
+        start_pose = robot.pose
+        robot.reset_timer()
+        robot.reset()
+        self.assertEqual(robot.predicted_time, 0.0)
+
+        robot.position_new([4, 3])
+        robot.height_new([1])
+        robot.pump_on()
+        robot.reset_timer()
+        robot.reset()
+        self.assertFalse(robot.pump)
+        self.assertEqual(robot.pose, start_pose)
+        shortcut_time = robot.predicted_time
+
+        robot.position_new([4, 3])
+        robot.height_new([1])
+        robot.pump_on()
+        robot.reset_timer()
+        robot.reset(force=True)
+        self.assertGreater(robot.predicted_time, shortcut_time)
+
+    def test_emergency_stop(self):
+        """
+        Test that the emergency stop interrupts the commands until the next reset.
+        """
+        robot = SimulatedRobotHandler(time_warp=True)
+        start_pose = robot.pose
+        robot.position_new([4, 3])
+        robot.emergency_stop()
+        with self.assertRaises(RobotError) as raised:
+            robot.height_new([1])
+        self.assertEqual(raised.exception.error_code, ErrorCode.E0005)
+
+        # the pose is unknown, the arm is homed
+        robot.reset_timer()
+        robot.reset()
+        self.assertEqual(robot.pose, start_pose)
+        self.assertGreater(robot.predicted_time, 0.0)
+        robot.height_new([1])
+
+    def test_pipelined_run(self):
+        """
+        Test that a pipelined run saves the settle margins of the moves and that a stopped pipelined run leaves the
+        pipelined mode, so the next run waits again.
+        """
+        script = "position(4, 3)\nhoehe(1)\nposition(5, 5)\nposition(6, 5)"
+        times = []
+        for pipelined in [False, True]:
+            robot = SimulatedRobotHandler(time_warp=True)
+            robot.reset_timer()
+            self.assertEqual(UserScript(script, robot, 'Testen').run_script(robot, pipelined=pipelined), 'test')
+            times.append(robot.predicted_time)
+        self.assertLess(times[1], times[0])
+
+        robot = SimulatedRobotHandler(time_warp=True)
+        user_script = UserScript(script, robot, 'Testen')
+
+        def stop(steps, total, line):
+            if line == 3:
+                user_script.cancel()
+                robot.emergency_stop()
+
+        with self.assertRaises(RobotError) as raised:
+            user_script.run_script(robot, pipelined=True, progress_callback=stop)
+        # the error of the script and not the one of the synchronization after it
+        self.assertEqual(raised.exception.error_code, ErrorCode.E0017)
+        self.assertFalse(robot._SimulatedRobotHandler__pipelined)
+
+        # the next move waits its settle margin like the move of a new robot
+        waiting = SimulatedRobotHandler(time_warp=True)
+        for handler in [robot, waiting]:
+            handler.reset()
+            handler.reset_timer()
+            handler.position_new([4, 3])
+        self.assertAlmostEqual(robot.predicted_time, waiting.predicted_time)
@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+This file contains the Swift class test of the uArm SDK.
+"""
+
+import threading
+import time
+import unittest
+
+from libraries.uArm_Python_SDK.uarm.wrapper import SwiftAPI
+from libraries.uArm_Python_SDK.uarm.comm.loopback import FakeFirmware, LoopbackSerial
+from libraries.uArm_Python_SDK.uarm.swift import protocol
+from libraries.uArm_Python_SDK.uarm.swift.multi import MultiSwiftAPI
+
+
+class RecordingFirmware(FakeFirmware):
+    """
+    Fake firmware which remembers every received line.
+    """
+    def __init__(self, **kwargs):
+        super(RecordingFirmware, self).__init__(**kwargs)
+        self.lines = []
+
+    def receive(self, line, now):
+        self.lines.append(line)
+        return super(RecordingFirmware, self).receive(line, now)
+
+
+class TestSwift(unittest.TestCase):
+    """
+    Swift test class.
+    """
+    def test_emergency_stop(self):
+        """
+        Test that a command waiting for the full cmd cache is not sent after the emergency stop.
+        """
+        firmware = RecordingFirmware(latency=0.0, baudrate=0, time_factor=0)
+        swift = SwiftAPI(com=LoopbackSerial(firmware), cmd_pend_size=2)
+        try:
+            swift.waiting_ready()
+            # the firmware does not answer in time, the two places of the cmd cache stay taken
+            firmware.latency = 5.0
+            swift.send_cmd_async('G0 X200 Y0 Z150 F1000')
+            swift.send_cmd_async('G0 X200 Y10 Z150 F1000')
+            results = []
+            waiting = threading.Thread(target=lambda: results.append(swift.send_cmd_sync('G0 X200 Y20 Z150 F1000')))
+            waiting.start()
+            time.sleep(0.1)
+            swift.emergency_stop()
+            waiting.join(timeout=2)
+            self.assertFalse(waiting.is_alive())
+            self.assertEqual(results, [protocol.TIMEOUT])
+            stop = firmware.lines.index(protocol.QUICK_STOP)
+            self.assertEqual(firmware.lines[stop + 1:], [])
+            self.assertNotIn('Y20', ' '.join(firmware.lines))
+
+            # the next reset allows commands again
+            firmware.latency = 0.0
+            swift.reset(wait=True, speed=10000)
+            self.assertEqual(swift.get_position(), [200.0, 0.0, 150.0])
+        finally:
+            swift.disconnect()
+
+    def test_resolve_once(self):
+        """
+        Test that the first of reply and timeout is the result of a command.
+        """
+        swift = SwiftAPI(com=LoopbackSerial(FakeFirmware(latency=0.0, baudrate=0, time_factor=0)))
+        try:
+            swift.waiting_ready()
+            cmd = swift.send_cmd_async(protocol.GET_POSITION)
+            reply = cmd.get_ret(timeout=1)
+            self.assertEqual(reply[0], protocol.OK)
+            cmd.timeout_cb()
+            self.assertEqual(cmd.result(), reply)
+        finally:
+            swift.disconnect()
+
+    def test_multi_swift(self):
+        """
+        Test that the same command is run on all arms and waited for.
+        """
+        swifts = [SwiftAPI(com=LoopbackSerial(FakeFirmware(latency=0.0, baudrate=0, time_factor=0)))
+                  for _ in range(2)]
+        try:
+            multi = MultiSwiftAPI(swifts)
+            self.assertEqual(multi.multi_cmd_sync('set_position', x=200, y=20, z=150, speed=1000),
+                             [protocol.OK, protocol.OK])
+            self.assertEqual([swift.get_position() for swift in swifts], [[200.0, 20.0, 150.0]] * 2)
+        finally:
+            for swift in swifts:
+                swift.disconnect()
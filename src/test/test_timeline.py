@@ -0,0 +1,95 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+This file contains the Timeline class test.
+"""
+
+import os
+import csv
+import json
+import tempfile
+import unittest
+
+from src.robot_error import RobotError
+from src.simulated_robot_handler import SimulatedRobotHandler
+from src.timeline import Timeline
+from src.user_script import UserScript
+
+
+class TestTimeline(unittest.TestCase):
+    """
+    Timeline test class.
+    """
+    def test_steps(self):
+        """
+        Test the steps, spans, summary and the export.
+        """
+        timeline = Timeline()
+        timeline.add_span('reset', 0.0, 1.0)
+        timeline.begin_step('position', 1, [4, 3])
+        with timeline.span('geometry'):
+            pass
+        timeline.end_step('Fehler')
+        steps = timeline.steps
+        # a span outside of a step is its own step
+        self.assertEqual([step['name'] for step in steps], ['reset', 'position'])
+        self.assertEqual(steps[1]['args'], [4, 3])
+        self.assertEqual(steps[1]['error'], 'Fehler')
+        self.assertEqual([span['kind'] for span in steps[1]['spans']], ['geometry'])
+        summary = timeline.summary()
+        self.assertEqual(summary['reset'], 1.0)
+        self.assertGreaterEqual(summary['total'], summary['reset'] + summary['geometry'])
+
+        with tempfile.TemporaryDirectory() as directory:
+            json_path = os.path.join(directory, 'timeline.json')
+            csv_path = os.path.join(directory, 'timeline.csv')
+            timeline.to_json(json_path)
+            timeline.to_csv(csv_path)
+            with open(json_path, encoding='utf-8') as json_file:
+                self.assertEqual(len(json.load(json_file)['steps']), 2)
+            with open(csv_path, encoding='utf-8') as csv_file:
+                rows = list(csv.DictReader(csv_file))
+            self.assertEqual([row['kind'] for row in rows], ['step', 'reset', 'step', 'geometry'])
+
+    def test_run_script(self):
+        """
+        Test that a script run records one step per command and the geometry of the robot handler.
+        """
+        robot_handler = SimulatedRobotHandler(time_warp=True)
+        timeline = Timeline()
+        user_script = UserScript("position(4, 3)\nhoehe(1)\npumpe_an()", robot_handler, 'Testen')
+        self.assertEqual(user_script.run_script(robot_handler, timeline=timeline), 'test')
+        steps = timeline.steps
+        self.assertEqual([step['name'] for step in steps], ['reset', 'position', 'hoehe', 'pumpe_an', 'reset'])
+        self.assertEqual([step['line'] for step in steps[1:4]], [1, 2, 3])
+        self.assertTrue(all(step['end'] is not None for step in steps))
+        self.assertIn('geometry', [span['kind'] for span in steps[1]['spans']])
+        # the robot handler does not record after the run
+        self.assertIsNone(robot_handler.timeline)
+
+        # a script which fails the preflight check does not move the robot
+        timeline = Timeline()
+        user_script = UserScript("position(4, 3)\nposition(40, 3)", robot_handler, 'Testen')
+        with self.assertRaises(RobotError):
+            user_script.run_script(robot_handler, timeline=timeline)
+        self.assertEqual(timeline.steps, [])
+
+    def test_cancel(self):
+        """
+        Test that the command which stopped the script ends with the error and the commands before without.
+        """
+        robot_handler = SimulatedRobotHandler(time_warp=True)
+        timeline = Timeline()
+        user_script = UserScript("position(4, 3)\nhoehe(1)\npumpe_an()", robot_handler, 'Testen')
+
+        def progress(steps, total, line):
+            if line == 2:
+                user_script.cancel()
+
+        with self.assertRaises(RobotError):
+            user_script.run_script(robot_handler, progress_callback=progress, timeline=timeline)
+        steps = timeline.steps
+        self.assertEqual([step['name'] for step in steps], ['reset', 'position', 'hoehe'])
+        self.assertEqual([step['error'] for step in steps[:2]], [None, None])
+        self.assertEqual(steps[2]['error'], "Das Skript wurde abgebrochen.")
+        self.assertTrue(all(step['end'] is not None for step in steps))
@@ -0,0 +1,116 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+This file contains the Challenge class test.
+"""
+
+import unittest
+
+from src.robot_error import RobotError, ErrorCode
+from src.user_challenge import Challenge, Block, ChallengeRegistry
+
+
+class TestChallenge(unittest.TestCase):
+    """
+    Challenge test.
+    """
+    def setUp(self):
+        self.challenge = Challenge('test')
+        self.challenge.add_start_position(Block([3, 5, 1], 'long', [3, 1]))
+        self.challenge.add_start_position(Block([6, 5, 1], 'small', [1, 1]))
+        self.challenge.reset()
+
+    def test_occupancy(self):
+        """
+        Test that the occupancy index contains the same cells as the linear scan over all blocks.
+        """
+        for x in range(10):
+            for y in range(10):
+                for z in range(4):
+                    scan = any(block.is_on_position([x, y, z]) for block in self.challenge.blocks)
+                    self.assertEqual(self.challenge.isBlock([x, y, z]), scan)
+
+    def test_pick_and_place(self):
+        """
+        Test that picking up and placing a block updates the occupancy index.
+        """
+        self.assertTrue(self.challenge.pump_on([3, 5, 1]))
+        self.assertFalse(self.challenge.isBlock([2, 5, 1]))
+        self.assertEqual(len(self.challenge.blocks), 1)
+
+        # place the long block on top of the small block
+        self.assertTrue(self.challenge.pump_off([6, 5, 2]))
+        self.assertTrue(self.challenge.isBlock([5, 5, 2]))
+        self.assertTrue(self.challenge.isBlock([7, 5, 2]))
+        self.assertFalse(self.challenge.isBlock([2, 5, 1]))
+
+        with self.assertRaises(RobotError) as raised:
+            self.challenge.pump_on([2, 5, 1])
+        self.assertEqual(raised.exception.error_code, ErrorCode.E0013)
+
+    def test_overlapping_blocks(self):
+        """
+        Test that moving one of two overlapping blocks keeps the cells of the other block.
+        """
+        challenge = Challenge('overlap')
+        challenge.add_start_position(Block([3, 5, 1], 'long', [3, 1]))
+        challenge.add_start_position(Block([4, 5, 1], 'small', [1, 1]))
+        challenge.reset()
+        long_block, small_block = challenge.blocks
+
+        # the first block at the coordinates is picked up, like the linear scan over the blocks
+        self.assertTrue(challenge.pump_on([4, 5, 1]))
+        self.assertIs(challenge.block_manipulating, long_block)
+        self.assertTrue(challenge.isBlock([4, 5, 1]))
+        self.assertFalse(challenge.isBlock([3, 5, 1]))
+        challenge.pump_off([8, 8, 1])
+        for x in range(10):
+            for y in range(10):
+                scan = any(block.is_on_position([x, y, 1]) for block in challenge.blocks)
+                self.assertEqual(challenge.isBlock([x, y, 1]), scan)
+
+        self.assertTrue(challenge.pump_on([4, 5, 1]))
+        self.assertIs(challenge.block_manipulating, small_block)
+        self.assertFalse(challenge.isBlock([4, 5, 1]))
+
+    def test_progress(self):
+        """
+        Test the incremental goal counter and the success check.
+        """
+        self.challenge.add_final_position(Block([6, 5, 2], 'long', [3, 1]))
+        self.challenge.add_final_position(Block([6, 5, 1], 'small', [1, 1], _rotation=180))
+        self.assertEqual(self.challenge.progress(), (1, 2))
+        self.assertFalse(self.challenge.success())
+
+        self.challenge.pump_on([3, 5, 1])
+        self.challenge.pump_off([6, 5, 2])
+        self.assertEqual(self.challenge.progress(), (2, 2))
+        self.assertEqual(self.challenge.success(), 'test')
+
+        self.challenge.pump_on([6, 5, 2])
+        self.assertEqual(self.challenge.progress(), (1, 2))
+        self.challenge.reset()
+        self.assertEqual(self.challenge.progress(), (1, 2))
+
+
+class TestChallengeRegistry(unittest.TestCase):
+    """
+    ChallengeRegistry test.
+    """
+    def test_copies(self):
+        """
+        Test that the registry hands out independent copies in the start position.
+        """
+        infos, paths = ChallengeRegistry.challenge_infos()
+        self.assertIn('Brücke 1', infos['names'])
+        self.assertEqual(infos['priorities'], sorted(infos['priorities']))
+
+        first = ChallengeRegistry.challenge('Brücke 1')
+        second = ChallengeRegistry.challenge('Brücke 1')
+        self.assertIsNot(first, second)
+        first.pump_on([4, 3, 1])
+        self.assertFalse(first.isBlock([4, 3, 1]))
+        self.assertTrue(second.isBlock([4, 3, 1]))
+        self.assertEqual(len(second.blocks), len(second.start_pos))
+
+        self.assertIsNone(ChallengeRegistry.challenge('Keine Aufgabe'))
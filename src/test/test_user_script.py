@@ -15,7 +15,8 @@ class MockRobotHandler:
     Mock robot handler class.
     """
     def __init__(self):
-        pass
+        # number of reset calls
+        self.resets = 0
 
     def position_new(self, position):
         pass
@@ -23,15 +24,21 @@ class MockRobotHandler:
     def height_new(self, height_list):
         pass
 
+    def pose_new(self, pose):
+        pass
+
     def pump_on(self):
         pass
 
     def pump_off(self):
         pass
 
-    def reset(self):
+    def drehen(self, rotation):
         pass
 
+    def reset(self, force=False):
+        self.resets += 1
+
 
 class TestUserScript(unittest.TestCase):
     """
@@ -43,7 +50,7 @@ class TestUserScript(unittest.TestCase):
         """
         test_input_string = "position(1, 2)   \nhoehe(2) \n  \n \n \n"
         mock_robot = MockRobotHandler()
-        user_script_1 = UserScript(test_input_string, mock_robot)
+        user_script_1 = UserScript(test_input_string, mock_robot, 'Testen')
         self.assertEqual(user_script_1._UserScript__function_calls[0]["function"], mock_robot.position_new)
         self.assertEqual(user_script_1._UserScript__function_calls[1]["function"], mock_robot.height_new)
         self.assertListEqual(user_script_1._UserScript__function_calls[0]["args"], [1, 2])
@@ -51,36 +58,80 @@ class TestUserScript(unittest.TestCase):
 
         # error check
         with self.assertRaises(RobotError) as raised:
-            UserScript("hoehe(", mock_robot)
+            UserScript("hoehe(", mock_robot, 'Testen')
         self.assertEqual(raised.exception.error_code, ErrorCode.E0006)
 
         with self.assertRaises(RobotError) as raised:
-            UserScript("position()", mock_robot)
+            UserScript("position()", mock_robot, 'Testen')
         self.assertEqual(raised.exception.error_code, ErrorCode.E0007)
 
         with self.assertRaises(RobotError) as raised:
-            UserScript("hoehe()", mock_robot)
+            UserScript("hoehe()", mock_robot, 'Testen')
         self.assertEqual(raised.exception.error_code, ErrorCode.E0008)
 
         with self.assertRaises(RobotError) as raised:
-            UserScript("pumpe_an(1)", mock_robot)
+            UserScript("pumpe_an(1)", mock_robot, 'Testen')
         self.assertEqual(raised.exception.error_code, ErrorCode.E0009)
 
         with self.assertRaises(RobotError) as raised:
-            UserScript("pumpe_aus(1)", mock_robot)
+            UserScript("pumpe_aus(1)", mock_robot, 'Testen')
         self.assertEqual(raised.exception.error_code, ErrorCode.E0010)
 
         with self.assertRaises(RobotError) as raised:
-            UserScript("hoehe_()", mock_robot)
+            UserScript("hoehe_()", mock_robot, 'Testen')
         self.assertEqual(raised.exception.error_code, ErrorCode.E0011)
 
     def test_run_reset(self):
         """
         Test running functions defined in input string
         """
-        test_input_string = "position(1, 2)   \nhoehe(2) \n  \n \n \n pumpe_an() \n  pumpe_aus()"
+        test_input_string = "position(4, 3)   \nhoehe(1) \n  \n \n \n pumpe_an() \n  pumpe_aus()"
         mock_robot = MockRobotHandler()
 
-        user_script_1 = UserScript(test_input_string, mock_robot)
-        user_script_1.run_script(mock_robot)
+        user_script_1 = UserScript(test_input_string, mock_robot, 'Testen')
+        self.assertEqual(user_script_1.run_script(mock_robot), 'test')
+        self.assertEqual(user_script_1.steps, 4)
         user_script_1.reset(mock_robot)
+
+    def test_preflight(self):
+        """
+        Test that all errors of a script are reported with line numbers before the robot moves.
+        """
+        test_input_string = "position(4, 3)\nhoehe(1)\npumpe_aus()\n\nposition(10, 10)\nhoehe(0)\npumpe_an()"
+        mock_robot = MockRobotHandler()
+        user_script_1 = UserScript(test_input_string, mock_robot, 'Testen')
+        with self.assertRaises(RobotError) as raised:
+            user_script_1.run_script(mock_robot)
+        self.assertEqual(raised.exception.error_code, ErrorCode.E0014)
+        lines = raised.exception.message.split("\n")
+        self.assertEqual([line.split(":")[0] for line in lines], ["Zeile 3", "Zeile 5", "Zeile 6"])
+        self.assertEqual(user_script_1.steps, 0)
+        # the robot did not move, not even to the start position
+        self.assertEqual(mock_robot.resets, 0)
+
+        # parse errors of all lines are reported together
+        with self.assertRaises(RobotError) as raised:
+            UserScript("position(1)\nhoehe(2)\nhoehe()", mock_robot, 'Testen')
+        self.assertEqual(raised.exception.error_code, ErrorCode.E0007)
+        self.assertEqual(len(raised.exception.message.split("\n")), 2)
+
+    def test_progress_and_cancel(self):
+        """
+        Test the progress callback and cancelling a running script.
+        """
+        test_input_string = "position(4, 3)\n\nhoehe(1)\npumpe_an()\nhoehe(2)"
+        mock_robot = MockRobotHandler()
+        user_script_1 = UserScript(test_input_string, mock_robot, 'Testen')
+        progress = []
+        user_script_1.run_script(mock_robot, progress_callback=lambda *args: progress.append(args))
+        self.assertEqual(progress, [(0, 4, 1), (1, 4, 3), (2, 4, 4), (3, 4, 5)])
+
+        user_script_2 = UserScript(test_input_string, mock_robot, 'Testen')
+
+        def cancel(step, total, line):
+            if step == 2:
+                user_script_2.cancel()
+        with self.assertRaises(RobotError) as raised:
+            user_script_2.run_script(mock_robot, progress_callback=cancel)
+        self.assertEqual(raised.exception.error_code, ErrorCode.E0017)
+        self.assertEqual(user_script_2.steps, 2)
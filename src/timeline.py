@@ -0,0 +1,155 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+This file contains the Timeline class, which records where the time of a script run goes.
+"""
+
+import csv
+import json
+import time
+import threading
+import contextlib
+
+
+class Timeline:
+    """
+    Structured timeline of a script run. Every command of the script is a step, the robot handler adds spans of the
+    time it spent inside the step:
+        geometry: computing the target pose
+        flush: blocked in flush_cmd until the arm stopped (travel, wrist rotation, pump)
+        settle: settle margin after the arm stopped, per actuator
+        reset: homing the arm
+    The times are in seconds since the start of the timeline.
+    """
+    SPAN_KINDS = ('geometry', 'flush', 'settle', 'reset')
+
+    def __init__(self):
+        self.__origin = time.perf_counter()
+        self.__lock = threading.Lock()
+        self.__steps = []
+        self.__current = None
+
+    def now(self):
+        """
+        Seconds since the start of the timeline.
+        :rtype: float
+        """
+        return time.perf_counter() - self.__origin
+
+    def begin_step(self, name, line=None, args=None):
+        """
+        Start a new step, an unfinished step is ended.
+        :param name: name of the command, e.g. position
+        :type name: str
+        :param line: line number in the script
+        :type line: int
+        :param args: arguments of the command
+        :type args: list
+        """
+        with self.__lock:
+            self.__end_step(None)
+            self.__current = {'name': name, 'line': line, 'args': list(args or []), 'start': self.now(),
+                              'end': None, 'error': None, 'spans': []}
+            self.__steps.append(self.__current)
+
+    def end_step(self, error=None):
+        """
+        End the current step.
+        :param error: error message if the command failed
+        :type error: str
+        """
+        with self.__lock:
+            self.__end_step(error)
+
+    def __end_step(self, error):
+        if self.__current is not None:
+            self.__current['end'] = self.now()
+            self.__current['error'] = error
+            self.__current = None
+
+    def add_span(self, kind, start, end, detail=None):
+        """
+        Add a span to the current step, spans outside of a step get their own step.
+        :param kind: one of SPAN_KINDS
+        :type kind: str
+        :param start: start time, see now()
+        :type start: float
+        :param end: end time, see now()
+        :type end: float
+        :param detail: e.g. the actuator of a settle span
+        :type detail: str
+        """
+        span = {'kind': kind, 'start': start, 'end': end, 'detail': detail}
+        with self.__lock:
+            if self.__current is not None:
+                self.__current['spans'].append(span)
+            else:
+                self.__steps.append({'name': kind, 'line': None, 'args': [], 'start': start, 'end': end,
+                                     'error': None, 'spans': [span]})
+
+    @contextlib.contextmanager
+    def span(self, kind, detail=None):
+        """
+        Record the time of the with block as span.
+        """
+        start = self.now()
+        try:
+            yield
+        finally:
+            self.add_span(kind, start, self.now(), detail)
+
+    @property
+    def steps(self):
+        """
+        Recorded steps: {'name', 'line', 'args', 'start', 'end', 'error', 'spans': [{'kind', 'start', 'end', 'detail'}]}
+        """
+        with self.__lock:
+            return [dict(step, spans=list(step['spans'])) for step in self.__steps]
+
+    def summary(self):
+        """
+        Total time per span kind and of all steps, the rest of the step time is 'other' (e.g. sending commands).
+        :rtype: dict
+        """
+        totals = dict.fromkeys(self.SPAN_KINDS, 0.0)
+        totals['total'] = 0.0
+        for step in self.steps:
+            step_time = (step['end'] if step['end'] is not None else self.now()) - step['start']
+            totals['total'] += step_time
+            for span in step['spans']:
+                totals[span['kind']] = totals.get(span['kind'], 0.0) + span['end'] - span['start']
+        totals['other'] = max(0.0, totals['total'] - sum(totals[kind] for kind in totals if kind != 'total'))
+        return totals
+
+    def to_json(self, path):
+        """
+        Write the steps and the summary as json.
+        """
+        with open(path, 'w', encoding='utf-8') as json_file:
+            json.dump({'steps': self.steps, 'summary': self.summary()}, json_file, indent=2, ensure_ascii=False)
+
+    def to_csv(self, path):
+        """
+        Write one row per step and per span.
+        """
+        with open(path, 'w', encoding='utf-8', newline='') as csv_file:
+            writer = csv.writer(csv_file)
+            writer.writerow(['step', 'name', 'line', 'kind', 'detail', 'start', 'end', 'duration', 'error'])
+            for index, step in enumerate(self.steps):
+                end = step['end'] if step['end'] is not None else step['start']
+                writer.writerow([index, step['name'], step['line'], 'step', ' '.join(map(str, step['args'])),
+                                 step['start'], end, end - step['start'], step['error'] or ''])
+                for span in step['spans']:
+                    writer.writerow([index, step['name'], step['line'], span['kind'], span['detail'] or '',
+                                     span['start'], span['end'], span['end'] - span['start'], ''])
+
+
+def span(timeline, kind, detail=None):
+    """
+    Timeline.span if a timeline is recorded, otherwise a context which does nothing.
+    :param timeline: timeline or None
+    :type timeline: Timeline
+    """
+    if timeline is None:
+        return contextlib.nullcontext()
+    return timeline.span(kind, detail)
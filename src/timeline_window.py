@@ -0,0 +1,153 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+This file contains the TimelineWindow class, which shows the timeline of the last script run as Gantt chart.
+"""
+
+from PyQt5.QtCore import Qt, QRectF
+from PyQt5.QtGui import QColor, QPainter, QPen
+from PyQt5.QtWidgets import QWidget, QPushButton, QVBoxLayout, QHBoxLayout, QLabel, QScrollArea, QFileDialog
+
+from src.timeline import Timeline
+
+# colors of the steps and the span kinds
+STEP_COLOR = QColor(200, 200, 200)
+ERROR_COLOR = QColor(230, 120, 120)
+SPAN_COLORS = {'geometry': QColor(120, 170, 230), 'flush': QColor(240, 170, 80), 'settle': QColor(140, 200, 120),
+               'reset': QColor(170, 130, 200)}
+SPAN_NAMES = {'geometry': 'Geometrie', 'flush': 'Bewegung', 'settle': 'Ausschwingen', 'reset': 'Referenzfahrt'}
+
+
+class GanttChart(QWidget):
+    """
+    One row per step, the spans of the step are drawn on top of the step bar.
+    """
+    ROW_HEIGHT = 18
+    LABEL_WIDTH = 170
+    CHART_WIDTH = 700
+
+    def __init__(self, steps):
+        """
+        :param steps: steps of the timeline, see Timeline.steps
+        :type steps: list[dict]
+        """
+        super(GanttChart, self).__init__()
+        self.__steps = steps
+        ends = [step['end'] or step['start'] for step in steps]
+        ends += [span['end'] for step in steps for span in step['spans']]
+        self.__end = max(ends, default=0.0) or 1.0
+        self.setMinimumSize(self.LABEL_WIDTH + self.CHART_WIDTH + 10, self.ROW_HEIGHT * (len(steps) + 1))
+
+    def __x(self, time):
+        return self.LABEL_WIDTH + time / self.__end * self.CHART_WIDTH
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.setPen(QPen(Qt.black))
+        for row, step in enumerate(self.__steps):
+            top = row * self.ROW_HEIGHT
+            label = step['name'] if step['line'] is None else "{}: {}".format(step['line'], step['name'])
+            painter.drawText(QRectF(0, top, self.LABEL_WIDTH - 5, self.ROW_HEIGHT), Qt.AlignVCenter, label)
+            end = step['end'] if step['end'] is not None else step['start']
+            color = ERROR_COLOR if step['error'] else STEP_COLOR
+            painter.fillRect(QRectF(self.__x(step['start']), top + 2, max(1.0, self.__x(end) - self.__x(step['start'])),
+                                    self.ROW_HEIGHT - 4), color)
+            for span in step['spans']:
+                painter.fillRect(QRectF(self.__x(span['start']), top + 4,
+                                        max(1.0, self.__x(span['end']) - self.__x(span['start'])),
+                                        self.ROW_HEIGHT - 8), SPAN_COLORS.get(span['kind'], Qt.darkGray))
+        # time axis
+        top = len(self.__steps) * self.ROW_HEIGHT
+        painter.drawLine(self.LABEL_WIDTH, top, self.LABEL_WIDTH + self.CHART_WIDTH, top)
+        painter.drawText(QRectF(self.LABEL_WIDTH, top, self.CHART_WIDTH, self.ROW_HEIGHT), Qt.AlignRight,
+                         "{:.2f} s".format(self.__end))
+        painter.end()
+
+
+class TimelineWindow(QWidget):
+    """
+    Window with the Gantt chart of a script run and the export to json and csv.
+    """
+    def __init__(self, timeline):
+        """
+        Initialize window.
+        :param timeline: timeline of the last script run
+        :type timeline: Timeline
+        """
+        super(TimelineWindow, self).__init__()
+        self.__timeline = timeline
+
+        self.__json_button = QPushButton('Als JSON speichern')
+        self.__csv_button = QPushButton('Als CSV speichern')
+        self.__close_button = QPushButton('Schliessen')
+        self.__summary = QLabel()
+        self.__summary.setWordWrap(True)
+        self.__chart = QScrollArea()
+        self.__chart.setWidget(GanttChart(timeline.steps))
+
+        self.__init_ui()
+        self.summary_text()
+
+    def __init_ui(self):
+        # first horizontal box, buttons
+        h_box_1 = QHBoxLayout()
+        h_box_1.addWidget(self.__json_button)
+        h_box_1.addWidget(self.__csv_button)
+        h_box_1.addWidget(self.__close_button)
+        h_box_1.addStretch(1)
+
+        # legend
+        h_box_2 = QHBoxLayout()
+        for kind in Timeline.SPAN_KINDS:
+            legend = QLabel(SPAN_NAMES[kind])
+            legend.setStyleSheet("background-color: {}; padding: 2px".format(SPAN_COLORS[kind].name()))
+            h_box_2.addWidget(legend)
+        h_box_2.addStretch(1)
+
+        # fill vertical box
+        v_box = QVBoxLayout()
+        v_box.addLayout(h_box_1)
+        v_box.addLayout(h_box_2)
+        v_box.addWidget(self.__chart)
+        v_box.addWidget(self.__summary)
+
+        # Adds tooltips
+        self.__json_button.setToolTip('Speichert den Zeitablauf mit allen Befehlen als JSON-Datei')
+        self.__csv_button.setToolTip('Speichert den Zeitablauf als CSV-Datei, z.B. für eine Tabellenkalkulation')
+
+        # button connections
+        self.__json_button.clicked.connect(lambda: self.__export('JSON (*.json)', self.__timeline.to_json))
+        self.__csv_button.clicked.connect(lambda: self.__export('CSV (*.csv)', self.__timeline.to_csv))
+        self.__close_button.clicked.connect(self.close)
+
+        # layout
+        self.setLayout(v_box)
+        self.setWindowTitle('Zeitablauf')
+        self.resize(920, 500)
+
+        self.show()
+
+    def summary_text(self):
+        """
+        Show where the time of the run went.
+        """
+        summary = self.__timeline.summary()
+        parts = ["{}: {:.2f} s".format(SPAN_NAMES[kind], summary[kind]) for kind in Timeline.SPAN_KINDS]
+        parts.append("Übrige: {:.2f} s".format(summary['other']))
+        self.__summary.setText("Gesamt: {:.2f} s, ".format(summary['total']) + ", ".join(parts))
+
+    def __export(self, file_filter, write):
+        """
+        Ask for a file name and write the timeline.
+        :param file_filter: filter of the file dialog
+        :type file_filter: str
+        :param write: Timeline.to_json or Timeline.to_csv
+        :type write: function
+        """
+        path, _ = QFileDialog.getSaveFileName(self, 'Zeitablauf speichern', '', file_filter)
+        if not path:
+            return
+        try:
+            write(path)
+        except OSError as error:
+            self.__summary.setText("FEHLER: Die Datei konnte nicht gespeichert werden ({}).".format(error.strerror))
@@ -17,7 +17,9 @@ from enum import Enum
 
 from src.robot_error import ErrorCode, RobotError
 from src.debug import Debug
+from src.config import Config
 import copy
+from collections import Counter
 
 
     
@@ -34,6 +36,10 @@ class Challenge:
         self.init = [False,False,False] # Initialized [start_pos,final_pos,block_types]
         self.name = _name
         self.block_manipulating = None
+        self.occupancy = {} # Occupancy index: board cell (x, y, z) -> Blocks occupying it (order of self.blocks)
+        self.goal_keys = Counter() # Multiset of the state keys of the final position
+        self.current_keys = Counter() # Multiset of the state keys of the placed blocks
+        self.goals_satisfied = 0 # Number of final blocks currently matched by a placed block
         
         # Type options : 'test', 'challenge', 'other'
         self.success_on = True         # succes_on not turn on success mode
@@ -53,6 +59,10 @@ class Challenge:
         # @block: type: Block
         if not self.init[1]:
             self.final_pos.append(block)
+            key = block.state_key()
+            self.goal_keys[key] += 1
+            if self.current_keys[key] >= self.goal_keys[key]:
+                self.goals_satisfied += 1
             
         
     def add_block_type(self,_block_type):
@@ -101,6 +111,55 @@ class Challenge:
         pass
     def reset(self):
         self.blocks = copy.deepcopy(self.start_pos)
+        self.rebuild_occupancy()
+
+    def copy(self):
+        # Returns a copy in the start position. The start/final positions and block types are not changed after
+        # loading, so they are shared with the template
+        challenge = copy.copy(self)
+        challenge.block_manipulating = None
+        challenge.reset()
+        return challenge
+
+    def rebuild_occupancy(self):
+        # Rebuilds the occupancy index and the goal counter from the current blocks
+        self.occupancy = {}
+        self.current_keys = Counter()
+        self.goals_satisfied = 0
+        for block in self.blocks:
+            self.index_block(block)
+
+    def index_block(self,block):
+        # Adds all cells of the placed block to the occupancy index and counts the block if it matches a goal
+        # blocks can overlap (e.g. in the start positions), a cell keeps all its blocks
+        for cell in block.occupied_cells():
+            self.occupancy.setdefault(cell, []).append(block)
+        key = block.state_key()
+        self.current_keys[key] += 1
+        if self.current_keys[key] <= self.goal_keys[key]:
+            self.goals_satisfied += 1
+
+    def unindex_block(self,block):
+        # Removes all cells of the block from the occupancy index and uncounts the block if it matched a goal
+        for cell in block.occupied_cells():
+            blocks = self.occupancy.get(cell, [])
+            for index, other in enumerate(blocks):
+                if other is block:
+                    del blocks[index]
+                    break
+            if not blocks:
+                self.occupancy.pop(cell, None)
+        key = block.state_key()
+        if self.current_keys[key] <= self.goal_keys[key]:
+            self.goals_satisfied -= 1
+        self.current_keys[key] -= 1
+
+    def __place_manipulating_block(self,coordinates):
+        # Places the block held by the pump on the coordinates
+        self.block_manipulating.placeBlock(coordinates)
+        self.blocks.append(self.block_manipulating)
+        self.index_block(self.block_manipulating)
+        self.block_manipulating = []
         
     
     
@@ -138,37 +197,30 @@ class Challenge:
         
         
     def isBlock(self,coordinates):
-        #Checks if there is a block at coordinates
-        check = False
+        #Checks if there is a block at coordinates (lookup in the occupancy index)
         if coordinates[2] >= 0:
-            Debug.msg('Is block on coordinate check: {}'.format(coordinates[:]))
-            for block in self.blocks:
-                if block.is_on_position(coordinates):
-                    Debug.msg('Block found on {}'.format(coordinates))
-                    check = True
-                    break 
-            return check
+            return tuple(coordinates[:3]) in self.occupancy
         else:
             return False
     
     def getBlock(self,coordinates):
         #CHecks if there is a block at coordinates
-        check = False
-        
         Debug.msg('Get block at: {}'.format(coordinates[:]))
         if coordinates[2] == 0:
             Debug.msg("There is only the floor there ")
             return False
-        for i in range(len(self.blocks)):
-            
-            if self.blocks[i].is_on_position(coordinates):
-                Debug.msg('We got a block!')
-                self.block_manipulating = self.blocks[i]
-                self.block_manipulating.getBlock(coordinates)
-                del self.blocks[i]
-                return True
-        Debug.msg('We dont got a block!')
-        return check 
+        blocks = self.occupancy.get(tuple(coordinates[:3]))
+        if not blocks:
+            Debug.msg('We dont got a block!')
+            return False
+        # the first block of self.blocks at the coordinates, like the linear scan
+        block = blocks[0]
+        Debug.msg('We got a block!')
+        self.unindex_block(block)
+        self.blocks.remove(block)
+        self.block_manipulating = block
+        self.block_manipulating.getBlock(coordinates)
+        return True
     
     def placeBlock(self,coordinates):
         # Checks whether the block can be placed
@@ -183,15 +235,11 @@ class Challenge:
             return False
         elif coordinates[2] == 1:
             Debug.msg("The block is placed on the floor")
-            self.block_manipulating.placeBlock(coordinates)
-            self.blocks.append(self.block_manipulating)
-            self.block_manipulating = []
+            self.__place_manipulating_block(coordinates)
             return True
         elif self.isBlock(bottom_coordinates):
             Debug.msg("The block is placed on another block")
-            self.block_manipulating.placeBlock(coordinates)
-            self.blocks.append(self.block_manipulating)
-            self.block_manipulating = []
+            self.__place_manipulating_block(coordinates)
             return True 
         else:
             # Implement method for bridge block
@@ -207,9 +255,7 @@ class Challenge:
                     Debug.msg('There is a block below but not in the center')
             if blocks_below >= 2:
                 Debug.msg("The block is placed on multiple other blocks")
-                self.block_manipulating.placeBlock(coordinates)
-                self.blocks.append(self.block_manipulating)
-                self.block_manipulating = []
+                self.__place_manipulating_block(coordinates)
                 return True  
             else:
                 message = "Der Block kann nicht in der Luft losgelassen werden. Platziere den Block auf dem Boden oder auf einem anderen Block"
@@ -241,18 +287,19 @@ class Challenge:
         for i in self.block_types:
             print("Block type: ",i.type,", Dimension: ",i.dimension)
     
+    def progress(self):
+        # Returns the number of reached final blocks and the total number of final blocks
+        return self.goals_satisfied, len(self.final_pos)
+
     def success(self):
-        # Checks, whether each of the final position is reached 
+        # Checks, whether each of the final position is reached (multiset comparison of the block state keys)
         # self.debug_function()
         if self.success_on:
             blocks_total = len(self.final_pos)
-            blocks_in_final = 0
-            for block_goal in self.final_pos:           
-                for block_current in self.blocks:
-                    if block_current.is_same(block_goal.pos,block_goal.rotation):
-                        blocks_in_final = blocks_in_final + 1
+            missing = self.goal_keys - Counter(block.state_key() for block in self.blocks)
+            blocks_in_final = blocks_total - sum(missing.values())
             print (' Block in final: {} of {}'.format(blocks_in_final,blocks_total))
-            if blocks_in_final == blocks_total:
+            if not missing:
                 return self.name
             else:
                 return False
@@ -376,6 +423,13 @@ class Block:
              return self.pos_center[2]
     
     
+    def occupied_cells(self):
+        # Returns all board cells (x, y, z) inside the block, the same cells as checked by is_on_position
+        p_a = self.coordinates[0]
+        p_b = self.coordinates[-1]
+        ranges = [range(min(p_a[i], p_b[i]), max(p_a[i], p_b[i]) + 1) for i in range(3)]
+        return [(x, y, z) for x in ranges[0] for y in ranges[1] for z in ranges[2]]
+
     def is_on_position(self,position):
         # Returns true, if a block occupies the position and false othe
         p_a= self.coordinates[0]
@@ -390,15 +444,13 @@ class Block:
 
     def is_same(self,position,angle=0):
         # Returns true, if the block occupies the position and false otherwise
-        angle = round(angle)
-        while angle > 180:
-            angle = angle - 180
-        tmp_rot = round(self.rotation)
-        while tmp_rot > 180:
-            tmp_rot = round(tmp_rot - 180)  
-        #print('position block {}, position goal {}, angle block {}, angle goal {}'.format(self.pos_center,position,tmp_rot,angle))
-        if position == self.pos_center and tmp_rot == angle:
-            return True
+        #print('position block {}, position goal {}, angle block {}, angle goal {}'.format(self.pos_center,position,self.rotation,angle))
+        return position == self.pos_center and round(self.rotation) % 180 == round(angle) % 180
+
+    def state_key(self):
+        # Returns a hashable key of the block state: (center, rotation normalized to [0, 180), type)
+        center = tuple(round(c, 1) for c in self.pos_center)
+        return center, round(self.rotation) % 180, self.type
 
             
     @property     
@@ -411,6 +463,202 @@ class Block:
         return self.coordinates
          
             
+class ChallengeRegistry:
+    """
+    Process-wide cache of the challenge files in challenges/challenges_init. Each file is parsed once, the parsed
+    challenge is kept as template together with the modification time of the file and is parsed again only if the
+    file changed. Users of the registry get copies of the templates.
+    """
+    __entries = {}  # path -> {'mtime', 'info', 'template'}
+
+    @staticmethod
+    def directory():
+        """
+        Returns the folder of the challenge files.
+        """
+        parent_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        return os.path.join(parent_path, "challenges/challenges_init")
+
+    @classmethod
+    def refresh(cls):
+        """
+        Parse new or changed challenge files and drop removed ones. Unchanged files are not read again.
+        """
+        directory = cls.directory()
+        paths = [os.path.join(directory, file) for file in sorted(os.listdir(directory)) if file.endswith('ini')]
+        for path in paths:
+            mtime = os.stat(path).st_mtime_ns
+            entry = cls.__entries.get(path)
+            if entry is None or entry['mtime'] != mtime:
+                cls.__entries[path] = cls.__parse(path, mtime)
+        for path in set(cls.__entries) - set(paths):
+            del cls.__entries[path]
+
+    @classmethod
+    def clear(cls):
+        """
+        Remove all cached challenges.
+        """
+        cls.__entries.clear()
+
+    @staticmethod
+    def __multiline(text):
+        # \\n in the challenge file is a forced line break
+        new_text = ''
+        for line in text.split('\\n'):
+            new_text = new_text + line + '\n'
+        return new_text
+
+    @classmethod
+    def __parse(cls, path, mtime):
+        """
+        Parse one challenge file.
+        :param path: path of the challenge file
+        :type path: str
+        :param mtime: modification time of the file in ns
+        :type mtime: int
+        :return: cache entry {'mtime', 'info', 'template'}, info and template are None for invalid files
+        :rtype: dict
+        """
+        entry = {'mtime': mtime, 'info': None, 'template': None}
+        parser = configparser.ConfigParser()
+        parser.read(path)
+        if parser['CONFIG']['filetype'] != "challenge":
+            Debug.error('{} is no valid challenge file. The file is not loaded. Please add challenge to the name in the challenge section.'.format(path))
+            return entry
+
+        info = {'name': parser['challenge']['name'], 'sample_text': '', 'description': '', 'priority': 9999}
+        if parser.has_option('challenge','sample_text'):
+            info['sample_text'] = cls.__multiline(parser['challenge']['sample_text'])
+        if parser.has_option('challenge','description'):
+            info['description'] = cls.__multiline(parser['challenge']['description'])
+        if parser.has_option('challenge','priority'):
+            info['priority'] = int(parser['challenge']['priority'])
+        entry['info'] = info
+
+        # Generate a challenge template
+        challenge = Challenge(parser['challenge']['name'])
+
+        # Load block types
+        block_types = parser['challenge']['block_types']
+        block_types = block_types.replace('[','')
+        block_types = block_types.replace(']','')
+        block_types = block_types.split(",")
+        block_types = [i.lower() for i in block_types]
+        
+        #Load generall options
+        options = {}
+        keys = ['type','info_text']
+        for key in keys:
+            if parser.has_option('challenge',key):
+                option = parser['challenge'][key]
+            else:
+                option = ''
+            options[key] = option
+        challenge.add_options(options)
+           
+        
+        
+        # Load block dimensions
+        for block_type in parser['Block_Dimensions']:
+            dim = parser['Block_Dimensions'][block_type]
+            dim = dim.replace('[','')
+            dim = dim.replace(']','')
+            dim = dim.split(',')
+            dim = [int(i) for i in dim]
+            block_type = block_type.lower()
+            if block_type in block_types:
+                challenge.add_block_type(BlockType(block_type,dim))
+                #Debug.msg("Added Dimensions: {} type: {}".format(dim,block_type))
+            else:
+                Debug.error("There is no block type {} (see [Block_Dimensions] in {})".format(block_type,path))
+        challenge.init[2] = True
+            
+
+
+        
+        # Load start positions
+        for key in parser['Start_Position']:
+            start_pos = parser['Start_Position'][key]
+            start_pos= start_pos.replace('[','')
+            start_pos = start_pos.replace(']','')
+            start_pos = start_pos.split(",")
+            # ToDo: Check i
+            if len(start_pos) == 4:
+                angle = 0
+            elif len(start_pos) == 5:
+                angle = int(start_pos[3])
+            else:
+                print("Wrong start_position length. Example name = [x,y,z],rotation,type] or name = [x,y,z], type ")
+            if challenge.valid_block_type(start_pos[-1]): 
+                dim = challenge.get_dim(start_pos[-1])
+                #print('dim:' ,dim)
+                challenge.add_start_position(Block([int(i) for i in start_pos[:3]],start_pos[-1].lower(),dim,_rotation=angle))
+                #Debug.msg("Added start positions: {} type: {}".format(start_pos[:3],start_pos[3].lower()))
+            else:
+                Debug.error("invalid key of start block: {}".format(start_pos[3] ))
+        challenge.reset()
+        challenge.init[0] = True
+            
+            
+        # Load final positions
+        for key in parser['Final_Position']:
+            final_pos = parser['Final_Position'][key]
+            final_pos= final_pos.replace('[','')
+            final_pos = final_pos.replace(']','')
+            final_pos = final_pos.split(",")
+            if len(final_pos) == 4:
+                angle = 0
+            elif len(final_pos) == 5:
+                angle = int(final_pos[3])
+            else:
+                print("Wrong start_position length. Example name = [x,y,z],rotation,type] or name = [x,y,z], type ")
+            if challenge.valid_block_type(final_pos[-1]):
+                dim = challenge.get_dim(final_pos[-1])
+                #print('dim:' ,dim)
+                challenge.add_final_position(Block([int(i) for i in final_pos[:3]],final_pos[-1].lower(),dim,_rotation=angle))
+                #Debug.msg("Added final positions: {} type: {}".format(final_pos[:3],final_pos[3].lower()))
+            else:
+                Debug.error("invalid key of final block: {}".format(final_pos[3] ))
+        challenge.init[1] = True
+
+        #challenge.debug_function() #Prints out the current blocks: only for debugging
+        entry['template'] = challenge
+        return entry
+
+    @classmethod
+    def challenge_infos(cls):
+        """
+        Returns the infos of all challenges sorted by priority (a low number means that the challenge is higher up in
+        the dropdown menu) and the paths of all challenge files.
+        :return: [{'names', 'sample_text', 'description', 'priorities'}, paths]
+        :rtype: list
+        """
+        cls.refresh()
+        infos = sorted((entry['info'] for entry in cls.__entries.values() if entry['info']),
+                       key=lambda info: info['priority'])
+        challenge_infos = {'names': [info['name'] for info in infos],
+                           'sample_text': [info['sample_text'] for info in infos],
+                           'description': [info['description'] for info in infos],
+                           'priorities': [info['priority'] for info in infos]}
+        return [challenge_infos, sorted(cls.__entries)]
+
+    @classmethod
+    def challenge(cls, name):
+        """
+        Returns a fresh copy of the challenge.
+        :param name: name of the challenge
+        :type name: str
+        :return: copy of the challenge in the start position, None if there is no challenge with this name
+        :rtype: Challenge
+        """
+        cls.refresh()
+        for entry in cls.__entries.values():
+            if entry['template'] is not None and entry['template'].name == name:
+                return entry['template'].copy()
+        return None
+
+
 class UserChallenge:
     """
     This class monitors user challenge success.g
@@ -432,232 +680,44 @@ class UserChallenge:
         Debug.print_on = False
         
         
-        # Loads all challenges out of the challenges/challenge_init folder. Feel free to define new ones.
-        self.__all_challenges = []       
-        self.load_challenges()
+        # Gets the challenge out of the challenges/challenge_init folder. Feel free to define new ones.
+        self.__challenge = ChallengeRegistry.challenge(challenge)
         self.load_general_options()
-        challenge_loaded = False
-        for chal in self.__all_challenges:
-            #print('Challenge name: {} , chal searching {}'.format(chal.name, challenge))
-            if chal.name == challenge:
-                 self.__challenge = chal
-                 print('Challenge %s ist gestartet. Viel Erfolg beim Lösen.' %{challenge})
-                 challenge_loaded = True
-                 break
-        if not challenge_loaded:
+        if self.__challenge is None:
             message = "Die Aufgabe  %s kann nicht geladen werden.  Bitte wählen Sie eine   \
                       andere aus."%{challenge}
-            raise RobotError(ErrorCode.E0012, message)            
-                 
-        
-     
-           
-        
+            raise RobotError(ErrorCode.E0012, message)
+        print('Challenge %s ist gestartet. Viel Erfolg beim Lösen.' %{challenge})
+
         self.__block = BlockKind.Null
-    @staticmethod  
+
+    @staticmethod
     def challenge_name_path():
-        
         ''' Returns the path and other basics of the challenge config file '''
-        parent_path = os.path.dirname(os.path.dirname( os.path.abspath(__file__)))
-        path = os.path.join(parent_path,"challenges/challenges_init")
-        path_challenges = []
-        file_ending = 'ini'
-        challenge_names_unsorted = [] # names of the challenge
-        challenge_names = []
-        sample_text_unsorted = [] # text in the challenge textbox
-        sample_text = []
-        description_unsorted = [] # Info in the challenge description
-        description = []
-        priorities = [] # Priority of the challenge in the dropdown menu: A low number means that the challenge is higher up.
-        for file in os.listdir(path):
-            if file.endswith(file_ending):
-                path_challenge = os.path.join(path,file)
-                path_challenges.append(path_challenge)
-                parser = configparser.ConfigParser()
-                parser.read(path_challenge)
-                if parser['CONFIG']['filetype'] == "challenge":
-                    challenge_names_unsorted.append(parser['challenge']['name'])
-                    if parser.has_option('challenge','sample_text'):
-                        text = parser['challenge']['sample_text']
-                        text = text.split('\\n')
-                        new_text = ''
-                        for line in text:
-                            new_text = new_text + line + '\n'
-                        sample_text_unsorted.append(new_text)
-                    else:
-                        sample_text_unsorted.append('')
-                    if parser.has_option('challenge','description'):
-                        text = parser['challenge']['description']
-                        text = text.split('\\n')
-                        new_text = ''
-                        for line in text:
-                            new_text = new_text + line + '\n'
-                        description_unsorted.append(new_text)
-                    else:
-                        description_unsorted.append('')
-                    if parser.has_option('challenge','priority'):
-                        priorities.append(parser['challenge']['priority'])
-                    else:
-                        priorities.append(9999)
-                   
-                    
-                        
-                else:
-                    Debug.error(path_challenge, 'is no valid challenge file. The file is not loaded. Please add challenge to the name in the challenge section.')
-        
-        
-        #Sorting the lists   
-        index_of_list = list(range(len(priorities)))  # This will be used as a sorted index list
-        range_len = len(priorities)-1
-        while range_len > 0:
-            for idx in  range(range_len):
-                if priorities[idx] > priorities[idx+1]:
-                    tmp_priority = priorities[idx]
-                    tmp_idx= index_of_list[idx]
-                    priorities[idx] = priorities[idx+1]
-                    index_of_list[idx] = index_of_list[idx+1]
-                    priorities[idx+1] = tmp_priority
-                    index_of_list[idx+1] = tmp_idx
-            range_len -= 1
-                    
-        new_list_position = index_of_list # For clarity, we are now sorting the list according to the priorities
-        
-
-        for idx in new_list_position:
-            challenge_names.append(challenge_names_unsorted[idx])
-            description.append(description_unsorted[idx])
-            sample_text.append(sample_text_unsorted[idx])
-            
-            
-            
-        challenge_infos = {'names':challenge_names,'sample_text' : sample_text, 'description' : description, 'priorities' : priorities}
+        return ChallengeRegistry.challenge_infos()
 
-        
-        return [challenge_infos,path_challenges]
-    
     def load_general_options(self):
-        parent_path = os.path.dirname(os.path.dirname( os.path.abspath(__file__)))
-        path = os.path.join(parent_path,"config/config.ini")
-        parser = configparser.ConfigParser()
-        parser.read(path)
-        pos = parser['ROBOT']['reset_position']
-        pos= pos.replace('[','')
-        pos = pos.replace(']','')
-        pos = pos.split(",")
-        self.__coordinates = pos
+        self.__coordinates = list(Config.instance().reset_position)
  
         
-    def load_challenges(self):
-        ''' 
-        Loads all challenges in the challenge/challenges_init folder with an .ini ending.
-        '''
-
-        _,challenge_paths = self.challenge_name_path()
-        
-
-        
-        for path in challenge_paths:
-            parser = configparser.ConfigParser()
-            parser.read(path)
-            
-            # Generate a challenge template
-            challenge = Challenge(parser['challenge']['name'])
-
-            
-            # Load block types
-            block_types = parser['challenge']['block_types']
-            block_types = block_types.replace('[','')
-            block_types = block_types.replace(']','')
-            block_types = block_types.split(",")
-            block_types = [i.lower() for i in block_types]
-            
-            #Load generall options
-            options = {}
-            keys = ['type','info_text']
-            for key in keys:
-                if parser.has_option('challenge',key):
-                    option = parser['challenge'][key]
-                else:
-                    option = ''
-                options[key] = option
-            challenge.add_options(options)
-               
-            
-            
-            # Load block dimensions
-            for block_type in parser['Block_Dimensions']:
-                dim = parser['Block_Dimensions'][block_type]
-                dim = dim.replace('[','')
-                dim = dim.replace(']','')
-                dim = dim.split(',')
-                dim = [int(i) for i in dim]
-                block_type = block_type.lower()
-                if block_type in block_types:
-                    challenge.add_block_type(BlockType(block_type,dim))
-                    #Debug.msg("Added Dimensions: {} type: {}".format(dim,block_type))
-                else:
-                    Debug.error("There is no block type {} (see [Block_Dimensions] in {})".format(block_type,path))
-            challenge.init[2] = True
-                
-
-
-            
-            # Load start positions
-            for key in parser['Start_Position']:
-                start_pos = parser['Start_Position'][key]
-                start_pos= start_pos.replace('[','')
-                start_pos = start_pos.replace(']','')
-                start_pos = start_pos.split(",")
-                # ToDo: Check i
-                if len(start_pos) == 4:
-                    angle = 0
-                elif len(start_pos) == 5:
-                    angle = int(start_pos[3])
-                else:
-                    print("Wrong start_position length. Example name = [x,y,z],rotation,type] or name = [x,y,z], type ")
-                if challenge.valid_block_type(start_pos[-1]): 
-                    dim = challenge.get_dim(start_pos[-1])
-                    #print('dim:' ,dim)
-                    challenge.add_start_position(Block([int(i) for i in start_pos[:3]],start_pos[-1].lower(),dim,_rotation=angle))
-                    #Debug.msg("Added start positions: {} type: {}".format(start_pos[:3],start_pos[3].lower()))
-                else:
-                    Debug.error("invalid key of start block: {}".format(start_pos[3] ))
-            challenge.reset()
-            challenge.init[0] = True
-                
-                
-            # Load final positions
-            for key in parser['Final_Position']:
-                final_pos = parser['Final_Position'][key]
-                final_pos= final_pos.replace('[','')
-                final_pos = final_pos.replace(']','')
-                final_pos = final_pos.split(",")
-                if len(final_pos) == 4:
-                    angle = 0
-                elif len(final_pos) == 5:
-                    angle = int(final_pos[3])
-                else:
-                    print("Wrong start_position length. Example name = [x,y,z],rotation,type] or name = [x,y,z], type ")
-                if challenge.valid_block_type(final_pos[-1]):
-                    dim = challenge.get_dim(final_pos[-1])
-                    #print('dim:' ,dim)
-                    challenge.add_final_position(Block([int(i) for i in final_pos[:3]],final_pos[-1].lower(),dim,_rotation=angle))
-                    #Debug.msg("Added final positions: {} type: {}".format(final_pos[:3],final_pos[3].lower()))
-                else:
-                    Debug.error("invalid key of final block: {}".format(final_pos[3] ))
-            challenge.init[1] = True
-            
-            #challenge.debug_function() #Prints out the current blocks: only for debugging
-            #Add the new challenge to the class
-            self.__all_challenges.append(challenge)
-                
-
     def current_challenge(self):
         ''' Returns the current challenge '''
         return self.__challenge.name
     
     def reset_challenge(self):
         self.__challenge.reset()
+
+    def reset_coordinates(self):
+        ''' Sets the robot coordinates back to the start position of the robot '''
+        self.__coordinates = list(Config.instance().reset_position)
+
+    def copy_state(self):
+        """
+        Copy of the current challenge state and robot coordinates, e.g. to check a script without changing this object.
+        :return: challenge copy, coordinates in user frame [x, y, z]
+        :rtype: tuple[Challenge, list[int]]
+        """
+        return copy.deepcopy(self.__challenge), list(self.__coordinates)
   
 
     def record_robot(self, robot, function, args):
@@ -680,6 +740,9 @@ class UserChallenge:
         # Update height
         elif function == robot.height_new:
             self.__coordinates[2] = args[0]
+        # Update position and height (moves merged by the MotionPlanner)
+        elif function == robot.pose_new:
+            self.__coordinates[:] = args
         # Check blocks before putting the pump on
         elif function == robot.pump_on:
             self.__challenge.pump_on(self.__coordinates)
@@ -702,5 +765,13 @@ class UserChallenge:
         
         return self.__challenge.success()
 
+    def progress(self):
+        """
+        Progress of the challenge, updated on each placed or picked block.
+        :return: number of reached final blocks, total number of final blocks
+        :rtype: tuple[int, int]
+        """
+        return self.__challenge.progress()
+
    
 
@@ -14,6 +14,9 @@ class FunctionNames(Enum):
     pumpe_aus = 4
     drehen = 5
     test_c = 6
+    warten = 7
+    # position and height in one move, only created by the MotionPlanner and not callable in user scripts
+    pose = 8
 
 
 
@@ -6,16 +6,15 @@ This file contains the UserScript class.
 from src.user_functions import FunctionNames
 
 from src.robot_error import ErrorCode, RobotError
-from src.robot_handler import RobotHandler
 from src.user_challenge import UserChallenge
+from src.preflight import Preflight
+from src.motion_planner import MotionPlanner
 from src.debug import Debug
 
 class UserScript:
     """
     The UserScript class handles input given by the frontend, checks it and converts it to robot_handler functions.
     """
-    # Static stop variable which tells if the commands should be stopped
-    stop = False
     def __init__(self, input_string, robot_handler, challenge):
         """
         Initialize UserScript object from frontend input-string.
@@ -29,6 +28,16 @@ class UserScript:
 
         # Loads the user challenges
         self.__user_challenge = UserChallenge(challenge)
+        # Number of commands executed by the last run
+        self.__steps = 0
+        # Warnings of the last preflight check
+        self.__warnings = []
+        # Set by cancel(), checked before each command
+        self.__cancelled = False
+        # ArmBarrier of a multi-arm run, warten() is a no-op without it
+        self.__barrier = None
+        # Timeline of the current run, None if no timeline is recorded
+        self.__timeline = None
         
         # Loads the commands from the command window
         self.load_commands(input_string,robot_handler)
@@ -36,35 +45,70 @@ class UserScript:
                 
     def load_commands(self,input_string,robot_handler):
         ''' Loads the commands of the command lines in the terminal given by the input_string '''
-        # reset arm so values dont change
-        robot_handler.reset()
         # remove all spaces
         input_string = input_string.replace(" ", "")
-        # split strings at newline, only keep substrings if they are not empty
-        line_list = [i for i in input_string.split("\n") if i != ""]
+        # split strings at newline, only keep substrings if they are not empty (line numbers start at 1)
+        line_list = [(n, i) for n, i in enumerate(input_string.split("\n"), start=1) if i != ""]
 
         self.__function_calls = list()
+        errors = []
         # TODO (ALR): Refactor into different functions. (TE): Done: Added functions for each function_string
-        # map each string to function and argument
-        for line in line_list:
-            clean_data = UserScript.__cleanup_line(line)
-            function_string = clean_data["function_string"]
-            arguments = clean_data["arguments"]
-            
-            if function_string == FunctionNames.hoehe.name:
-                self.hoehe(robot_handler,arguments)
-            elif function_string == FunctionNames.position.name:
-                self.position(robot_handler,arguments)
-            elif function_string == FunctionNames.pumpe_an.name:
-                self.pumpe_an(robot_handler,arguments)
-            elif function_string == FunctionNames.pumpe_aus.name:
-                self.pumpe_aus(robot_handler,arguments)
-            elif function_string == FunctionNames.drehen.name:
-                self.drehen(robot_handler,arguments)
-            elif function_string == FunctionNames.test_c.name:
-                self.test_c(robot_handler,arguments)
-        
-        
+        # map each string to function and argument, all lines are checked before an error is raised
+        for line_number, line in line_list:
+            self.__line_number = line_number
+            try:
+                clean_data = UserScript.__cleanup_line(line)
+                function_string = clean_data["function_string"]
+                arguments = clean_data["arguments"]
+
+                if function_string == FunctionNames.hoehe.name:
+                    self.hoehe(robot_handler,arguments)
+                elif function_string == FunctionNames.position.name:
+                    self.position(robot_handler,arguments)
+                elif function_string == FunctionNames.pumpe_an.name:
+                    self.pumpe_an(robot_handler,arguments)
+                elif function_string == FunctionNames.pumpe_aus.name:
+                    self.pumpe_aus(robot_handler,arguments)
+                elif function_string == FunctionNames.drehen.name:
+                    self.drehen(robot_handler,arguments)
+                elif function_string == FunctionNames.test_c.name:
+                    self.test_c(robot_handler,arguments)
+                elif function_string == FunctionNames.warten.name:
+                    self.warten(robot_handler,arguments)
+                else:
+                    message = "Die Funktion {} ist unbekannt. Erlaubt sind: {}".format(
+                        function_string, ", ".join(name.name for name in FunctionNames
+                                             if name not in (FunctionNames.test_c, FunctionNames.pose)))
+                    raise RobotError(ErrorCode.E0011, message)
+            except RobotError as error:
+                errors.append((line_number, error))
+        if errors:
+            message = "\n".join("Zeile {}: {}".format(line_number, error.message) for line_number, error in errors)
+            raise RobotError(errors[0][1].error_code, message)
+
+    def __add_call(self, function, arguments, function_name):
+        ''' Adds a function call of the current line '''
+        self.__function_calls.append({"function": function, "args": arguments, "name": function_name.name,
+                                      "line": self.__line_number})
+
+    def preflight(self):
+        '''
+        Checks the whole script against the workspace and the current challenge state before the robot moves. All
+        errors are raised together in one RobotError with their line numbers, the warnings are stored in warnings.
+        '''
+        challenge, coordinates = self.__user_challenge.copy_state()
+        preflight = Preflight(challenge, coordinates)
+        preflight.check(self.__function_calls)
+        self.__warnings = ["Zeile {}: {}".format(line, message) for line, message in preflight.warnings]
+        if preflight.errors:
+            raise RobotError(preflight.errors[0][1].error_code, preflight.error_message())
+
+    @property
+    def warnings(self):
+        """
+        Warnings of the last preflight check, e.g. wrist limits.
+        """
+        return self.__warnings
 
 
     @staticmethod
@@ -112,43 +156,139 @@ class UserScript:
         return {"function_string": function_string, "arguments": arguments}
 
 
-    def run_script(self, robot_handler):
+    def run_script(self, robot_handler, pipelined=False, optimize=False, progress_callback=None, barrier=None,
+                   timeline=None):
         """
         Run script functions on robot.
+        :param robot_handler: RobotHandler object, managing connection to uArm
+        :type robot_handler: RobotHandler
+        :param pipelined: stream the movements to the uArm and only wait at the pump commands
+        :type pipelined: bool
+        :param optimize: merge and shorten the moves with the MotionPlanner before execution
+        :type optimize: bool
+        :param progress_callback: called before each command with (executed commands, total commands, line number)
+        :type progress_callback: function
+        :param barrier: barrier shared with the scripts of the other arms, used by warten()
+        :type barrier: ArmBarrier
+        :param timeline: records the start and end of each command and where the robot handler spent its time
+        :type timeline: Timeline
         :return: True if script was sucessful
         :rtype: bool
         """
-        # run functions
-        for function_call in self.__function_calls:
-            function = function_call["function"]
-            argument = function_call["args"]
-            # call unbound function
-            if len(argument) != 0:
-                function(argument)
-            else:
-                function()
-            # update user challenge
-            self.__user_challenge.record_robot(robot_handler, function, argument)
+        self.__steps = 0
+        self.__cancelled = False
+        self.__barrier = barrier
+        self.__timeline = timeline
+        robot_handler.timeline = timeline
+        # error of the failed command, stored in its step of the timeline
+        error_message = None
+        try:
+            return self.__run(robot_handler, pipelined, optimize, progress_callback)
+        except RobotError as error:
+            # the other arms must not wait for this arm at their next warten()
+            if barrier is not None:
+                barrier.abort()
+            error_message = error.message
+            raise
+        finally:
+            if barrier is not None:
+                barrier.leave()
+            self.__barrier = None
+            if timeline is not None:
+                timeline.end_step(error_message)
+            robot_handler.timeline = None
+            self.__timeline = None
+
+    def __begin_step(self, name, line=None, args=None):
+        ''' Starts a step of the timeline, if one is recorded '''
+        if self.__timeline is not None:
+            self.__timeline.begin_step(name, line, args)
+
+    def __run(self, robot_handler, pipelined, optimize, progress_callback):
+        ''' Runs the script, see run_script '''
+        # check the whole script from the start position before the robot moves
+        self.__user_challenge.reset_coordinates()
+        self.preflight()
+        # the script starts at the start position, nothing is done if the robot is already there
+        self.__begin_step("reset")
+        robot_handler.reset()
+        function_calls = self.__function_calls
+        if optimize:
+            challenge, coordinates = self.__user_challenge.copy_state()
+            function_calls = MotionPlanner(challenge, coordinates).plan(function_calls, robot_handler)
+        if pipelined:
+            robot_handler.start_pipeline()
+        try:
+            # run functions
+            for function_call in function_calls:
+                if progress_callback is not None:
+                    progress_callback(self.__steps, len(function_calls), function_call["line"])
+                function = function_call["function"]
+                argument = function_call["args"]
+                self.__begin_step(function_call["name"], function_call["line"], argument)
+                if self.__cancelled:
+                    message = "Das Skript wurde abgebrochen."
+                    raise RobotError(ErrorCode.E0017, message)
+                # call unbound function
+                if len(argument) != 0:
+                    function(argument)
+                else:
+                    function()
+                # update user challenge
+                self.__user_challenge.record_robot(robot_handler, function, argument)
+                self.__steps += 1
+        except RobotError:
+            if pipelined:
+                try:
+                    robot_handler.stop_pipeline()
+                except RobotError:
+                    # the error of the script is reported, e.g. E0017 and not the E0005 of the emergency stop
+                    pass
+            raise
+        if pipelined:
+            robot_handler.stop_pipeline()
 
         Debug.msg("All commands executed. Reseting arm and checking challenge victory conditions")
+        self.__begin_step("reset")
         robot_handler.reset()
+        self.__user_challenge.reset_coordinates()
         return self.__user_challenge.success()
 
+    def cancel(self):
+        """
+        Stop a running script before its next command, run_script raises E0017. Can be called from another thread.
+        """
+        self.__cancelled = True
+
+    @property
+    def steps(self):
+        """
+        Number of commands executed successfully by the last run_script call.
+        """
+        return self.__steps
+
     @staticmethod
-    def reset(robot_handler):
+    def reset(robot_handler, force=False):
         """
         Reset robot to home position.
         :param robot_handler: RobotHandler object, managing connection to uArm
         :type robot_handler: RobotHandler
+        :param force: home the arm even if the robot handler knows its pose
+        :type force: bool
         """
 
-        robot_handler.reset()
+        robot_handler.reset(force=force)
 
         
     def reset_challenge(self):
         
         self.__user_challenge.reset_challenge()
 
+    def progress(self):
+        ''' Returns the progress of the current challenge (reached final blocks, total final blocks)
+        '''
+        return self.__user_challenge.progress()
+
     def current_challenge(self):
         ''' Returns the current loaded challenge
         '''
@@ -171,7 +311,7 @@ class UserScript:
                     message = "Der Motor kann nicht unterhalb des Bodens gehen"
                     raise RobotError(ErrorCode.E0008, message)
             
-        self.__function_calls.append( {"function": robot_handler.height_new, "args": arguments})
+        self.__add_call(robot_handler.height_new, arguments, FunctionNames.hoehe)
         
         
     def drehen(self,robot_handler,arguments):
@@ -179,26 +319,42 @@ class UserScript:
                     message = "Bitte geben Sie nur einen Winkel für die Drehung an: Bsp:  drehen(90)"
                     raise RobotError(ErrorCode.E0100, message)
 
-        self.__function_calls.append({"function": robot_handler.drehen, "args": arguments})
+        self.__add_call(robot_handler.drehen, arguments, FunctionNames.drehen)
 
     def test_c(self,robot_handler,arguments):
          
-        self.__function_calls.append({"function": robot_handler.test_c, "args": arguments})
+        self.__add_call(robot_handler.test_c, arguments, FunctionNames.test_c)
 
     def position(self,robot_handler,arguments):
         if len(arguments) != 2:
                     message = "Bitte geben Sie zwei Koordinaten für eine neue Position an. Bsp.: position(5, 5)"
                     raise RobotError(ErrorCode.E0007, message)
-        self.__function_calls.append({"function": robot_handler.position_new, "args": arguments})
+        self.__add_call(robot_handler.position_new, arguments, FunctionNames.position)
   
+    def warten(self,robot_handler,arguments):
+        if len(arguments) != 0:
+                    message = "Die Funktion warten benötigt kein Argument. Bsp.: warten()"
+                    raise RobotError(ErrorCode.E0101, message)
+        self.__add_call(lambda: self.__wait_for_arms(robot_handler), arguments, FunctionNames.warten)
+
+    def __wait_for_arms(self, robot_handler):
+        '''
+        Synchronization point of a multi-arm run: the arm finishes its movements and waits until all other arms
+        reached their warten() or finished their script.
+        '''
+        if self.__barrier is None:
+            return
+        robot_handler.synchronize()
+        self.__barrier.wait()
+
     def pumpe_an(self,robot_handler,arguments):
         if len(arguments) != 0:
                     message = "Die Funktion pumpe_an benötigt kein Argument. Bsp.: pumpe_an()"
                     raise RobotError(ErrorCode.E0009, message)
-        self.__function_calls.append({"function": robot_handler.pump_on, "args": arguments})
+        self.__add_call(robot_handler.pump_on, arguments, FunctionNames.pumpe_an)
 
     def pumpe_aus(self,robot_handler,arguments):
         if len(arguments) != 0:
                     message = "Die Funktion pumpe_aus benötigt kein Argument. Bsp.: pumpe_aus()"
                     raise RobotError(ErrorCode.E0010, message)
-        self.__function_calls.append({"function": robot_handler.pump_off, "args": arguments})
+        self.__add_call(robot_handler.pump_off, arguments, FunctionNames.pumpe_aus)